@@ -1,32 +1,204 @@
+import atexit
 import json
 import os
 import logging
+import queue
+import threading
+import time
+from typing import Optional
+
 import pika
 
 logger = logging.getLogger()
 
+RABBIT_HOST = os.getenv("RABBIT_HOST", "rabbitmq")
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+LOG_BATCH_SIZE = int(os.getenv("LOG_BATCH_SIZE", "200"))
+LOG_FLUSH_INTERVAL = float(os.getenv("LOG_FLUSH_INTERVAL", "0.05"))
+LOG_OVERFLOW_POLICY = os.getenv("LOG_OVERFLOW_POLICY", "drop")  # drop | block
+LOG_BLOCK_TIMEOUT = float(os.getenv("LOG_BLOCK_TIMEOUT", "1"))
+LOG_RECONNECT_DELAY = float(os.getenv("LOG_RECONNECT_DELAY", "5"))
+
+_STOP = object()
+
+
+class EventPublisher:
+    """
+    Publishes messages to RabbitMQ from a background thread.
+
+    Callers only put the message into a bounded in-memory queue. The flush thread owns the
+    (persistent) pika connection, drains the queue in batches and reconnects if the broker
+    goes away. When the queue is full the message is dropped or the caller blocks, depending
+    on the overflow policy.
+
+    With reliable=True (business messages) the queue is unbounded, so publish() never blocks
+    or drops, and messages the broker did not take are kept and retried after
+    LOG_RECONNECT_DELAY instead of being dropped. Delivery is at-least-once.
+    """
+
+    def __init__(self, host: str, maxsize: int, batch_size: int, flush_interval: float, overflow: str,
+                 reliable: bool = False):
+        self._host = host
+        self._reliable = reliable
+        self._queue: queue.Queue = queue.Queue(maxsize=0 if reliable else maxsize)
+        self._batch_size = max(batch_size, 1)
+        self._flush_interval = flush_interval
+        self._overflow = overflow
+        self._connection = None
+        self._channel = None
+        self._declared: set[str] = set()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._retry_at = 0.0
+        self._pending: list = []  # nur reliable: noch nicht gesendete Nachrichten
+        self.dropped = 0
+
+    def publish(self, exchange: str, routing_key: str, payload: dict, block: Optional[bool] = None) -> bool:
+        """Queues a message for publishing. Returns False if it was dropped because the queue is full."""
+        self._ensure_started()
+        if block is None:
+            block = self._overflow == "block"
+        try:
+            if block:
+                self._queue.put((exchange, routing_key, payload), timeout=LOG_BLOCK_TIMEOUT)
+            else:
+                self._queue.put_nowait((exchange, routing_key, payload))
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Flushes the remaining messages and stops the flush thread."""
+        if self._thread is None or not self._thread.is_alive():
+            return
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            return
+        self._thread.join(timeout)
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="event-publisher", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            try:
+                item = self._queue.get(timeout=self._flush_interval)
+            except queue.Empty:
+                if self._pending:
+                    self._flush([])
+                else:
+                    self._keep_alive()
+                continue
+
+            batch = [item]
+            while len(batch) < self._batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = _STOP in batch
+            self._flush([m for m in batch if m is not _STOP])
+            if stop:
+                if self._pending:
+                    # letzter Versuch vor dem Beenden, unabhängig von der Reconnect-Pause
+                    self._retry_at = 0.0
+                    self._flush([])
+                if self._pending:
+                    logging.error(f"Broker unreachable on shutdown, {len(self._pending)} messages lost")
+                self._disconnect()
+                return
+
+    def _flush(self, batch: list) -> None:
+        if self._pending:
+            batch = self._pending + batch
+            self._pending = []
+        if not batch:
+            return
+        if time.monotonic() < self._retry_at:
+            # Broker war gerade nicht erreichbar -> nicht bei jedem Batch neu verbinden
+            self._defer(batch)
+            return
+        sent = 0
+        for attempt in range(2):
+            try:
+                channel = self._ensure_channel()
+                for exchange, routing_key, payload in batch[sent:]:
+                    if exchange not in self._declared:
+                        channel.exchange_declare(exchange=exchange, exchange_type="topic")
+                        self._declared.add(exchange)
+                    channel.basic_publish(exchange=exchange, routing_key=routing_key, body=json.dumps(payload))
+                    sent += 1
+                logging.debug(f" Sent {len(batch)} messages")
+                return
+            except Exception as e:
+                logging.error(f"Failed to send messages (attempt {attempt + 1}): {e}")
+                self._disconnect()
+        self._defer(batch[sent:])
+        self._retry_at = time.monotonic() + LOG_RECONNECT_DELAY
+        if self._reliable:
+            logging.warning(f"Broker unreachable, keeping {len(self._pending)} messages for retry")
+
+    def _defer(self, batch: list) -> None:
+        if self._reliable:
+            # Geschäftsnachrichten bleiben im Retry-Puffer, bis der Broker wieder erreichbar ist
+            self._pending = batch
+        else:
+            # Logs verwerfen, damit der Speicher nicht volläuft
+            self.dropped += len(batch)
+
+    def _ensure_channel(self):
+        if self._channel is None or self._channel.is_closed:
+            self._connection = pika.BlockingConnection(pika.ConnectionParameters(host=self._host))
+            self._channel = self._connection.channel()
+            self._declared.clear()
+        return self._channel
+
+    def _keep_alive(self) -> None:
+        # Heartbeats bedienen, solange nichts zu senden ist
+        if self._connection is not None and self._connection.is_open:
+            try:
+                self._connection.process_data_events(time_limit=0)
+            except Exception:
+                self._disconnect()
+
+    def _disconnect(self) -> None:
+        try:
+            if self._connection is not None and self._connection.is_open:
+                self._connection.close()
+        except Exception:
+            pass
+        self._connection = None
+        self._channel = None
+
 
-def send_log_message(service: str, event: str, message: str):
-    """Sendet Log-Nachrichten an RabbitMQ."""
-    try:
-        connection = pika.BlockingConnection(pika.ConnectionParameters(host="rabbitmq"))
-        channel = connection.channel()
+_PUBLISHER = EventPublisher(RABBIT_HOST, LOG_QUEUE_SIZE, LOG_BATCH_SIZE, LOG_FLUSH_INTERVAL, LOG_OVERFLOW_POLICY)
+atexit.register(_PUBLISHER.close)
 
-        channel.exchange_declare(exchange="event_log", exchange_type="topic")
 
-        payload = {
-            "service": service,
-            "event": event,
-            "message": message
-        }
+def get_publisher() -> EventPublisher:
+    return _PUBLISHER
 
-        channel.basic_publish(
-            exchange="event_log",
-            routing_key=f"log.{service}",
-            body=json.dumps(payload)
-        )
-        logging.info(f" Sent log message: {payload}")
-        connection.close()
 
-    except Exception as e:
-        logging.error(f"Failed to send log message: {e}")
+def send_log_message(service: str, event: str, message: str, details: Optional[dict] = None,
+                     block: Optional[bool] = None):
+    """
+    Sendet Log-Nachrichten an RabbitMQ (asynchron über den Hintergrund-Publisher).
+    Strukturierte Zusatzinfos (z.B. Ergebnis pro Artikel) gehen als "details" mit.
+    block=False verwirft bei vollem Puffer sofort (für Aufrufer im Event-Loop), sonst gilt LOG_OVERFLOW_POLICY.
+    """
+    payload = {
+        "service": service,
+        "event": event,
+        "message": message
+    }
+    if details is not None:
+        payload["details"] = details
+    _PUBLISHER.publish("event_log", f"log.{service}", payload, block=block)
@@ -0,0 +1,191 @@
+import asyncio
+import time
+
+import grpc
+
+from . import inventory_pb2
+from .metrics import Counter, Gauge, Histogram, Registry
+
+REGISTRY = Registry()
+RPC_LATENCY = REGISTRY.register(Histogram(
+    "inventory_rpc_duration_seconds", "Handling time of inventory RPCs (streams: until the last message).",
+    (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30), ("method",)))
+RPC_IN_FLIGHT = REGISTRY.register(Gauge(
+    "inventory_rpc_in_flight", "Inventory RPCs currently being handled.", ("method",)))
+RPC_ITEMS = REGISTRY.register(Histogram(
+    "inventory_rpc_items", "Items (SKUs or reservation ids) per inventory RPC.",
+    (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 5000, 10000, 100000, 1000000), ("method",)))
+RPC_HANDLED = REGISTRY.register(Counter(
+    "inventory_rpc_handled_total", "Finished inventory RPCs by status code.", ("method", "code")))
+
+
+def _item_count(message) -> int:
+    if isinstance(message, inventory_pb2.ReserveBatchRequest):
+        return sum(len(request.items) for request in message.requests)
+    if isinstance(message, inventory_pb2.ReservationRequest):
+        return len(message.reservationIds)
+    return len(message.items)
+
+
+def _code_name(code) -> str:
+    return code.name if isinstance(code, grpc.StatusCode) else "OK"
+
+
+class _Call:
+    """Measures one RPC: in-flight while it runs, then latency, item count and status code."""
+
+    __slots__ = ("labels", "items", "started")
+
+    def __init__(self, method: str):
+        self.labels = (method,)
+        self.items = 0
+        self.started = time.perf_counter()
+        RPC_IN_FLIGHT.add(self.labels)
+
+    def done(self, code) -> None:
+        RPC_IN_FLIGHT.add(self.labels, -1)
+        RPC_LATENCY.observe(self.labels, time.perf_counter() - self.started)
+        RPC_ITEMS.observe(self.labels, self.items)
+        RPC_HANDLED.inc((self.labels[0], _code_name(code)))
+
+
+def _failure_code(context, error: BaseException):
+    if isinstance(error, (GeneratorExit, asyncio.CancelledError)):
+        return grpc.StatusCode.CANCELLED
+    # abort() setzt den Code vor der Exception, sonst meldet gRPC UNKNOWN
+    return context.code() or grpc.StatusCode.UNKNOWN
+
+
+def _method_name(handler_call_details) -> str:
+    return handler_call_details.method.rsplit("/", 1)[-1]
+
+
+class MetricsInterceptor(grpc.ServerInterceptor):
+    """
+    Records latency, in-flight count, items per request and status code of every RPC.
+    The wrapped handlers are built once per method; per call the overhead is a few counter
+    updates under short locks.
+    """
+
+    def __init__(self):
+        self._handlers: dict[str, grpc.RpcMethodHandler] = {}
+
+    def intercept_service(self, continuation, handler_call_details):
+        method = handler_call_details.method
+        wrapped = self._handlers.get(method)
+        if wrapped is None:
+            handler = continuation(handler_call_details)
+            if handler is None:
+                return None
+            wrapped = self._handlers[method] = self._wrap(_method_name(handler_call_details), handler)
+        return wrapped
+
+    @staticmethod
+    def _wrap(name: str, handler: grpc.RpcMethodHandler) -> grpc.RpcMethodHandler:
+        def counted(call: _Call, request_iterator):
+            for request in request_iterator:
+                call.items += _item_count(request)
+                yield request
+
+        def unary_response(behavior, streaming_request):
+            def wrapper(request_or_iterator, context):
+                call = _Call(name)
+                if streaming_request:
+                    request_or_iterator = counted(call, request_or_iterator)
+                else:
+                    call.items = _item_count(request_or_iterator)
+                try:
+                    response = behavior(request_or_iterator, context)
+                except BaseException as error:
+                    call.done(_failure_code(context, error))
+                    raise
+                call.done(context.code())
+                return response
+            return wrapper
+
+        def stream_response(behavior, streaming_request):
+            def wrapper(request_or_iterator, context):
+                call = _Call(name)
+                if streaming_request:
+                    request_or_iterator = counted(call, request_or_iterator)
+                else:
+                    call.items = _item_count(request_or_iterator)
+                try:
+                    yield from behavior(request_or_iterator, context)
+                except BaseException as error:
+                    call.done(_failure_code(context, error))
+                    raise
+                call.done(context.code())
+            return wrapper
+
+        return _rebuild(handler, unary_response, stream_response)
+
+
+class AioMetricsInterceptor(grpc.aio.ServerInterceptor):
+    """grpc.aio variant of MetricsInterceptor (the handlers are coroutines and async generators)."""
+
+    def __init__(self):
+        self._handlers: dict[str, grpc.RpcMethodHandler] = {}
+
+    async def intercept_service(self, continuation, handler_call_details):
+        method = handler_call_details.method
+        wrapped = self._handlers.get(method)
+        if wrapped is None:
+            handler = await continuation(handler_call_details)
+            if handler is None:
+                return None
+            wrapped = self._handlers[method] = self._wrap(_method_name(handler_call_details), handler)
+        return wrapped
+
+    @staticmethod
+    def _wrap(name: str, handler: grpc.RpcMethodHandler) -> grpc.RpcMethodHandler:
+        async def counted(call: _Call, request_iterator):
+            async for request in request_iterator:
+                call.items += _item_count(request)
+                yield request
+
+        def unary_response(behavior, streaming_request):
+            async def wrapper(request_or_iterator, context):
+                call = _Call(name)
+                if streaming_request:
+                    request_or_iterator = counted(call, request_or_iterator)
+                else:
+                    call.items = _item_count(request_or_iterator)
+                try:
+                    response = await behavior(request_or_iterator, context)
+                except BaseException as error:
+                    call.done(_failure_code(context, error))
+                    raise
+                call.done(context.code())
+                return response
+            return wrapper
+
+        def stream_response(behavior, streaming_request):
+            async def wrapper(request_or_iterator, context):
+                call = _Call(name)
+                if streaming_request:
+                    request_or_iterator = counted(call, request_or_iterator)
+                else:
+                    call.items = _item_count(request_or_iterator)
+                try:
+                    async for response in behavior(request_or_iterator, context):
+                        yield response
+                except BaseException as error:
+                    call.done(_failure_code(context, error))
+                    raise
+                call.done(context.code())
+            return wrapper
+
+        return _rebuild(handler, unary_response, stream_response)
+
+
+def _rebuild(handler: grpc.RpcMethodHandler, unary_response, stream_response) -> grpc.RpcMethodHandler:
+    serializers = dict(request_deserializer=handler.request_deserializer,
+                       response_serializer=handler.response_serializer)
+    if handler.unary_unary:
+        return grpc.unary_unary_rpc_method_handler(unary_response(handler.unary_unary, False), **serializers)
+    if handler.stream_unary:
+        return grpc.stream_unary_rpc_method_handler(unary_response(handler.stream_unary, True), **serializers)
+    if handler.unary_stream:
+        return grpc.unary_stream_rpc_method_handler(stream_response(handler.unary_stream, False), **serializers)
+    return grpc.stream_stream_rpc_method_handler(stream_response(handler.stream_stream, True), **serializers)
@@ -1,7 +1,8 @@
 from google.protobuf.internal import containers as _containers
+from google.protobuf.internal import enum_type_wrapper as _enum_type_wrapper
 from google.protobuf import descriptor as _descriptor
 from google.protobuf import message as _message
-from collections.abc import Mapping as _Mapping
+from collections.abc import Iterable as _Iterable, Mapping as _Mapping
 from typing import ClassVar as _ClassVar, Optional as _Optional, Union as _Union
 
 DESCRIPTOR: _descriptor.FileDescriptor
@@ -95,3 +96,148 @@ class ReleaseResponse(_message.Message):
     overallSuccess: bool
     messages: _containers.ScalarMap[str, str]
     def __init__(self, overallSuccess: bool = ..., messages: _Optional[_Mapping[str, str]] = ...) -> None: ...
+
+class RestockRequest(_message.Message):
+    __slots__ = ("items",)
+    class ItemsEntry(_message.Message):
+        __slots__ = ("key", "value")
+        KEY_FIELD_NUMBER: _ClassVar[int]
+        VALUE_FIELD_NUMBER: _ClassVar[int]
+        key: str
+        value: int
+        def __init__(self, key: _Optional[str] = ..., value: _Optional[int] = ...) -> None: ...
+    ITEMS_FIELD_NUMBER: _ClassVar[int]
+    items: _containers.ScalarMap[str, int]
+    def __init__(self, items: _Optional[_Mapping[str, int]] = ...) -> None: ...
+
+class RestockResponse(_message.Message):
+    __slots__ = ("overallSuccess", "results")
+    class ResultsEntry(_message.Message):
+        __slots__ = ("key", "value")
+        KEY_FIELD_NUMBER: _ClassVar[int]
+        VALUE_FIELD_NUMBER: _ClassVar[int]
+        key: str
+        value: RestockStatus
+        def __init__(self, key: _Optional[str] = ..., value: _Optional[_Union[RestockStatus, _Mapping]] = ...) -> None: ...
+    OVERALLSUCCESS_FIELD_NUMBER: _ClassVar[int]
+    RESULTS_FIELD_NUMBER: _ClassVar[int]
+    overallSuccess: bool
+    results: _containers.MessageMap[str, RestockStatus]
+    def __init__(self, overallSuccess: bool = ..., results: _Optional[_Mapping[str, RestockStatus]] = ...) -> None: ...
+
+class RestockStatus(_message.Message):
+    __slots__ = ("success", "message", "added")
+    SUCCESS_FIELD_NUMBER: _ClassVar[int]
+    MESSAGE_FIELD_NUMBER: _ClassVar[int]
+    ADDED_FIELD_NUMBER: _ClassVar[int]
+    success: bool
+    message: str
+    added: int
+    def __init__(self, success: bool = ..., message: _Optional[str] = ..., added: _Optional[int] = ...) -> None: ...
+
+class StockImportChunk(_message.Message):
+    __slots__ = ("mode", "items")
+    class Mode(int, metaclass=_enum_type_wrapper.EnumTypeWrapper):
+        __slots__ = ()
+        DELTA: _ClassVar[StockImportChunk.Mode]
+        ABSOLUTE: _ClassVar[StockImportChunk.Mode]
+    DELTA: StockImportChunk.Mode
+    ABSOLUTE: StockImportChunk.Mode
+    class ItemsEntry(_message.Message):
+        __slots__ = ("key", "value")
+        KEY_FIELD_NUMBER: _ClassVar[int]
+        VALUE_FIELD_NUMBER: _ClassVar[int]
+        key: str
+        value: int
+        def __init__(self, key: _Optional[str] = ..., value: _Optional[int] = ...) -> None: ...
+    MODE_FIELD_NUMBER: _ClassVar[int]
+    ITEMS_FIELD_NUMBER: _ClassVar[int]
+    mode: StockImportChunk.Mode
+    items: _containers.ScalarMap[str, int]
+    def __init__(self, mode: _Optional[_Union[StockImportChunk.Mode, str]] = ..., items: _Optional[_Mapping[str, int]] = ...) -> None: ...
+
+class StockImportSummary(_message.Message):
+    __slots__ = ("chunks", "items", "created", "updated", "unchanged", "rejected", "errors")
+    class ErrorsEntry(_message.Message):
+        __slots__ = ("key", "value")
+        KEY_FIELD_NUMBER: _ClassVar[int]
+        VALUE_FIELD_NUMBER: _ClassVar[int]
+        key: str
+        value: str
+        def __init__(self, key: _Optional[str] = ..., value: _Optional[str] = ...) -> None: ...
+    CHUNKS_FIELD_NUMBER: _ClassVar[int]
+    ITEMS_FIELD_NUMBER: _ClassVar[int]
+    CREATED_FIELD_NUMBER: _ClassVar[int]
+    UPDATED_FIELD_NUMBER: _ClassVar[int]
+    UNCHANGED_FIELD_NUMBER: _ClassVar[int]
+    REJECTED_FIELD_NUMBER: _ClassVar[int]
+    ERRORS_FIELD_NUMBER: _ClassVar[int]
+    chunks: int
+    items: int
+    created: int
+    updated: int
+    unchanged: int
+    rejected: int
+    errors: _containers.ScalarMap[str, str]
+    def __init__(self, chunks: _Optional[int] = ..., items: _Optional[int] = ..., created: _Optional[int] = ..., updated: _Optional[int] = ..., unchanged: _Optional[int] = ..., rejected: _Optional[int] = ..., errors: _Optional[_Mapping[str, str]] = ...) -> None: ...
+
+class CheckAndReserveResponse(_message.Message):
+    __slots__ = ("overallSuccess", "availability", "results", "reservationId", "expiresAt")
+    class AvailabilityEntry(_message.Message):
+        __slots__ = ("key", "value")
+        KEY_FIELD_NUMBER: _ClassVar[int]
+        VALUE_FIELD_NUMBER: _ClassVar[int]
+        key: str
+        value: bool
+        def __init__(self, key: _Optional[str] = ..., value: bool = ...) -> None: ...
+    class ResultsEntry(_message.Message):
+        __slots__ = ("key", "value")
+        KEY_FIELD_NUMBER: _ClassVar[int]
+        VALUE_FIELD_NUMBER: _ClassVar[int]
+        key: str
+        value: ReserveStatus
+        def __init__(self, key: _Optional[str] = ..., value: _Optional[_Union[ReserveStatus, _Mapping]] = ...) -> None: ...
+    OVERALLSUCCESS_FIELD_NUMBER: _ClassVar[int]
+    AVAILABILITY_FIELD_NUMBER: _ClassVar[int]
+    RESULTS_FIELD_NUMBER: _ClassVar[int]
+    RESERVATIONID_FIELD_NUMBER: _ClassVar[int]
+    EXPIRESAT_FIELD_NUMBER: _ClassVar[int]
+    overallSuccess: bool
+    availability: _containers.ScalarMap[str, bool]
+    results: _containers.MessageMap[str, ReserveStatus]
+    reservationId: str
+    expiresAt: int
+    def __init__(self, overallSuccess: bool = ..., availability: _Optional[_Mapping[str, bool]] = ..., results: _Optional[_Mapping[str, ReserveStatus]] = ..., reservationId: _Optional[str] = ..., expiresAt: _Optional[int] = ...) -> None: ...
+
+class ReserveBatchRequest(_message.Message):
+    __slots__ = ("requests",)
+    REQUESTS_FIELD_NUMBER: _ClassVar[int]
+    requests: _containers.RepeatedCompositeFieldContainer[ReserveRequest]
+    def __init__(self, requests: _Optional[_Iterable[_Union[ReserveRequest, _Mapping]]] = ...) -> None: ...
+
+class ReserveBatchResponse(_message.Message):
+    __slots__ = ("responses",)
+    RESPONSES_FIELD_NUMBER: _ClassVar[int]
+    responses: _containers.RepeatedCompositeFieldContainer[CheckAndReserveResponse]
+    def __init__(self, responses: _Optional[_Iterable[_Union[CheckAndReserveResponse, _Mapping]]] = ...) -> None: ...
+
+class ReservationRequest(_message.Message):
+    __slots__ = ("reservationIds",)
+    RESERVATIONIDS_FIELD_NUMBER: _ClassVar[int]
+    reservationIds: _containers.RepeatedScalarFieldContainer[str]
+    def __init__(self, reservationIds: _Optional[_Iterable[str]] = ...) -> None: ...
+
+class ReservationResponse(_message.Message):
+    __slots__ = ("overallSuccess", "messages")
+    class MessagesEntry(_message.Message):
+        __slots__ = ("key", "value")
+        KEY_FIELD_NUMBER: _ClassVar[int]
+        VALUE_FIELD_NUMBER: _ClassVar[int]
+        key: str
+        value: str
+        def __init__(self, key: _Optional[str] = ..., value: _Optional[str] = ...) -> None: ...
+    OVERALLSUCCESS_FIELD_NUMBER: _ClassVar[int]
+    MESSAGES_FIELD_NUMBER: _ClassVar[int]
+    overallSuccess: bool
+    messages: _containers.ScalarMap[str, str]
+    def __init__(self, overallSuccess: bool = ..., messages: _Optional[_Mapping[str, str]] = ...) -> None: ...
@@ -1,22 +1,137 @@
-import json
+import asyncio
 import logging
 import os
+import signal
 import sys
+import threading
 from concurrent import futures
 
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
 import grpc
 
-from rabbitmq.message_sender import send_log_message
+from rabbitmq.message_sender import send_log_message, get_publisher
 from . import inventory_pb2
 from . import inventory_pb2_grpc
+from .interceptor import REGISTRY, AioMetricsInterceptor, MetricsInterceptor
+from .metrics import start_http_server
+from .persistence import InventoryStore, JournalError
+from .reservations import ReservationManager
+from .stock_engine import StockEngine
+from .stock_events import StockChangeNotifier
+from .stock_table import InvalidSkuError, StockTable, check_skus
 
 logger = logging.getLogger()
 
-INVENTORY_DATA: dict = json.load(open("data/mock_data_inventory.json"))
-STOCK = {"ORD-2025-11-4-1755": 0}
 ALLOW_RESTOCK = {"ORD-2025-11-4-1755"}
+LOCK_STRIPES = int(os.getenv("INVENTORY_LOCK_STRIPES", "64"))
+# Reservierungen verfallen nach TTL, wenn die OMS sie nicht bestätigt oder freigibt
+RESERVATION_TTL = float(os.getenv("INVENTORY_RESERVATION_TTL", "300"))
+SWEEP_INTERVAL = float(os.getenv("INVENTORY_SWEEP_INTERVAL", "1"))
+# aggregate: ein strukturiertes Log-Event pro RPC, verbose: zusätzlich eins pro Artikel (Debugging)
+LOG_MODE = os.getenv("INVENTORY_LOG_MODE", "aggregate")
+
+# Bestandsimport: SKUs je gesperrtem Schritt und wie viele abgelehnte SKUs in der Antwort stehen
+IMPORT_BATCH_SIZE = int(os.getenv("INVENTORY_IMPORT_BATCH_SIZE", "5000"))
+IMPORT_MAX_ERRORS = int(os.getenv("INVENTORY_IMPORT_MAX_ERRORS", "100"))
+
+# Persistenz: Snapshot + Journal im State-Verzeichnis, beim ersten Start aus den Mock-Daten befüllt
+SEED_FILE = os.getenv("INVENTORY_SEED_FILE", "data/mock_data_inventory.json")
+STATE_DIR = os.getenv("INVENTORY_STATE_DIR", "data/state")
+JOURNAL_DURABILITY = os.getenv("INVENTORY_JOURNAL_DURABILITY", "fsync")  # fsync | write | async
+CHECKPOINT_INTERVAL = float(os.getenv("INVENTORY_CHECKPOINT_INTERVAL", "60"))
+CHECKPOINT_BYTES = int(os.getenv("INVENTORY_CHECKPOINT_BYTES", str(64 * 1024 * 1024)))
+
+# Bestandsänderungen werden gesammelt und einmal pro Intervall an die OMS (Availability-Cache) gemeldet
+STOCK_EVENT_INTERVAL = float(os.getenv("INVENTORY_STOCK_EVENT_INTERVAL", "0.2"))
+NOTIFIER = StockChangeNotifier(get_publisher().publish, interval=STOCK_EVENT_INTERVAL)
+
+# Werden in init_state() beim Start gesetzt. Handler laufen parallel im ThreadPool
+# -> Bestandsänderungen nur über die StockEngine
+STORE = InventoryStore(STATE_DIR, durability=JOURNAL_DURABILITY)
+STOCK_TABLE: StockTable = None
+STOCK_ENGINE: StockEngine = None
+RESERVATIONS: ReservationManager = None
+
+# Server: "aio" (grpc.aio, Event-Loop) oder "sync" (grpc.server mit ThreadPool)
+SERVER_MODE = os.getenv("INVENTORY_SERVER_MODE", "aio")
+PORT = int(os.getenv("INVENTORY_PORT", "50051"))
+# sync: Handler-Threads; aio: Threads für die blockierenden Teile der Handler (Locks, Journal-Commit)
+MAX_WORKERS = int(os.getenv("INVENTORY_MAX_WORKERS", "32"))
+# Weitere RPCs werden mit RESOURCE_EXHAUSTED abgelehnt statt unbegrenzt zu warten (0 = kein Limit)
+MAX_CONCURRENT_RPCS = int(os.getenv("INVENTORY_MAX_CONCURRENT_RPCS", "4096"))
+SHUTDOWN_GRACE = float(os.getenv("INVENTORY_SHUTDOWN_GRACE", "10"))
+# Prometheus-Endpunkt (/metrics), 0 = aus
+METRICS_PORT = int(os.getenv("INVENTORY_METRICS_PORT", "9100"))
+
+# Keepalive-Pings der OMS-Channels (langlebige Verbindungen) zulassen
+SERVER_OPTIONS = [
+    ("grpc.keepalive_permit_without_calls", 1),
+    ("grpc.http2.min_recv_ping_interval_without_data_ms", 10000),
+    ("grpc.http2.max_ping_strikes", 0),
+    # gRPC bricht sonst ab ~1000 wartenden Calls neue mit CANCELLED ab -> Puffer über dem Limit oben
+    ("grpc.server.max_pending_requests", 2 * MAX_CONCURRENT_RPCS or 2 ** 20),
+    ("grpc.server.max_pending_requests_hard_limit", 2 * MAX_CONCURRENT_RPCS or 2 ** 20),
+]
+
+
+class RpcLog:
+    """
+    Collects the per-item outcomes of one RPC and sends them as a single structured log event.
+    Publishing only queues the event for the background publisher, so the handler thread never
+    waits for the broker. In verbose mode every item is additionally logged on its own.
+    """
+
+    def __init__(self, event: str):
+        self.event = event
+        self.items: dict = {}
+
+    def item(self, product_id: str, outcome: dict, message: str) -> None:
+        self.items[product_id] = outcome
+        if LOG_MODE == "verbose":
+            logger.info(message)
+            send_log_message("inventory", self.event, message)
+
+    def emit(self, message: str, **details) -> None:
+        if self.items:
+            details["items"] = self.items
+        send_log_message("inventory", self.event, message, details=details)
+
+
+class StockImport:
+    """
+    State of one ImportStock call. Every chunk is split into batches of IMPORT_BATCH_SIZE SKUs
+    and each batch is one locked, journaled step in the StockEngine, so live reservations only
+    ever wait for a single batch and never for the whole import.
+    """
+
+    def __init__(self):
+        self.summary = inventory_pb2.StockImportSummary()
+
+    def apply(self, chunk: inventory_pb2.StockImportChunk) -> None:
+        check_skus(chunk.items)
+        absolute = chunk.mode == inventory_pb2.StockImportChunk.ABSOLUTE
+        items = list(chunk.items.items())
+        self.summary.chunks += 1
+        for start in range(0, len(items), IMPORT_BATCH_SIZE):
+            batch = dict(items[start:start + IMPORT_BATCH_SIZE])
+            created, changed, rejected = STOCK_ENGINE.import_levels(batch, absolute)
+            self.summary.items += len(batch)
+            self.summary.created += created
+            self.summary.updated += changed
+            self.summary.rejected += len(rejected)
+            for sku in rejected[:max(IMPORT_MAX_ERRORS - len(self.summary.errors), 0)]:
+                self.summary.errors[sku] = f"Stock level would become negative ({batch[sku]})"
+
+    def finish(self) -> inventory_pb2.StockImportSummary:
+        summary = self.summary
+        summary.unchanged = summary.items - summary.updated - summary.rejected
+        RpcLog("ImportStock").emit(
+            f"Imported {summary.items} items in {summary.chunks} chunks",
+            created=summary.created, updated=summary.updated, unchanged=summary.unchanged,
+            rejected=summary.rejected,
+        )
+        return summary
 
 
 class InventoryServiceServicer(inventory_pb2_grpc.InventoryServiceServicer):
@@ -27,66 +142,201 @@ class InventoryServiceServicer(inventory_pb2_grpc.InventoryServiceServicer):
         :param context: Request context.
         :return: The map with the ids and a bool if the requested quantity is available.
         """
-        availability: dict = {}
         items: dict = request.items
-        logger.info(f"Checking availability for products with ids {items.keys()}")
+        log = RpcLog("CheckAvailability")
 
+        availability, levels = STOCK_ENGINE.check_levels(items)
         for product_id, quantity in items.items():
-            send_log_message("inventory", "CheckAvailability",
-                             f"Check availability for product {product_id}, Requested item count: {quantity}")
-            available_items: int = INVENTORY_DATA.get(product_id, 0)
-            if available_items >= quantity:
-                availability[product_id] = True
-                send_log_message("inventory", "CheckAvailability",
-                                 f"Enough items available ({available_items})")
-
-                continue
-            availability[product_id] = False
-            send_log_message("inventory", "CheckAvailability",
-                             f"Not enough items available ({available_items})")
+            log.item(product_id, {"requested": quantity, "available": levels[product_id]},
+                     f"Check availability for product {product_id}, Requested item count: {quantity}, "
+                     f"available: {levels[product_id]}")
 
+        log.emit(f"{sum(availability.values())} of {len(availability)} items available")
         return inventory_pb2.InventoryResponse(availability=availability)
 
+    def StreamAvailability(self, request_iterator, context):
+        """
+        Bidirectional streaming variant of CheckAvailability for very large requests.
+        Every incoming chunk is answered with one availability chunk as soon as it is checked, so
+        neither side has to hold the whole request in memory. gRPC flow control throttles the
+        client when responses are not read.
+        """
+        chunks = 0
+        items = 0
+        for chunk in request_iterator:
+            availability = STOCK_ENGINE.check(chunk.items)
+            chunks += 1
+            items += len(availability)
+            yield inventory_pb2.InventoryResponse(availability=availability)
+
+        RpcLog("StreamAvailability").emit(f"Checked {items} items in {chunks} chunks", chunks=chunks)
+
+    def ImportStock(self, request_iterator, context):
+        """
+        Client-streaming bulk import, e.g. the nightly warehouse feed. Chunks set absolute levels
+        or add deltas and are applied as they arrive; the summary counts all chunks. A chunk with an
+        invalid SKU aborts the call with INVALID_ARGUMENT, the chunks before it stay applied.
+        """
+        stock_import = StockImport()
+        try:
+            for chunk in request_iterator:
+                stock_import.apply(chunk)
+        except InvalidSkuError as error:
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(error))
+        return stock_import.finish()
+
     def ReserveItems(self, request, context):
+        """
+        Legacy per-item reserve without a hold: the stock is taken immediately and only comes back
+        with ReleaseItems. Nothing expires, so a reserve/release pair never returns stock twice.
+        New callers use CheckAndReserve with ConfirmReservations/ReleaseReservations.
+        """
         reserve_items: dict = request.items
+        self._check_skus(context, reserve_items)
         results: dict = {}
         overall_success: bool = True
 
-        for product_id, quantity in reserve_items.items():
-            logger.info(f"Reserving {quantity} pieces of the item {product_id}")
-            available_quantity: int = INVENTORY_DATA.get(product_id, 0)
+        log = RpcLog("ReserveItems")
 
-            if available_quantity >= quantity:
-                INVENTORY_DATA[product_id] = available_quantity - quantity
+        reserved = STOCK_ENGINE.reserve(reserve_items)
+
+        for product_id, quantity in reserve_items.items():
+            if reserved[product_id]:
                 results[product_id] = inventory_pb2.ReserveStatus(
                     success=True,
                     message=f"Reserved {quantity} units"
                 )
-                send_log_message("inventory", "ReserveItems",
-                                 f"Reserved {quantity} items of {product_id}")
+                log.item(product_id, {"requested": quantity, "reserved": True},
+                         f"Reserved {quantity} items of {product_id}")
 
                 continue
 
             results[product_id] = inventory_pb2.ReserveStatus(
                 success=False, message=f"Not enough items in the inventory."
             )
-            send_log_message("inventory", "ReserveItems",
-                             f"Couldn't reserve {quantity} items of {product_id}")
+            log.item(product_id, {"requested": quantity, "reserved": False},
+                     f"Couldn't reserve {quantity} items of {product_id}")
 
             overall_success = False
 
-        return inventory_pb2.ReserveResponse(overallSuccess=overall_success, results=results)
+        log.emit(f"Reserved {sum(reserved.values())} of {len(reserve_items)} items",
+                 overallSuccess=overall_success)
+
+        return inventory_pb2.ReserveResponse(
+            overallSuccess=overall_success,
+            results=results
+        )
+
+    def CheckAndReserve(self, request, context):
+        """
+        Checks and reserves all requested items in one step. Either every item is reserved or none.
+        :param request: The request containing a map with the ids and the quantity.
+        :param context: Request context.
+        :return: Availability per item, reservation status per item and the overall result.
+        """
+        self._check_skus(context, request.items)
+        response = self._check_and_reserve(request.items)
+
+        log = RpcLog("CheckAndReserve")
+        for product_id, quantity in request.items.items():
+            log.item(product_id, {"requested": quantity, "available": response.availability[product_id]},
+                     f"{'Reserved' if response.overallSuccess else 'Could not reserve'} {quantity} items of {product_id}")
+        log.emit(f"{'Reserved' if response.overallSuccess else 'Could not reserve'} {len(request.items)} items",
+                 overallSuccess=response.overallSuccess, reservationId=response.reservationId)
+        return response
+
+    def CheckAndReserveBatch(self, request, context):
+        """
+        Runs CheckAndReserve for several orders, in request order. Each order is all-or-nothing on its own.
+        """
+        for r in request.requests:
+            self._check_skus(context, r.items)
+        responses = [self._check_and_reserve(r.items) for r in request.requests]
+
+        reserved = sum(1 for r in responses if r.overallSuccess)
+        RpcLog("CheckAndReserveBatch").emit(f"Reserved {reserved} of {len(responses)} orders",
+                                            orders=len(responses), reserved=reserved)
+        return inventory_pb2.ReserveBatchResponse(responses=responses)
+
+    def _check_and_reserve(self, items) -> inventory_pb2.CheckAndReserveResponse:
+        results: dict = {}
+        overall_success, availability, reservation_id, expires_at = RESERVATIONS.reserve(items)
+
+        if overall_success:
+            for product_id, quantity in items.items():
+                results[product_id] = inventory_pb2.ReserveStatus(
+                    success=True, message=f"Reserved {quantity} units"
+                )
+        else:
+            for product_id, available in availability.items():
+                results[product_id] = inventory_pb2.ReserveStatus(
+                    success=False,
+                    message="Not reserved, other items unavailable" if available
+                    else "Not enough items in the inventory."
+                )
+
+        return inventory_pb2.CheckAndReserveResponse(
+            overallSuccess=overall_success,
+            availability=availability,
+            results=results,
+            reservationId=reservation_id,
+            expiresAt=int(expires_at * 1000)
+        )
+
+    def ConfirmReservations(self, request, context):
+        """
+        Confirms reservations: the held stock is sold and the holds are removed.
+        Fails for unknown or already expired reservations.
+        """
+        messages = {}
+        overall_success = True
+        for reservation_id in request.reservationIds:
+            if RESERVATIONS.confirm(reservation_id):
+                messages[reservation_id] = "Confirmed"
+            else:
+                messages[reservation_id] = "Unknown or expired reservation"
+                overall_success = False
+
+        RpcLog("ConfirmReservations").emit(f"Confirmed {len(request.reservationIds)} reservations: {overall_success}",
+                                           reservations=messages)
+        return inventory_pb2.ReservationResponse(overallSuccess=overall_success, messages=messages)
+
+    def ReleaseReservations(self, request, context):
+        """
+        Releases reservations and puts the held stock back. Unknown or already expired
+        reservations are reported but have nothing left to release.
+        """
+        messages = {}
+        overall_success = True
+        for reservation_id in request.reservationIds:
+            if RESERVATIONS.release(reservation_id):
+                messages[reservation_id] = "Released"
+            else:
+                messages[reservation_id] = "Unknown or expired reservation"
+                overall_success = False
+
+        RpcLog("ReleaseReservations").emit(f"Released {len(request.reservationIds)} reservations: {overall_success}",
+                                           reservations=messages)
+        return inventory_pb2.ReservationResponse(overallSuccess=overall_success, messages=messages)
 
     def ReleaseItems(self, request, context):
+        """
+        Puts stock back by item, the counterpart of ReserveItems. Does not touch reservation holds,
+        use ReleaseReservations for those.
+        """
         released_items = {}
         overall_success = True
 
+        self._check_skus(context, request.items)
+        log = RpcLog("ReleaseItems")
+
+        STOCK_ENGINE.release(request.items)
+
         for product_id, quantity in request.items.items():
-            available_quantity = INVENTORY_DATA.get(product_id, 0)
-            INVENTORY_DATA[product_id] = available_quantity + quantity
             released_items[product_id] = f"Released {quantity} units"
-            send_log_message("inventory", "ReleaseItems",
-                             f"Released {quantity} items of {product_id}")
+            log.item(product_id, {"released": quantity}, f"Released {quantity} items of {product_id}")
+
+        log.emit(f"Released {len(request.items)} items")
 
         return inventory_pb2.ReleaseResponse(
             overallSuccess=overall_success,
@@ -97,10 +347,11 @@ class InventoryServiceServicer(inventory_pb2_grpc.InventoryServiceServicer):
         """
         Restock nur, wenn Lagerbestand==0 und Produkt erlaubt.
         """
+        self._check_skus(context, request.items)
         results = {}
         overall = True
         for pid, qty in request.items.items():  # map<string,int32>
-            current = STOCK.get(pid, 0)
+            current = STOCK_ENGINE.available(pid)
 
             if pid not in ALLOW_RESTOCK:
                 results[pid] = inventory_pb2.RestockStatus(
@@ -117,22 +368,184 @@ class InventoryServiceServicer(inventory_pb2_grpc.InventoryServiceServicer):
                 continue
 
             added = max(qty, 1)  # bei qty==0 mindestens 1
-            STOCK[pid] = current + added
+            STOCK_ENGINE.import_levels({pid: added}, absolute=False)
             results[pid] = inventory_pb2.RestockStatus(
                 success=True, message=f"Restocked {added}", added=added
             )
 
         return inventory_pb2.RestockResponse(overallSuccess=overall, results=results)
 
+    def _check_skus(self, context, skus) -> None:
+        """Aborts the call with INVALID_ARGUMENT if a SKU cannot be stored (see stock_table.check_skus)."""
+        try:
+            check_skus(skus)
+        except InvalidSkuError as error:
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(error))
+
+
+class _PooledServicer(InventoryServiceServicer):
+    """The sync handlers as the aio servicer runs them in its thread pool."""
+
+    def _check_skus(self, context, skus) -> None:
+        # aio-Context lässt sich nur im Event-Loop abbrechen -> das übernimmt _run()
+        check_skus(skus)
+
+
+class AioInventoryServiceServicer(inventory_pb2_grpc.InventoryServiceServicer):
+    """
+    grpc.aio variant of the servicer. Unary handlers reuse the sync implementation and run in a
+    bounded thread pool, because they can block on stripe locks and on the journal commit. The
+    event loop only does the network I/O, so thousands of RPCs can be in flight at the same time
+    and waiting for fsync groups them into one commit.
+    """
+
+    def __init__(self, executor: futures.Executor):
+        self._servicer = _PooledServicer()
+        self._executor = executor
+
+    async def _run(self, handler, request, context):
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, handler, request, context)
+        except InvalidSkuError as error:
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(error))
+
+    async def CheckAvailability(self, request, context):
+        return await self._run(self._servicer.CheckAvailability, request, context)
+
+    async def StreamAvailability(self, request_iterator, context):
+        """
+        Chunks are read on the loop and checked in the thread pool: a check takes stripe locks,
+        which checkpoints and new SKUs hold across all stripes, so it must not block the loop.
+        """
+        chunks = 0
+        items = 0
+        loop = asyncio.get_running_loop()
+        async for chunk in request_iterator:
+            availability = await loop.run_in_executor(self._executor, STOCK_ENGINE.check, chunk.items)
+            chunks += 1
+            items += len(availability)
+            yield inventory_pb2.InventoryResponse(availability=availability)
+
+        RpcLog("StreamAvailability").emit(f"Checked {items} items in {chunks} chunks", chunks=chunks)
+
+    async def ImportStock(self, request_iterator, context):
+        """Chunks are read on the loop and applied in the thread pool (the batches wait for the journal)."""
+        stock_import = StockImport()
+        loop = asyncio.get_running_loop()
+        try:
+            async for chunk in request_iterator:
+                await loop.run_in_executor(self._executor, stock_import.apply, chunk)
+        except InvalidSkuError as error:
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(error))
+        return await loop.run_in_executor(self._executor, stock_import.finish)
+
+    async def ReserveItems(self, request, context):
+        return await self._run(self._servicer.ReserveItems, request, context)
+
+    async def CheckAndReserve(self, request, context):
+        return await self._run(self._servicer.CheckAndReserve, request, context)
+
+    async def CheckAndReserveBatch(self, request, context):
+        return await self._run(self._servicer.CheckAndReserveBatch, request, context)
+
+    async def ConfirmReservations(self, request, context):
+        return await self._run(self._servicer.ConfirmReservations, request, context)
+
+    async def ReleaseReservations(self, request, context):
+        return await self._run(self._servicer.ReleaseReservations, request, context)
+
+    async def ReleaseItems(self, request, context):
+        return await self._run(self._servicer.ReleaseItems, request, context)
+
+    async def RestockItems(self, request, context):
+        return await self._run(self._servicer.RestockItems, request, context)
+
+
+def init_state() -> None:
+    """Loads snapshot and journal tail (or the seed data on first start) and wires up the engine."""
+    global STOCK_TABLE, STOCK_ENGINE, RESERVATIONS
+
+    STOCK_TABLE, holds = STORE.load(SEED_FILE)
+    STOCK_ENGINE = StockEngine(STOCK_TABLE, stripes=LOCK_STRIPES, journal=STORE.journal,
+                               on_change=NOTIFIER.mark)
+    RESERVATIONS = ReservationManager(STOCK_ENGINE, ttl=RESERVATION_TTL, journal=STORE.journal)
+    RESERVATIONS.restore(holds)
+    if STORE.needs_checkpoint:
+        STORE.checkpoint(STOCK_ENGINE, RESERVATIONS)
+
+
+def start_background_tasks() -> None:
+    start_http_server(METRICS_PORT, REGISTRY)
+    RESERVATIONS.start_sweeper(SWEEP_INTERVAL)
+    STORE.start_checkpointer(STOCK_ENGINE, RESERVATIONS, CHECKPOINT_INTERVAL, CHECKPOINT_BYTES)
+    NOTIFIER.start(STOCK_ENGINE.levels)
+
+
+def shutdown_state() -> None:
+    """Stops the background threads and writes a final checkpoint, so the next start replays nothing."""
+    RESERVATIONS.stop_sweeper()
+    NOTIFIER.stop()
+    NOTIFIER.flush(STOCK_ENGINE.levels)
+    try:
+        STORE.checkpoint(STOCK_ENGINE, RESERVATIONS)
+    except JournalError:
+        logger.error("Inventory journal failed, skipping the final checkpoint")
+    STORE.close()
+    get_publisher().close()
+
+
+def _max_concurrent_rpcs():
+    return MAX_CONCURRENT_RPCS or None
+
+
 def serve():
-    server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
+    init_state()
+
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=MAX_WORKERS), options=SERVER_OPTIONS,
+                         interceptors=[MetricsInterceptor()], maximum_concurrent_rpcs=_max_concurrent_rpcs())
     inventory_pb2_grpc.add_InventoryServiceServicer_to_server(InventoryServiceServicer(), server)
-    server.add_insecure_port("[::]:50051")
-    print("Inventory Service running on port 50051...")
+    server.add_insecure_port(f"[::]:{PORT}")
+    print(f"Inventory Service running on port {PORT}...")
 
+    start_background_tasks()
     server.start()
-    server.wait_for_termination()
+
+    # SIGTERM (docker stop): keine neuen RPCs annehmen, laufende bis zur Grace-Period beenden lassen
+    stopped = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stopped.set())
+    signal.signal(signal.SIGINT, lambda *_: stopped.set())
+    stopped.wait()
+    print("Inventory Service draining...")
+    server.stop(SHUTDOWN_GRACE).wait()
+    shutdown_state()
+
+
+async def serve_aio():
+    init_state()
+
+    executor = futures.ThreadPoolExecutor(max_workers=MAX_WORKERS)
+    server = grpc.aio.server(options=SERVER_OPTIONS, interceptors=[AioMetricsInterceptor()],
+                             maximum_concurrent_rpcs=_max_concurrent_rpcs())
+    inventory_pb2_grpc.add_InventoryServiceServicer_to_server(AioInventoryServiceServicer(executor), server)
+    server.add_insecure_port(f"[::]:{PORT}")
+    print(f"Inventory Service (aio) running on port {PORT}...")
+
+    start_background_tasks()
+    await server.start()
+
+    stopped = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stopped.set)
+    await stopped.wait()
+    print("Inventory Service draining...")
+    await server.stop(SHUTDOWN_GRACE)
+    executor.shutdown(wait=True)
+    shutdown_state()
 
 
 if __name__ == "__main__":
-    serve()
+    if SERVER_MODE == "aio":
+        asyncio.run(serve_aio())
+    else:
+        serve()
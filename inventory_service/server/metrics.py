@@ -0,0 +1,143 @@
+import bisect
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Iterable, Optional
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class _Metric:
+    """
+    Base of the metric types. Label values are passed as a tuple in the order of `labels`.
+    Updates take one short lock per call; rendering copies the values under the same lock.
+    """
+
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labels: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+
+    def _label_text(self, values: tuple, extra: str = "") -> str:
+        pairs = [f'{name}="{_escape(value)}"' for name, value in zip(self.labels, values)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def samples(self) -> list[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class _Scalar(_Metric):
+    def __init__(self, name: str, documentation: str, labels: Iterable[str] = ()):
+        super().__init__(name, documentation, labels)
+        self._values: dict[tuple, float] = {}
+
+    def _add(self, values: tuple, amount: float) -> None:
+        with self._lock:
+            self._values[values] = self._values.get(values, 0) + amount
+
+    def samples(self) -> list[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [f"{self.name}{self._label_text(key)} {value}" for key, value in values]
+
+
+class Counter(_Scalar):
+    kind = "counter"
+
+    def inc(self, values: tuple = (), amount: float = 1) -> None:
+        self._add(values, amount)
+
+
+class Gauge(_Scalar):
+    kind = "gauge"
+
+    def add(self, values: tuple = (), amount: float = 1) -> None:
+        self._add(values, amount)
+
+
+class Histogram(_Metric):
+    """Fixed-bucket histogram; observe() is one bisect and three additions."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, buckets: Iterable[float], labels: Iterable[str] = ()):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+        # je Label-Kombination: [Zähler je Bucket (+Inf zuletzt), Summe, Anzahl]
+        self._series: dict[tuple, list] = {}
+
+    def observe(self, values: tuple, value: float) -> None:
+        position = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(values)
+            if series is None:
+                series = self._series[values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][position] += 1
+            series[1] += value
+            series[2] += 1
+
+    def samples(self) -> list[str]:
+        with self._lock:
+            series = sorted((key, [list(counts), total, count]) for key, (counts, total, count) in self._series.items())
+        lines = []
+        for key, (counts, total, count) in series:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{float(bound)!r}"'
+                lines.append(f"{self.name}_bucket{self._label_text(key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{self._label_text(key)} {total}")
+            lines.append(f"{self.name}_count{self._label_text(key)} {count}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: list[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        return "\n".join(metric.render() for metric in self._metrics) + "\n"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def start_http_server(port: int, registry: Registry, host: str = "") -> Optional[ThreadingHTTPServer]:
+    """Serves the registry in Prometheus text format on /metrics from a daemon thread. Port 0 disables it."""
+    if not port:
+        return None
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?", 1)[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = registry.render().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            # Scrapes nicht ins Log schreiben
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
@@ -0,0 +1,464 @@
+import json
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+from typing import Iterator, Mapping, Optional
+
+import numpy as np
+
+from .reservations import Hold, ReservationManager
+from .stock_engine import StockEngine
+from .stock_table import QTY_DTYPE, StockTable
+
+logger = logging.getLogger()
+
+SNAPSHOT_FILE = "stock.snapshot"
+JOURNAL_PREFIX = "journal."
+SNAPSHOT_MAGIC = b"INVSNAP1"
+
+# Snapshot: Header | int64-Bestände | SKU-Blob (NUL-getrennt, UTF-8) | Holds
+# Header: Magic, letzte enthaltene Journal-Seq, Anzahl SKUs, Länge SKU-Blob, Länge Holds, CRC32 des Bodys
+_SNAPSHOT_HEADER = struct.Struct("<8sQQQQI")
+# Journal-Record: CRC32 (über Seq, Typ, Payload), Seq, Typ, Payload-Länge | Payload
+_RECORD_HEADER = struct.Struct("<IQBI")
+_LEN = struct.Struct("<H")
+_COUNT = struct.Struct("<I")
+_QTY = struct.Struct("<q")
+_EXPIRES = struct.Struct("<d")
+
+RECORD_DELTA = 1
+RECORD_HOLD = 2
+RECORD_HOLD_END = 3
+# Hold und zugehörige Bestandsänderung in einem Record (ältere Journale nutzen DELTA + HOLD/HOLD_END)
+RECORD_RESERVE = 4
+RECORD_RELEASE = 5
+
+
+class JournalError(RuntimeError):
+    """The journal could not be written; it accepts no further records until restart."""
+
+
+def _encode_str(value: str) -> bytes:
+    raw = value.encode()
+    if len(raw) > 0xFFFF:
+        # Längenfeld hat 16 Bit
+        raise ValueError(f"String of {len(raw)} bytes is too long for the journal")
+    return _LEN.pack(len(raw)) + raw
+
+
+def _decode_str(buf, offset: int) -> tuple[str, int]:
+    (length,) = _LEN.unpack_from(buf, offset)
+    offset += _LEN.size
+    return bytes(buf[offset:offset + length]).decode(), offset + length
+
+
+def _encode_items(items: Mapping[str, int]) -> bytes:
+    parts = [_COUNT.pack(len(items))]
+    for sku, qty in items.items():
+        parts.append(_encode_str(sku))
+        parts.append(_QTY.pack(qty))
+    return b"".join(parts)
+
+
+def _decode_items(buf, offset: int) -> tuple[dict[str, int], int]:
+    (count,) = _COUNT.unpack_from(buf, offset)
+    offset += _COUNT.size
+    items: dict[str, int] = {}
+    for _ in range(count):
+        sku, offset = _decode_str(buf, offset)
+        (items[sku],) = _QTY.unpack_from(buf, offset)
+        offset += _QTY.size
+    return items, offset
+
+
+def _encode_hold(reservation_id: str, hold: Hold) -> bytes:
+    return _encode_str(reservation_id) + _EXPIRES.pack(hold.expires_at) + _encode_items(hold.items)
+
+
+def _decode_hold(buf, offset: int) -> tuple[str, Hold, int]:
+    reservation_id, offset = _decode_str(buf, offset)
+    (expires_at,) = _EXPIRES.unpack_from(buf, offset)
+    items, offset = _decode_items(buf, offset + _EXPIRES.size)
+    return reservation_id, Hold(items, expires_at), offset
+
+
+def _fsync_dir(directory: str) -> None:
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def write_snapshot(path: str, sku_blob: bytes, quantities: np.ndarray, holds: Mapping[str, Hold], seq: int) -> None:
+    """Writes the snapshot to a temp file and renames it into place, so a crash never leaves a torn snapshot."""
+    qty_bytes = quantities.astype(QTY_DTYPE, copy=False).tobytes()
+    hold_blob = b"".join(_encode_hold(reservation_id, hold) for reservation_id, hold in holds.items())
+
+    crc = zlib.crc32(hold_blob, zlib.crc32(sku_blob, zlib.crc32(qty_bytes)))
+    header = _SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, seq, len(quantities), len(sku_blob), len(hold_blob), crc)
+
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(header)
+        f.write(qty_bytes)
+        f.write(sku_blob)
+        f.write(hold_blob)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    _fsync_dir(os.path.dirname(path) or ".")
+
+
+def load_snapshot(path: str) -> tuple[StockTable, dict[str, Hold], int]:
+    """
+    Maps the snapshot file into memory and decodes it. Quantities are copied straight into the
+    table buffer and the SKU blob is split once; no per-SKU Python objects are kept.
+
+    Returns:
+        tuple: (stock table, holds, seq of the last journal record contained in the snapshot)
+    """
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        magic, seq, count, sku_len, hold_len, crc = _SNAPSHOT_HEADER.unpack_from(mm, 0)
+        if magic != SNAPSHOT_MAGIC:
+            raise ValueError(f"{path} is not an inventory snapshot")
+        body = memoryview(mm)[_SNAPSHOT_HEADER.size:]
+        try:
+            qty_end = count * _QTY.size
+            if len(body) != qty_end + sku_len + hold_len or zlib.crc32(body) != crc:
+                raise ValueError(f"Snapshot {path} is corrupt")
+
+            quantities = np.frombuffer(body[:qty_end], dtype=QTY_DTYPE).copy()
+            sku_blob = bytes(body[qty_end:qty_end + sku_len])
+            hold_blob = bytes(body[qty_end + sku_len:])
+        finally:
+            body.release()
+
+    holds: dict[str, Hold] = {}
+    offset = 0
+    while offset < len(hold_blob):
+        reservation_id, hold, offset = _decode_hold(hold_blob, offset)
+        holds[reservation_id] = hold
+    return StockTable.from_blob(sku_blob, quantities), holds, seq
+
+
+def read_journal(path: str) -> Iterator[tuple[int, int, bytes]]:
+    """
+    Yields (seq, kind, payload) for every complete record of a journal segment. A torn or corrupt
+    record at the tail (crash during write) ends the segment; the file is cut back to the last
+    good record.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    offset = 0
+    while offset + _RECORD_HEADER.size <= len(data):
+        crc, seq, kind, length = _RECORD_HEADER.unpack_from(data, offset)
+        end = offset + _RECORD_HEADER.size + length
+        if end > len(data) or zlib.crc32(data[offset + 4:end]) != crc:
+            break
+        yield seq, kind, data[offset + _RECORD_HEADER.size:end]
+        offset = end
+    if offset < len(data):
+        logger.warning(f"Truncating torn journal tail in {path} at byte {offset}")
+        with open(path, "r+b") as f:
+            f.truncate(offset)
+
+
+def journal_segments(directory: str) -> list[tuple[int, str]]:
+    """Returns (first seq, path) of all journal segments, oldest first."""
+    segments = []
+    for name in os.listdir(directory):
+        if name.startswith(JOURNAL_PREFIX) and name[len(JOURNAL_PREFIX):].isdigit():
+            segments.append((int(name[len(JOURNAL_PREFIX):]), os.path.join(directory, name)))
+    return sorted(segments)
+
+
+class _Rotation:
+    def __init__(self, next_seq: int):
+        self.next_seq = next_seq
+        self.done = threading.Event()
+
+
+class Journal:
+    """
+    Append-only journal of stock deltas and reservation holds, split into segment files.
+
+    Callers only encode their record and queue it; a single writer thread drains everything that
+    queued up meanwhile, writes it with one write() and one fsync() (group commit) and then wakes
+    all waiters of that group. Durability modes: "fsync" waits for fsync, "write" waits until
+    the data is handed to the OS, "async" does not wait at all.
+
+    If a write or fsync fails, the journal becomes unhealthy: waiters of the unwritten records
+    and every later append() or rotate() raise JournalError.
+    """
+
+    def __init__(self, directory: str, next_seq: int, durability: str = "fsync"):
+        self._directory = directory
+        self._durability = durability
+        self._lock = threading.Lock()
+        self._work = threading.Condition(self._lock)
+        self._committed = threading.Condition()
+        self._queue: list = []
+        self._seq = next_seq - 1
+        self._durable_seq = next_seq - 1
+        self._segment_bytes = 0
+        self._closed = False
+        self._error: Optional[OSError] = None
+        self._file = self._open_segment(next_seq)
+        self._writer = threading.Thread(target=self._run, name="inventory-journal", daemon=True)
+        self._writer.start()
+
+    def _open_segment(self, first_seq: int):
+        path = os.path.join(self._directory, f"{JOURNAL_PREFIX}{first_seq:020d}")
+        f = open(path, "ab")
+        _fsync_dir(self._directory)
+        return f
+
+    @property
+    def healthy(self) -> bool:
+        return self._error is None
+
+    def _check(self) -> None:
+        if self._error is not None:
+            raise JournalError("Inventory journal is not writable") from self._error
+
+    def _append(self, kind: int, payload: bytes) -> int:
+        with self._lock:
+            self._check()
+            self._seq += 1
+            seq = self._seq
+            body = struct.pack("<QBI", seq, kind, len(payload)) + payload
+            self._queue.append((seq, _COUNT.pack(zlib.crc32(body)) + body))
+            self._work.notify()
+        return seq
+
+    def append_delta(self, changes: Mapping[str, int]) -> int:
+        """Journals a stock change (SKU -> signed delta) as one atomic record. Returns its seq."""
+        return self._append(RECORD_DELTA, _encode_items(changes))
+
+    def append_hold_end(self, reservation_id: str) -> int:
+        return self._append(RECORD_HOLD_END, _encode_str(reservation_id))
+
+    def append_reserve(self, reservation_id: str, hold: Hold, changes: Mapping[str, int]) -> int:
+        """Journals a new hold together with the stock it takes, so replay never sees one without the other."""
+        return self._append(RECORD_RESERVE, _encode_hold(reservation_id, hold) + _encode_items(changes))
+
+    def append_release(self, reservation_id: str, changes: Mapping[str, int]) -> int:
+        """Journals the end of a hold together with the stock it puts back."""
+        return self._append(RECORD_RELEASE, _encode_str(reservation_id) + _encode_items(changes))
+
+    def wait(self, seq: Optional[int]) -> None:
+        """
+        Blocks until the record with the given seq is committed (according to the durability mode).
+
+        Raises:
+            JournalError: writing the journal failed, the record is not durable.
+        """
+        if seq is None or self._durability == "async":
+            return
+        with self._committed:
+            while self._durable_seq < seq and not self._closed and self._error is None:
+                self._committed.wait()
+            if self._durable_seq < seq:
+                self._check()
+
+    def rotate(self) -> tuple[int, threading.Event]:
+        """
+        Starts a new segment. Returns the last seq of the old segments and an event that is set
+        once the writer has closed them. The caller must make sure no records are appended
+        concurrently if the cut has to be consistent with other state (see InventoryStore.checkpoint).
+        """
+        with self._lock:
+            self._check()
+            rotation = _Rotation(self._seq + 1)
+            self._queue.append(rotation)
+            self._work.notify()
+            return self._seq, rotation.done
+
+    def size(self) -> int:
+        """Bytes written to the current segment."""
+        return self._segment_bytes
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+            self._work.notify()
+        self._writer.join()
+        self._file.close()
+
+    def _sync(self) -> None:
+        self._file.flush()
+        if self._durability == "fsync":
+            os.fsync(self._file.fileno())
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                while not self._queue and not self._closed:
+                    self._work.wait()
+                if not self._queue:
+                    break
+                batch, self._queue = self._queue, []
+
+            last_seq = None
+            pending: list[bytes] = []
+            try:
+                for entry in batch:
+                    if isinstance(entry, _Rotation):
+                        self._file.write(b"".join(pending))
+                        pending = []
+                        self._sync()
+                        self._file.close()
+                        self._file = self._open_segment(entry.next_seq)
+                        self._segment_bytes = 0
+                        entry.done.set()
+                        continue
+                    last_seq, record = entry
+                    pending.append(record)
+                    self._segment_bytes += len(record)
+                if pending:
+                    self._file.write(b"".join(pending))
+                self._sync()
+            except OSError as e:
+                # nichts davon als dauerhaft melden: Wartende scheitern, neue Records werden abgelehnt
+                logger.exception("Writing the inventory journal failed, rejecting further changes")
+                self._fail(e, batch)
+                return
+
+            if last_seq is not None:
+                with self._committed:
+                    self._durable_seq = last_seq
+                    self._committed.notify_all()
+
+        with self._committed:
+            self._committed.notify_all()
+
+    def _fail(self, error: OSError, batch: list) -> None:
+        with self._lock:
+            self._error = error
+            batch = batch + self._queue
+            self._queue = []
+        # Checkpoints, die auf eine Rotation warten, nicht hängen lassen
+        for entry in batch:
+            if isinstance(entry, _Rotation):
+                entry.done.set()
+        with self._committed:
+            self._committed.notify_all()
+
+
+class InventoryStore:
+    """
+    Durable inventory state: a binary snapshot plus the journal of everything that happened after it.
+
+    load() maps the snapshot (or seeds from the JSON mock data on first start) and replays only
+    the journal tail. checkpoint() writes a new snapshot and deletes the journal segments it covers,
+    so the tail to replay stays short.
+    """
+
+    def __init__(self, directory: str, durability: str = "fsync"):
+        self.directory = directory
+        self.snapshot_path = os.path.join(directory, SNAPSHOT_FILE)
+        self.durability = durability
+        self.journal: Optional[Journal] = None
+        self.needs_checkpoint = False
+        self._checkpoint_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._checkpointer: Optional[threading.Thread] = None
+
+    def load(self, seed_path: str) -> tuple[StockTable, dict[str, Hold]]:
+        """Restores stock and open holds and opens the journal for new records."""
+        os.makedirs(self.directory, exist_ok=True)
+        started = time.perf_counter()
+
+        if os.path.exists(self.snapshot_path):
+            stock, holds, seq = load_snapshot(self.snapshot_path)
+        else:
+            with open(seed_path) as f:
+                stock = StockTable.from_dict(json.load(f))
+            holds, seq = {}, 0
+            self.needs_checkpoint = True
+
+        replayed = 0
+        last_seq = seq
+        for _, path in journal_segments(self.directory):
+            for record_seq, kind, payload in read_journal(path):
+                last_seq = max(last_seq, record_seq)
+                if record_seq <= seq:
+                    continue
+                self._apply(stock, holds, kind, payload)
+                replayed += 1
+
+        self.needs_checkpoint = self.needs_checkpoint or replayed > 0
+        self.journal = Journal(self.directory, next_seq=last_seq + 1, durability=self.durability)
+        logger.info(f"Loaded {len(stock)} SKUs and {len(holds)} holds, replayed {replayed} journal records "
+                    f"in {time.perf_counter() - started:.2f}s")
+        return stock, holds
+
+    @staticmethod
+    def _apply(stock: StockTable, holds: dict[str, Hold], kind: int, payload: bytes) -> None:
+        if kind == RECORD_DELTA:
+            changes, _ = _decode_items(payload, 0)
+            stock.apply(changes)
+        elif kind == RECORD_HOLD:
+            reservation_id, hold, _ = _decode_hold(payload, 0)
+            holds[reservation_id] = hold
+        elif kind == RECORD_HOLD_END:
+            reservation_id, _ = _decode_str(payload, 0)
+            holds.pop(reservation_id, None)
+        elif kind == RECORD_RESERVE:
+            reservation_id, hold, offset = _decode_hold(payload, 0)
+            changes, _ = _decode_items(payload, offset)
+            stock.apply(changes)
+            holds[reservation_id] = hold
+        elif kind == RECORD_RELEASE:
+            reservation_id, offset = _decode_str(payload, 0)
+            changes, _ = _decode_items(payload, offset)
+            stock.apply(changes)
+            holds.pop(reservation_id, None)
+
+    def checkpoint(self, engine: StockEngine, reservations: ReservationManager) -> None:
+        """
+        Writes a snapshot consistent with the journal: stock, holds and the journal cut are taken
+        while all stripes and the reservation lock are held, the file itself is written afterwards.
+        """
+        with self._checkpoint_lock:
+            with engine.frozen() as (keys, quantities), reservations.frozen() as holds:
+                seq, rotated = self.journal.rotate()
+            write_snapshot(self.snapshot_path, StockTable.sku_blob(keys), quantities, holds, seq)
+            rotated.wait()
+            for first_seq, path in journal_segments(self.directory):
+                if first_seq <= seq:
+                    os.remove(path)
+            self.needs_checkpoint = False
+
+    def start_checkpointer(self, engine: StockEngine, reservations: ReservationManager,
+                           interval: float, max_bytes: int) -> None:
+        """Checkpoints when the journal segment exceeds max_bytes or has been open for `interval` seconds."""
+
+        def run():
+            last = time.monotonic()
+            while not self._stop.wait(1.0):
+                size = self.journal.size()
+                if size >= max_bytes or (size and time.monotonic() - last >= interval):
+                    try:
+                        self.checkpoint(engine, reservations)
+                    except JournalError:
+                        logger.error("Inventory journal failed, stopping checkpoints")
+                        return
+                    except OSError:
+                        logger.exception("Inventory checkpoint failed")
+                    last = time.monotonic()
+
+        self._checkpointer = threading.Thread(target=run, name="inventory-checkpoint", daemon=True)
+        self._checkpointer.start()
+
+    def close(self) -> None:
+        self._stop.set()
+        if self._checkpointer is not None:
+            self._checkpointer.join()
+        if self.journal is not None:
+            self.journal.close()
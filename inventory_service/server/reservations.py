@@ -0,0 +1,153 @@
+import heapq
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Mapping, Optional
+
+from .stock_engine import StockEngine
+
+
+class _HoldEnded(Exception):
+    """The hold was confirmed or released while its stripes were being acquired."""
+
+
+@dataclass
+class Hold:
+    items: dict[str, int]
+    expires_at: float  # Unix-Zeit in Sekunden
+
+
+class ReservationManager:
+    """
+    Tracks reservations as holds with an expiry time. Stock is taken from the StockEngine when
+    the hold is created; confirm() keeps it taken, release() or expiry gives it back.
+
+    Expiry uses a min-heap of (expires_at, reservation_id): pushing and popping a hold costs
+    O(log n) and the sweeper only looks at holds that are actually due. Confirmed or released
+    holds stay in the heap and are skipped when they come up.
+
+    With a journal, creating and ending a hold is journaled so open holds survive a restart. A
+    hold and the stock it takes (or puts back on release and expiry) are one record, written
+    while the stripes of its SKUs are held, so a crash never leaves stock taken without its hold.
+    Lock order is stripes before the manager lock, the same as in InventoryStore.checkpoint().
+    """
+
+    def __init__(self, engine: StockEngine, ttl: float, journal=None):
+        self._engine = engine
+        self._ttl = ttl
+        self._journal = journal
+        self._holds: dict[str, Hold] = {}
+        self._heap: list[tuple[float, str]] = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._sweeper: Optional[threading.Thread] = None
+
+    def reserve(self, items: Mapping[str, int]) -> tuple[bool, dict[str, bool], str, float]:
+        """
+        Checks and reserves all items or none and registers them as a hold in the same step.
+
+        Returns:
+            tuple: (overall success, availability per SKU, reservation_id, expires_at); the id is
+            "" and expires_at 0 if nothing was reserved.
+        """
+        reservation_id = uuid.uuid4().hex
+        expires_at = time.time() + self._ttl
+        hold = Hold(dict(items), expires_at)
+
+        def record(changes: Mapping[str, int]) -> Optional[int]:
+            with self._lock:
+                seq = self._journal.append_reserve(reservation_id, hold, changes) if self._journal else None
+                self._holds[reservation_id] = hold
+                heapq.heappush(self._heap, (expires_at, reservation_id))
+            return seq
+
+        ok, availability = self._engine.check_and_reserve(items, record=record)
+        if not ok:
+            return False, availability, "", 0
+        return True, availability, reservation_id, expires_at
+
+    def _pop(self, reservation_id: str) -> tuple[Optional[Hold], Optional[int]]:
+        """Removes a hold and journals its end. Caller holds the lock."""
+        hold = self._holds.get(reservation_id)
+        seq = None
+        if hold is not None:
+            if self._journal:
+                seq = self._journal.append_hold_end(reservation_id)
+            del self._holds[reservation_id]
+        return hold, seq
+
+    def _commit(self, seq: Optional[int]) -> None:
+        if seq is not None:
+            self._journal.wait(seq)
+
+    def confirm(self, reservation_id: str) -> bool:
+        with self._lock:
+            hold, seq = self._pop(reservation_id)
+        self._commit(seq)
+        return hold is not None
+
+    def release(self, reservation_id: str) -> bool:
+        with self._lock:
+            hold = self._holds.get(reservation_id)
+        return hold is not None and self._release(reservation_id, hold)
+
+    def _release(self, reservation_id: str, hold: Hold) -> bool:
+        """Ends the hold and puts its stock back in one journaled step, unless it ended meanwhile."""
+
+        def record(changes: Mapping[str, int]) -> Optional[int]:
+            with self._lock:
+                if self._holds.get(reservation_id) is not hold:
+                    raise _HoldEnded(reservation_id)
+                seq = self._journal.append_release(reservation_id, changes) if self._journal else None
+                del self._holds[reservation_id]
+            return seq
+
+        try:
+            self._engine.release(hold.items, record=record)
+        except _HoldEnded:
+            return False
+        return True
+
+    def expire_due(self, now: Optional[float] = None) -> int:
+        """Releases every hold whose expiry time has passed. Returns the number of expired holds."""
+        now = time.time() if now is None else now
+        due: list[tuple[str, Hold]] = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                expires_at, reservation_id = heapq.heappop(self._heap)
+                hold = self._holds.get(reservation_id)
+                if hold is not None and hold.expires_at == expires_at:
+                    due.append((reservation_id, hold))
+        # Bestand außerhalb des Manager-Locks zurückbuchen (erst die Stripes, dann der Lock)
+        return sum(1 for reservation_id, hold in due if self._release(reservation_id, hold))
+
+    def restore(self, holds: Mapping[str, Hold]) -> None:
+        """Re-registers holds loaded from persistence; their stock is already taken."""
+        with self._lock:
+            for reservation_id, hold in holds.items():
+                self._holds[reservation_id] = hold
+                heapq.heappush(self._heap, (hold.expires_at, reservation_id))
+
+    @contextmanager
+    def frozen(self):
+        """Holds the manager lock and yields a copy of all open holds (for snapshots)."""
+        with self._lock:
+            yield dict(self._holds)
+
+    def active(self) -> int:
+        return len(self._holds)
+
+    def start_sweeper(self, interval: float) -> None:
+        def run():
+            while not self._stop.wait(interval):
+                expired = self.expire_due()
+                if expired:
+                    print(f"Expired {expired} reservations")
+
+        self._sweeper = threading.Thread(target=run, name="reservation-sweeper", daemon=True)
+        self._sweeper.start()
+
+    def stop_sweeper(self) -> None:
+        self._stop.set()
@@ -0,0 +1,202 @@
+import threading
+from contextlib import contextmanager
+from typing import Callable, Iterable, Mapping, Optional, Union
+
+import numpy as np
+
+from .stock_table import QTY_DTYPE, StockTable
+
+
+class StockEngine:
+    """
+    Stock levels per SKU, safe for concurrent gRPC handler threads.
+
+    Uses lock striping: every SKU maps to one of `stripes` locks (by its dense index in the
+    StockTable), so requests on different SKUs run in parallel. A request acquires all stripes of
+    its SKUs in ascending stripe order, which makes multi-item operations atomic and rules out
+    deadlocks between overlapping requests. Adding SKUs takes every stripe, because the table
+    buffer may be reallocated.
+
+    Each request is resolved to an index array once and then checked and updated with vectorized
+    compare/subtract on the table, so large carts cost one NumPy operation instead of a Python
+    loop per item.
+
+    With a journal every change is recorded while its stripes are still held and before it is
+    applied, so the journal order per SKU matches the in-memory order and a rejected record
+    (JournalError) leaves the stock untouched. The commit wait happens after the locks are released.
+    on_change is called with the changed SKUs after every committed change (outside the locks).
+    """
+
+    def __init__(self, stock: Union[StockTable, Mapping[str, int]], stripes: int = 64, journal=None,
+                 on_change: Optional[Callable[[Iterable[str]], None]] = None):
+        self._table = stock if isinstance(stock, StockTable) else StockTable.from_dict(stock)
+        self._locks = [threading.Lock() for _ in range(max(stripes, 1))]
+        self._journal = journal
+        self._on_change = on_change
+
+    def _stripes(self, idx: np.ndarray) -> list[threading.Lock]:
+        stripes = np.bincount(idx[idx >= 0] % len(self._locks), minlength=len(self._locks))
+        return [self._locks[i] for i in np.flatnonzero(stripes).tolist()]
+
+    @contextmanager
+    def _locked(self, idx: np.ndarray):
+        locks = self._stripes(idx)
+        for lock in locks:
+            lock.acquire()
+        try:
+            yield
+        finally:
+            for lock in reversed(locks):
+                lock.release()
+
+    @contextmanager
+    def locked(self, skus: Iterable[str]):
+        """Holds the stripe locks of all given SKUs (deterministic order)."""
+        with self._locked(self._table.lookup(list(skus))):
+            yield
+
+    @contextmanager
+    def _all_locked(self):
+        for lock in self._locks:
+            lock.acquire()
+        try:
+            yield
+        finally:
+            for lock in reversed(self._locks):
+                lock.release()
+
+    @contextmanager
+    def frozen(self):
+        """Holds every stripe and yields a consistent StockTable.export() (for snapshots)."""
+        with self._all_locked():
+            yield self._table.export()
+
+    def ensure(self, skus: Iterable[str]) -> int:
+        """Interns SKUs that are not in the table yet (quantity 0). Returns the number of new SKUs."""
+        skus = list(skus)
+        if not self._table.missing(skus):
+            return 0
+        with self._all_locked():
+            new = self._table.missing(skus)
+            if new:
+                self._table.add(new)
+        return len(new)
+
+    def _resolve(self, items: Mapping[str, int]) -> tuple[list[str], np.ndarray, np.ndarray]:
+        skus = list(items)
+        requested = np.fromiter(items.values(), dtype=QTY_DTYPE, count=len(skus))
+        return skus, self._table.lookup(skus), requested
+
+    def _record(self, changes: Mapping[str, int]) -> Optional[int]:
+        if self._journal is None or not changes:
+            return None
+        return self._journal.append_delta(changes)
+
+    def _commit(self, seq: Optional[int], changes: Mapping[str, int]) -> None:
+        if seq is not None:
+            self._journal.wait(seq)
+        if self._on_change is not None and changes:
+            self._on_change(changes.keys())
+
+    def available(self, sku: str) -> int:
+        return self._table.get(sku)
+
+    def snapshot(self) -> dict[str, int]:
+        with self._all_locked():
+            return self._table.to_dict()
+
+    def levels(self, skus: Iterable[str]) -> dict[str, int]:
+        skus = list(skus)
+        idx = self._table.lookup(skus)
+        with self._locked(idx):
+            return dict(zip(skus, self._table.gather(idx).tolist()))
+
+    def check(self, items: Mapping[str, int]) -> dict[str, bool]:
+        skus, idx, requested = self._resolve(items)
+        with self._locked(idx):
+            ok = self._table.gather(idx) >= requested
+        return dict(zip(skus, ok.tolist()))
+
+    def check_levels(self, items: Mapping[str, int]) -> tuple[dict[str, bool], dict[str, int]]:
+        """Like check(), additionally returns the current level per SKU (read in the same lock scope)."""
+        skus, idx, requested = self._resolve(items)
+        with self._locked(idx):
+            levels = self._table.gather(idx)
+        return dict(zip(skus, (levels >= requested).tolist())), dict(zip(skus, levels.tolist()))
+
+    def reserve(self, items: Mapping[str, int]) -> dict[str, bool]:
+        """Reserves every item that is available on its own; returns success per SKU."""
+        skus, idx, requested = self._resolve(items)
+        with self._locked(idx):
+            ok = self._table.gather(idx) >= requested
+            take = ok & (idx >= 0) & (requested != 0)
+            changes = {skus[i]: -int(requested[i]) for i in np.flatnonzero(take).tolist()}
+            seq = self._record(changes)
+            self._table.add_at(idx[take], -requested[take])
+        self._commit(seq, changes)
+        return dict(zip(skus, ok.tolist()))
+
+    def check_and_reserve(self, items: Mapping[str, int],
+                          record: Optional[Callable[[Mapping[str, int]], Optional[int]]] = None
+                          ) -> tuple[bool, dict[str, bool]]:
+        """
+        Reserves all items or none. Returns the overall result and the availability per SKU.
+
+        record, if given, journals a successful reservation instead of a plain delta record: it is
+        called with the changes while the stripes are held, before they are applied, and returns
+        the journal seq (see ReservationManager.reserve). If it raises, nothing is reserved.
+        """
+        skus, idx, requested = self._resolve(items)
+        with self._locked(idx):
+            available = self._table.gather(idx) >= requested
+            ok = bool(available.all())
+            changes = {}
+            seq = None
+            if ok:
+                take = (idx >= 0) & (requested != 0)
+                changes = {skus[i]: -int(requested[i]) for i in np.flatnonzero(take).tolist()}
+                seq = record(changes) if record is not None else self._record(changes)
+                self._table.add_at(idx[take], -requested[take])
+        self._commit(seq, changes)
+        return ok, dict(zip(skus, available.tolist()))
+
+    def import_levels(self, items: Mapping[str, int], absolute: bool) -> tuple[int, int, list[str]]:
+        """
+        Applies one batch of a stock import: absolute levels or signed deltas per SKU, in one
+        locked and journaled step. Unknown SKUs are created. Updates that would leave a negative
+        level are rejected, the rest of the batch is applied anyway.
+
+        Returns:
+            tuple: (number of created SKUs, number of changed levels, rejected SKUs)
+        """
+        skus = list(items)
+        values = np.fromiter(items.values(), dtype=QTY_DTYPE, count=len(skus))
+        # negative Werte können für neue SKUs nie gültig sein -> nicht erst anlegen
+        created = self.ensure(skus[i] for i in np.flatnonzero(values >= 0).tolist())
+        idx = self._table.lookup(skus)
+        with self._locked(idx):
+            current = self._table.gather(idx)
+            target = values if absolute else current + values
+            ok = (idx >= 0) & (target >= 0)
+            delta = target - current
+            write = ok & (delta != 0)
+            changes = {skus[i]: int(delta[i]) for i in np.flatnonzero(write).tolist()}
+            seq = self._record(changes)
+            self._table.add_at(idx[write], delta[write])
+        self._commit(seq, changes)
+        return created, len(changes), [skus[i] for i in np.flatnonzero(~ok).tolist()]
+
+    def release(self, items: Mapping[str, int],
+                record: Optional[Callable[[Mapping[str, int]], Optional[int]]] = None) -> None:
+        """Puts stock back. record works like in check_and_reserve(); if it raises, nothing is put back."""
+        if not items and record is None:
+            return
+        self.ensure(items)
+        skus, idx, requested = self._resolve(items)
+        # nach ensure() sind alle SKUs bekannt; -1 würde in add_at() den letzten Bestand treffen
+        known = idx >= 0
+        with self._locked(idx):
+            changes = {skus[i]: int(requested[i]) for i in np.flatnonzero(known).tolist()}
+            seq = record(changes) if record is not None else self._record(changes)
+            self._table.add_at(idx[known], requested[known])
+        self._commit(seq, changes)
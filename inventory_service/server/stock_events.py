@@ -0,0 +1,53 @@
+import threading
+import time
+from typing import Callable, Iterable, Optional
+
+EXCHANGE_NAME = "inventory_event"
+ROUTING_KEY = "stock.changed"
+
+
+class StockChangeNotifier:
+    """
+    Publishes the current stock level of changed SKUs, so the OMS can keep its availability cache fresh.
+
+    Handlers only mark SKUs as changed (a set insert). A background thread publishes, once per
+    interval, the latest level of every SKU changed since the last run. A hot SKU that changes a
+    thousand times per second therefore costs one entry per interval, not one message per change.
+    """
+
+    def __init__(self, publish: Callable[[str, str, dict], bool], interval: float, max_skus: int = 1000):
+        self._publish = publish
+        self._interval = interval
+        self._max_skus = max_skus
+        self._changed: set[str] = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def mark(self, skus: Iterable[str]) -> None:
+        with self._lock:
+            self._changed.update(skus)
+
+    def start(self, levels: Callable[[Iterable[str]], dict[str, int]]) -> None:
+        """Starts publishing; `levels` returns the current stock for a list of SKUs (StockEngine.levels)."""
+
+        def run():
+            while not self._stop.wait(self._interval):
+                self.flush(levels)
+
+        self._thread = threading.Thread(target=run, name="stock-change-notifier", daemon=True)
+        self._thread.start()
+
+    def flush(self, levels: Callable[[Iterable[str]], dict[str, int]]) -> None:
+        with self._lock:
+            changed, self._changed = self._changed, set()
+        if not changed:
+            return
+        changed = list(changed)
+        for start in range(0, len(changed), self._max_skus):
+            current = levels(changed[start:start + self._max_skus])
+            # Verlorene Events sind unkritisch: die OMS verwirft Cache-Einträge nach ihrer TTL
+            self._publish(EXCHANGE_NAME, ROUTING_KEY, {"levels": current, "timestamp": time.time()})
+
+    def stop(self) -> None:
+        self._stop.set()
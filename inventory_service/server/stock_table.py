@@ -0,0 +1,268 @@
+from typing import Iterable, Mapping, Optional
+
+import numpy as np
+
+QTY_DTYPE = np.dtype("<i8")
+EMPTY = -1
+# Slots pro SKU (Lastfaktor <= 0.25 hält die Sondierungsketten kurz)
+SLOT_FACTOR = 4
+# Rest einer Sondierung, ab dem Einzelschritte billiger sind als ein weiterer Vektor-Durchlauf
+SCALAR_PROBES = 16
+# längste SKU in UTF-8-Bytes: der Hash gewichtet höchstens 64 Wörter à 8 Bytes
+MAX_SKU_BYTES = 512
+
+_MASK64 = 2 ** 64 - 1
+_MIX = 0xFF51AFD7ED558CCD
+_WEIGHTS = [((2 * j + 1) * 0x9E3779B97F4A7C15) & _MASK64 for j in range(64)]
+
+
+class InvalidSkuError(ValueError):
+    """A SKU the table cannot store: empty, longer than MAX_SKU_BYTES or containing NUL."""
+
+
+def check_skus(skus: Iterable[str]) -> None:
+    """
+    Raises InvalidSkuError for the first SKU the table cannot store. Keys are NUL-padded (and
+    NUL-separated in the snapshot), so a NUL inside a SKU would make it collide with another one.
+    """
+    for sku in skus:
+        if not sku or "\0" in sku or len(sku.encode()) > MAX_SKU_BYTES:
+            raise InvalidSkuError(f"Invalid SKU {sku[:64]!r}: expected 1-{MAX_SKU_BYTES} UTF-8 bytes without NUL")
+
+
+def _hash(keys: np.ndarray) -> np.ndarray:
+    """
+    Vectorized 64-bit hash of fixed-width keys (itemsize a multiple of 8).
+
+    The 8-byte words are weighted by position, summed and mixed. Zero padding adds nothing, so
+    the hash does not depend on the width of the array a key is stored in.
+    """
+    words = keys.view("<u8").reshape(len(keys), -1)
+    h = np.zeros(len(keys), dtype=np.uint64)
+    for j in range(words.shape[1]):
+        h += words[:, j] * np.uint64(_WEIGHTS[j])
+    h ^= h >> np.uint64(32)
+    h *= np.uint64(_MIX)
+    h ^= h >> np.uint64(29)
+    return h.view(np.int64)
+
+
+def _hash_one(key: bytes) -> int:
+    """Same hash as _hash() for a single key, in plain Python (cheaper for a handful of SKUs)."""
+    x = int.from_bytes(key, "little")
+    h = 0
+    j = 0
+    while x:
+        h += (x & _MASK64) * _WEIGHTS[j]
+        x >>= 64
+        j += 1
+    h &= _MASK64
+    h ^= h >> 32
+    h = (h * _MIX) & _MASK64
+    h ^= h >> 29
+    return h - 2 ** 64 if h >= 2 ** 63 else h
+
+
+def _key_dtype(width: int) -> np.dtype:
+    return np.dtype(f"S{max(8, -(-width // 8) * 8)}")
+
+
+def _grown(array: np.ndarray, capacity: int, fill=0) -> np.ndarray:
+    grown = np.full(capacity, fill, dtype=array.dtype)
+    grown[:len(array)] = array
+    return grown
+
+
+def _build_slots(keys: np.ndarray, size: int) -> np.ndarray:
+    """Fresh slot table for the first `size` keys."""
+    slot_count = 16
+    while slot_count < SLOT_FACTOR * size:
+        slot_count *= 2
+    slots = np.full(slot_count, EMPTY, dtype=np.int32)
+    _insert(keys, slots, 0, size)
+    return slots
+
+
+def _insert(keys: np.ndarray, slots: np.ndarray, start: int, stop: int) -> None:
+    """Puts the indexes start..stop into free slots; collisions probe the next slot in the next pass."""
+    mask = len(slots) - 1
+    pending = np.arange(start, stop, dtype=np.int32)
+    probe = _hash(keys[start:stop]) & mask
+    while len(pending):
+        free = slots[probe] == EMPTY
+        # pro freiem Slot gewinnt genau ein Kandidat
+        taken, first = np.unique(probe[free], return_index=True)
+        winners = np.flatnonzero(free)[first]
+        slots[taken] = pending[winners]
+        placed = np.zeros(len(pending), dtype=bool)
+        placed[winners] = True
+        pending = pending[~placed]
+        probe = (probe[~placed] + 1) & mask
+
+
+def _probe(keys: np.ndarray, slots: np.ndarray, key: bytes, slot: int) -> int:
+    mask = len(slots) - 1
+    while True:
+        candidate = slots.item(slot)
+        if candidate == EMPTY or keys.item(candidate) == key:
+            return candidate
+        slot = (slot + 1) & mask
+
+
+class StockTable:
+    """
+    Stock levels in one contiguous int64 buffer, addressed by dense SKU indexes.
+
+    Every SKU is interned once to an index: its UTF-8 bytes go into a fixed-width byte array
+    (padded to 8-byte words) and an open-addressing hash table (`slots`, int32, linear probing,
+    load factor <= 0.25) maps hash -> index. A request is resolved with a few vectorized passes
+    over that table instead of one dict lookup per item, and a SKU costs its padded bytes plus
+    24 bytes or less (quantity, slots) instead of a str, an int and a dict entry.
+
+    Indexes never change; new SKUs are appended and all buffers double their capacity when full.
+    Lookups take no lock: keys and slots are published together as one tuple, and add() fills new
+    arrays and swaps that tuple only when they are complete, so a lookup always sees a whole table.
+    Quantities are not thread-safe: the StockEngine guards them with its stripe locks and holds
+    all of them when SKUs are added (the quantity buffer may be reallocated).
+    """
+
+    def __init__(self, keys: Optional[np.ndarray] = None, quantities: Optional[np.ndarray] = None):
+        keys = np.empty(0, dtype="S8") if keys is None else keys.astype(_key_dtype(keys.dtype.itemsize))
+        self._size = len(keys)
+        capacity = max(self._size, 16)
+        keys = _grown(keys, capacity, b"")
+        self._qty = np.zeros(capacity, dtype=QTY_DTYPE)
+        if self._size:
+            self._qty[:self._size] = quantities
+        # (keys, slots) werden immer zusammen ausgetauscht
+        self._index = (keys, _build_slots(keys, self._size))
+
+    @classmethod
+    def from_dict(cls, stock: Mapping[str, int]) -> "StockTable":
+        check_skus(stock)
+        keys = np.array([sku.encode() for sku in stock], dtype=bytes) if stock else None
+        return cls(keys, np.fromiter(stock.values(), dtype=QTY_DTYPE, count=len(stock)))
+
+    @classmethod
+    def from_blob(cls, sku_blob: bytes, quantities: np.ndarray) -> "StockTable":
+        """Builds the table from NUL-separated UTF-8 SKUs (snapshot format) and their quantities."""
+        if not len(quantities):
+            return cls()
+        return cls(np.array(sku_blob.split(b"\0"), dtype=bytes), quantities)
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def quantities(self) -> np.ndarray:
+        """View on the used part of the buffer (no copy)."""
+        return self._qty[:self._size]
+
+    def lookup(self, skus: list[str]) -> np.ndarray:
+        """Dense indexes of the given SKUs, -1 for unknown SKUs (and for SKUs add() would reject)."""
+        if len(skus) <= SCALAR_PROBES:
+            return np.array([self.index(sku) for sku in skus], dtype=np.int64)
+        idx = np.full(len(skus), EMPTY, dtype=np.int64)
+        keys, slots = self._index
+        encoded = [sku.encode() for sku in skus]
+        wanted = np.array(encoded, dtype=keys.dtype)
+        # längere SKUs wurden beim Umwandeln abgeschnitten, abschließende NULs fallen weg
+        # -> beide könnten fälschlich treffen
+        lengths = np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded))
+        active = np.flatnonzero(np.char.str_len(wanted) == lengths)
+
+        mask = len(slots) - 1
+        probe = _hash(wanted[active]) & mask
+        while len(active) > SCALAR_PROBES:
+            candidate = slots[probe]
+            done = (candidate == EMPTY) | (keys[candidate] == wanted[active])
+            idx[active[done]] = candidate[done]
+            active = active[~done]
+            probe = (probe[~done] + 1) & mask
+        # lange Ketten betreffen nur wenige SKUs -> einzeln zu Ende sondieren
+        for i, slot in zip(active.tolist(), probe.tolist()):
+            idx[i] = _probe(keys, slots, encoded[i], slot)
+        return idx
+
+    def index(self, sku: str) -> int:
+        """Dense index of a single SKU (-1 if unknown), without the vectorization overhead."""
+        keys, slots = self._index
+        key = sku.encode()
+        if len(key) > keys.dtype.itemsize or key.endswith(b"\0"):
+            return EMPTY
+        return _probe(keys, slots, key, _hash_one(key) & (len(slots) - 1))
+
+    def missing(self, skus: Iterable[str]) -> list[str]:
+        skus = list(dict.fromkeys(skus))
+        return [skus[i] for i in np.flatnonzero(self.lookup(skus) < 0).tolist()]
+
+    def add(self, skus: list[str]) -> None:
+        """
+        Appends new SKUs with quantity 0, growing the buffers by doubling. Concurrent lookups keep
+        using the previous (keys, slots) until the new ones are complete.
+
+        Raises:
+            InvalidSkuError: a SKU is empty, too long or contains NUL (see check_skus); nothing is added.
+        """
+        check_skus(skus)
+        encoded = [sku.encode() for sku in skus]
+        width = max(map(len, encoded), default=0)
+        keys, slots = self._index
+        if width > keys.dtype.itemsize:
+            keys = keys.astype(_key_dtype(width))
+
+        start, needed = self._size, self._size + len(skus)
+        capacity = len(self._qty)
+        if needed > capacity:
+            while capacity < needed:
+                capacity *= 2
+            keys = _grown(keys, capacity, b"")
+            self._qty = _grown(self._qty, capacity)
+
+        # Zeilen hinter _size erreicht kein alter Slot -> dürfen im laufenden Array beschrieben werden
+        keys[start:needed] = encoded
+        if SLOT_FACTOR * needed > len(slots):
+            slots = _build_slots(keys, needed)
+        else:
+            slots = slots.copy()
+            _insert(keys, slots, start, needed)
+        self._index = (keys, slots)
+        self._size = needed
+
+    def gather(self, idx: np.ndarray) -> np.ndarray:
+        """Quantities at the given indexes; unknown SKUs (-1) count as 0."""
+        known = idx >= 0
+        return np.where(known, self._qty[np.where(known, idx, 0)], 0)
+
+    def add_at(self, idx: np.ndarray, delta: np.ndarray) -> None:
+        """qty[idx] += delta for unique, known indexes."""
+        if len(idx) and idx.min() < 0:
+            raise IndexError("add_at() got an unknown SKU (index -1)")
+        self._qty[idx] += delta
+
+    def get(self, sku: str) -> int:
+        index = self.index(sku)
+        return self._qty.item(index) if index >= 0 else 0
+
+    def apply(self, changes: Mapping[str, int]) -> None:
+        """Adds signed deltas per SKU, creating unknown SKUs (journal replay, single-threaded)."""
+        new = self.missing(changes)
+        if new:
+            self.add(new)
+        skus = list(changes)
+        self.add_at(self.lookup(skus), np.fromiter(changes.values(), dtype=QTY_DTYPE, count=len(skus)))
+
+    def export(self) -> tuple[np.ndarray, np.ndarray]:
+        """Consistent copy for a snapshot: (keys, quantities), both in index order."""
+        return self._index[0][:self._size].copy(), self.quantities.copy()
+
+    @staticmethod
+    def sku_blob(keys: np.ndarray) -> bytes:
+        """NUL-separated SKUs in index order, the snapshot format."""
+        return b"\0".join(keys.tolist())
+
+    def skus(self) -> list[str]:
+        return [key.decode() for key in self._index[0][:self._size].tolist()]
+
+    def to_dict(self) -> dict[str, int]:
+        return dict(zip(self.skus(), self.quantities.tolist()))
@@ -0,0 +1,134 @@
+import random
+import sys
+import threading
+
+from server.stock_engine import StockEngine
+from server.stock_table import MAX_SKU_BYTES, InvalidSkuError
+
+SKUS = [f"SKU-{i}" for i in range(20)]
+INITIAL_STOCK = 500
+THREADS = 64
+OPS_PER_THREAD = 2000
+
+
+def test_no_oversell():
+    """
+    Many threads reserve (all-or-nothing and per item) and release overlapping multi-item carts.
+    Afterwards no SKU may be negative and every unit must be accounted for.
+    """
+    engine = StockEngine({sku: INITIAL_STOCK for sku in SKUS}, stripes=8)
+    taken = {sku: 0 for sku in SKUS}
+    taken_lock = threading.Lock()
+    start = threading.Barrier(THREADS)
+
+    def worker(seed: int):
+        rnd = random.Random(seed)
+        local = {sku: 0 for sku in SKUS}
+        start.wait()
+        for _ in range(OPS_PER_THREAD):
+            cart = {sku: rnd.randint(1, 3) for sku in rnd.sample(SKUS, rnd.randint(1, 5))}
+            op = rnd.random()
+            if op < 0.45:
+                ok, _ = engine.check_and_reserve(cart)
+                if ok:
+                    for sku, qty in cart.items():
+                        local[sku] += qty
+            elif op < 0.7:
+                for sku, ok in engine.reserve(cart).items():
+                    if ok:
+                        local[sku] += cart[sku]
+            else:
+                # nur zurückgeben, was dieser Thread selbst reserviert hat
+                back = {sku: min(qty, local[sku]) for sku, qty in cart.items() if local[sku] > 0}
+                engine.release(back)
+                for sku, qty in back.items():
+                    local[sku] -= qty
+        with taken_lock:
+            for sku, qty in local.items():
+                taken[sku] += qty
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(THREADS)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    stock = engine.snapshot()
+    for sku in SKUS:
+        assert stock[sku] >= 0, f"oversold {sku}: {stock[sku]}"
+        assert stock[sku] + taken[sku] == INITIAL_STOCK, f"lost units for {sku}: {stock[sku]} + {taken[sku]}"
+    print(f"OK: {THREADS} threads x {OPS_PER_THREAD} ops, no oversell, stock {min(stock.values())}..{max(stock.values())}")
+
+
+def test_insert_while_reserving():
+    """
+    Some threads keep adding new SKUs (release of unknown SKUs creates them, the table grows and
+    rehashes) while the others reserve and release seeded SKUs. Seeded SKUs must never look
+    unknown and no unit may end up at another SKU.
+    """
+    seeded = SKUS[:5]
+    engine = StockEngine({sku: INITIAL_STOCK for sku in seeded}, stripes=8)
+    readers, writers, ops = THREADS // 2, 4, OPS_PER_THREAD // 2
+    failures = []
+    start = threading.Barrier(readers + writers)
+
+    def reader(seed: int):
+        rnd = random.Random(seed)
+        start.wait()
+        for _ in range(ops):
+            # jeder Thread hält höchstens einen Warenkorb -> Bestand reicht immer
+            cart = {sku: 1 for sku in rnd.sample(seeded, rnd.randint(1, 3))}
+            ok, availability = engine.check_and_reserve(cart)
+            if not ok:
+                failures.append(availability)
+                continue
+            engine.release(cart)
+
+    def writer(n: int):
+        start.wait()
+        for i in range(ops):
+            engine.release({f"NEW-{n}-{i}-{j}": 1 for j in range(1 + i % 40)})
+
+    threads = [threading.Thread(target=reader, args=(i,)) for i in range(readers)]
+    threads += [threading.Thread(target=writer, args=(n,)) for n in range(writers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    stock = engine.snapshot()
+    assert not failures, f"{len(failures)} reservations saw seeded SKUs as unavailable, e.g. {failures[0]}"
+    for sku in seeded:
+        assert stock[sku] == INITIAL_STOCK, f"lost units for {sku}: {stock[sku]}"
+    new = {sku: qty for sku, qty in stock.items() if sku not in seeded}
+    assert len(new) == writers * sum(1 + i % 40 for i in range(ops)) and set(new.values()) == {1}
+    print(f"OK: {len(new)} SKUs added while {readers} threads reserved, seeded stock intact")
+
+
+def test_invalid_skus():
+    """
+    SKUs the table cannot store (trailing NUL, too long for the hash) are never found and never
+    created: releasing them must not add rows or move units to a similar SKU.
+    """
+    engine = StockEngine({sku: INITIAL_STOCK for sku in SKUS}, stripes=8)
+    invalid = ["SKU-1\0", "SKU-2\0\0", "", "S" * (MAX_SKU_BYTES + 1)]
+    for sku in invalid:
+        for _ in range(3):
+            try:
+                engine.release({sku: 5})
+            except InvalidSkuError:
+                continue
+            raise AssertionError(f"release of {sku[:16]!r} was accepted")
+    # skalarer und vektorisierter Lookup
+    assert engine.levels(invalid) == {sku: 0 for sku in invalid}
+    assert set(engine.levels(invalid * 10 + SKUS).values()) == {0, INITIAL_STOCK}
+    assert engine.snapshot() == {sku: INITIAL_STOCK for sku in SKUS}
+    print(f"OK: {len(invalid)} invalid SKUs rejected, table unchanged")
+
+
+if __name__ == "__main__":
+    # häufige Thread-Wechsel provozieren Races zwischen Lesen und Schreiben
+    sys.setswitchinterval(1e-6)
+    test_no_oversell()
+    test_insert_while_reserving()
+    test_invalid_skus()
@@ -0,0 +1,295 @@
+"""
+Lokale Stand-ins für Inventory (gRPC), Payment (HTTP) und RabbitMQ, damit die Order-Pipeline
+ohne Docker gemessen werden kann.
+"""
+import asyncio
+import json
+import socket
+import threading
+import time
+import uuid
+from collections import defaultdict
+from concurrent import futures
+from typing import Callable, Optional
+
+import grpc
+import uvicorn
+from fastapi import FastAPI, HTTPException
+from pydantic import BaseModel
+
+from oms.app.clients import inventory_pb2, inventory_pb2_grpc
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+# --- Inventory ---
+
+class FakeInventoryServicer(inventory_pb2_grpc.InventoryServiceServicer):
+    """In-memory InventoryService. Unknown SKUs start with `default_stock` units."""
+
+    def __init__(self, default_stock: int = 10 ** 9, latency: float = 0.0):
+        self._stock: dict[str, int] = defaultdict(lambda: default_stock)
+        self._holds: dict[str, dict[str, int]] = {}
+        self._lock = threading.Lock()
+        self._latency = latency
+
+    def _wait(self):
+        if self._latency:
+            time.sleep(self._latency)
+
+    def _check_and_reserve(self, items, hold: bool = True) -> inventory_pb2.CheckAndReserveResponse:
+        availability = {pid: self._stock[pid] >= qty for pid, qty in items.items()}
+        ok = all(availability.values())
+        reservation_id = ""
+        if ok:
+            for pid, qty in items.items():
+                self._stock[pid] -= qty
+            if hold:
+                reservation_id = uuid.uuid4().hex
+                self._holds[reservation_id] = dict(items)
+        results = {pid: inventory_pb2.ReserveStatus(success=ok, message="") for pid in items}
+        return inventory_pb2.CheckAndReserveResponse(overallSuccess=ok, availability=availability, results=results,
+                                                     reservationId=reservation_id)
+
+    def CheckAvailability(self, request, context):
+        self._wait()
+        with self._lock:
+            availability = {pid: self._stock[pid] >= qty for pid, qty in request.items.items()}
+        return inventory_pb2.InventoryResponse(availability=availability)
+
+    def ReserveItems(self, request, context):
+        self._wait()
+        with self._lock:
+            # wie der echte Service: ohne Hold, zurück nur über ReleaseItems
+            r = self._check_and_reserve(request.items, hold=False)
+        return inventory_pb2.ReserveResponse(overallSuccess=r.overallSuccess, results=r.results)
+
+    def CheckAndReserve(self, request, context):
+        self._wait()
+        with self._lock:
+            return self._check_and_reserve(request.items)
+
+    def CheckAndReserveBatch(self, request, context):
+        self._wait()
+        with self._lock:
+            responses = [self._check_and_reserve(r.items) for r in request.requests]
+        return inventory_pb2.ReserveBatchResponse(responses=responses)
+
+    def ConfirmReservations(self, request, context):
+        self._wait()
+        with self._lock:
+            messages = {rid: "Confirmed" if self._holds.pop(rid, None) is not None else "Unknown"
+                        for rid in request.reservationIds}
+        return inventory_pb2.ReservationResponse(overallSuccess="Unknown" not in messages.values(), messages=messages)
+
+    def ReleaseReservations(self, request, context):
+        self._wait()
+        messages = {}
+        with self._lock:
+            for rid in request.reservationIds:
+                items = self._holds.pop(rid, None)
+                for pid, qty in (items or {}).items():
+                    self._stock[pid] += qty
+                messages[rid] = "Released" if items is not None else "Unknown"
+        return inventory_pb2.ReservationResponse(overallSuccess="Unknown" not in messages.values(), messages=messages)
+
+    def ReleaseItems(self, request, context):
+        self._wait()
+        with self._lock:
+            for pid, qty in request.items.items():
+                self._stock[pid] += qty
+        return inventory_pb2.ReleaseResponse(overallSuccess=True, messages={pid: "released" for pid in request.items})
+
+    def RestockItems(self, request, context):
+        self._wait()
+        with self._lock:
+            for pid, qty in request.items.items():
+                self._stock[pid] += max(qty, 1)
+        results = {pid: inventory_pb2.RestockStatus(success=True, message="", added=max(qty, 1))
+                   for pid, qty in request.items.items()}
+        return inventory_pb2.RestockResponse(overallSuccess=True, results=results)
+
+
+def start_fake_inventory(latency: float = 0.0, workers: int = 32) -> tuple[grpc.Server, str]:
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=workers))
+    inventory_pb2_grpc.add_InventoryServiceServicer_to_server(FakeInventoryServicer(latency=latency), server)
+    port = server.add_insecure_port("127.0.0.1:0")
+    server.start()
+    return server, f"127.0.0.1:{port}"
+
+
+# --- Payment ---
+
+class _PaymentRequest(BaseModel):
+    order_id: str
+    customer_id: str
+    amount: float
+    method: str
+
+
+class _BatchPaymentRequest(BaseModel):
+    payments: list[_PaymentRequest]
+
+
+class _RefundRequest(BaseModel):
+    order_id: str
+    customer_id: str
+    amount: float
+
+
+def create_fake_payment_app(latency: float = 0.0, decline_customers: Optional[set[str]] = None) -> FastAPI:
+    app = FastAPI(title="Fake Payment Service")
+    decline_customers = decline_customers or set()
+
+    @app.post("/payments", status_code=201)
+    async def create_payment(request: _PaymentRequest):
+        if latency:
+            await asyncio.sleep(latency)
+        if request.customer_id in decline_customers:
+            raise HTTPException(status_code=402, detail="Payment declined")
+        return {
+            "payment_id": f"pay_{request.order_id}",
+            "order_id": request.order_id,
+            "status": "CAPTURED",
+            "amount": request.amount,
+            "created_at": "",
+        }
+
+    @app.post("/payments/batch")
+    async def create_payments_batch(batch: _BatchPaymentRequest):
+        if latency:
+            await asyncio.sleep(latency)
+        results = []
+        for request in batch.payments:
+            if request.customer_id in decline_customers:
+                results.append({"order_id": request.order_id, "status_code": 402, "error": "Payment declined"})
+                continue
+            results.append({"order_id": request.order_id, "status_code": 201, "payment": {
+                "payment_id": f"pay_{request.order_id}",
+                "order_id": request.order_id,
+                "status": "CAPTURED",
+                "amount": request.amount,
+                "created_at": "",
+            }})
+        return {"results": results}
+
+    @app.post("/payments/refunds", status_code=201)
+    async def refund_payment(request: _RefundRequest):
+        return {
+            "payment_id": f"ref_{request.order_id}",
+            "order_id": request.order_id,
+            "status": "REFUNDED",
+            "amount": request.amount,
+            "created_at": "",
+        }
+
+    return app
+
+
+class FakePaymentServer:
+    """Runs the fake payment app with uvicorn on a background thread."""
+
+    def __init__(self, app: FastAPI, port: int):
+        self.url = f"http://127.0.0.1:{port}"
+        self._server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+        self._thread = threading.Thread(target=self._server.run, daemon=True)
+
+    def start(self) -> "FakePaymentServer":
+        self._thread.start()
+        while not self._server.started:
+            time.sleep(0.01)
+        return self
+
+    def stop(self) -> None:
+        self._server.should_exit = True
+        self._thread.join(timeout=5)
+
+
+# --- RabbitMQ ---
+
+def _topic_matches(pattern: str, routing_key: str) -> bool:
+    p, k = pattern.split("."), routing_key.split(".")
+    if "#" in p:
+        return True
+    return len(p) == len(k) and all(a == "*" or a == b for a, b in zip(p, k))
+
+
+class InMemoryBroker:
+    """
+    Stand-in for the topic exchanges event_log, wms_event and oms_event. Has the same publish()
+    signature as message_sender.EventPublisher, so it can replace the OMS publisher.
+    """
+
+    def __init__(self):
+        self._bindings: list[tuple[str, str, Callable[[str, dict], None]]] = []
+        self.counts: dict[str, int] = defaultdict(int)
+        self.dropped = 0
+
+    def bind(self, exchange: str, pattern: str, handler: Callable[[str, dict], None]) -> None:
+        self._bindings.append((exchange, pattern, handler))
+
+    def publish(self, exchange: str, routing_key: str, payload: dict, block: Optional[bool] = None) -> bool:
+        self.counts[exchange] += 1
+        for bound_exchange, pattern, handler in self._bindings:
+            if bound_exchange == exchange and _topic_matches(pattern, routing_key):
+                handler(routing_key, payload)
+        return True
+
+    def close(self, timeout: float = 0) -> None:
+        pass
+
+
+class FakeIncomingMessage:
+    """Minimal aio_pika.IncomingMessage for the OMS consumer (receive._process_batch)."""
+
+    def __init__(self, body: bytes):
+        self.body = body
+
+    async def ack(self, multiple: bool = False):
+        pass
+
+    async def reject(self, requeue: bool = True):
+        pass
+
+
+class FakeWms:
+    """
+    Answers every order on wms_event with an items_picked event on oms_event, like wms_service
+    does, but without the sleeps.
+    """
+
+    def __init__(self, broker: InMemoryBroker):
+        self._broker = broker
+        broker.bind("wms_event", "order.wms", self._on_order)
+
+    def _on_order(self, routing_key: str, payload: dict) -> None:
+        order = payload["order"]
+        order_id = json.loads(order)["orderId"] if isinstance(order, str) else order["orderId"]
+        self._broker.publish("oms_event", "oms", {"orderId": order_id, "event": "items_picked",
+                                                  "message": f"{order_id}: Picked the ordered items"})
+
+
+class FakeChannel:
+    is_closed = False
+
+
+class FakeConsumerQueue:
+    """
+    Queue side of the in-memory broker for the OMS consumer. receive._consume() registers its
+    callback here exactly as with a real aio_pika queue.
+    """
+
+    def __init__(self, broker: InMemoryBroker, exchange: str, pattern: str):
+        self._callback = None
+        broker.bind(exchange, pattern, self._deliver)
+
+    async def consume(self, callback):
+        self._callback = callback
+
+    def _deliver(self, routing_key: str, payload: dict) -> None:
+        if self._callback is not None:
+            asyncio.get_running_loop().create_task(self._callback(FakeIncomingMessage(json.dumps(payload).encode())))
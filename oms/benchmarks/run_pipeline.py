@@ -0,0 +1,210 @@
+"""
+Lastbenchmark für POST /orders/ ohne Docker.
+
+Startet einen Fake-Inventory-gRPC-Server, eine Fake-Payment-App und einen In-Memory-Broker,
+treibt die OMS-App mit konfigurierbarer Nebenläufigkeit und gibt Orders/s sowie p50/p95/p99
+je Stufe aus.
+
+    python -m benchmarks.run_pipeline --orders 2000 --concurrency 64
+    python -m benchmarks.run_pipeline --orders 2000 --batch-size 100
+"""
+import argparse
+import asyncio
+import functools
+import os
+import sys
+import time
+from collections import Counter, defaultdict
+
+from benchmarks.fakes import (
+    FakeChannel,
+    FakeConsumerQueue,
+    FakePaymentServer,
+    FakeWms,
+    InMemoryBroker,
+    create_fake_payment_app,
+    free_port,
+    start_fake_inventory,
+)
+
+
+class StageRecorder:
+    def __init__(self):
+        self.samples: dict[str, list[float]] = defaultdict(list)
+
+    def add(self, stage: str, seconds: float) -> None:
+        self.samples[stage].append(seconds)
+
+    def wrap_async(self, stage: str, fn):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await fn(*args, **kwargs)
+            finally:
+                self.add(stage, time.perf_counter() - start)
+        return wrapper
+
+    def wrap(self, stage: str, fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.add(stage, time.perf_counter() - start)
+        return wrapper
+
+    def report(self) -> str:
+        lines = [f"{'stage':<36}{'count':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}"]
+        for stage, values in sorted(self.samples.items()):
+            values = sorted(values)
+            lines.append(f"{stage:<36}{len(values):>8}"
+                         f"{_percentile(values, 50) * 1000:>10.2f}{_percentile(values, 95) * 1000:>10.2f}"
+                         f"{_percentile(values, 99) * 1000:>10.2f}{values[-1] * 1000:>10.2f}")
+        return "\n".join(lines)
+
+
+def _percentile(sorted_values: list[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    pos = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[pos]
+
+
+def make_order(i: int, items_per_order: int, declined: bool) -> dict:
+    items = [{"productId": f"SKU-{(i * 7 + n) % 500}", "quantity": 1, "price": "9.99"}
+             for n in range(items_per_order)]
+    return {
+        "orderId": f"BENCH-{i}",
+        "customer": {"customerId": "CUST-DECLINE" if declined else f"CUST-{i % 100}",
+                     "prename": "Bench", "name": "Mark"},
+        "items": items,
+        "totalAmount": str(round(9.99 * items_per_order, 2)),
+        "ShippingAddress": {"street": "Moltkestr. 30", "city": "Karlsruhe", "zipcode": "76133", "country": "DE"},
+    }
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--orders", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--items-per-order", type=int, default=3)
+    parser.add_argument("--batch-size", type=int, default=0, help="> 0: POST /orders/batch mit dieser Größe")
+    parser.add_argument("--warmup", type=int, default=50)
+    parser.add_argument("--decline-rate", type=float, default=0.0)
+    parser.add_argument("--inventory-latency-ms", type=float, default=0.0)
+    parser.add_argument("--payment-latency-ms", type=float, default=0.0)
+    return parser.parse_args()
+
+
+# erwartete Ergebnisse: Erfolg und (über --decline-rate gewollte) Ablehnungen, je als HTTP-Code oder Batch-Status
+EXPECTED_RESULTS = {201, 402, "PROCESSED", "DECLINED"}
+
+
+async def run(args: argparse.Namespace) -> int:
+    inventory_server, inventory_addr = start_fake_inventory(latency=args.inventory_latency_ms / 1000)
+    payment_server = FakePaymentServer(
+        create_fake_payment_app(latency=args.payment_latency_ms / 1000, decline_customers={"CUST-DECLINE"}),
+        free_port(),
+    ).start()
+
+    # Config wird beim Import gelesen -> Umgebung vor dem Import der App setzen
+    os.environ["INVENTORY_ADDR"] = inventory_addr
+    os.environ["PAYMENT_URL"] = payment_server.url
+    os.environ.setdefault("ORDER_STORE", "memory")
+
+    import httpx
+    from oms.app.clients import inventory_aio_client, payment_client
+    from oms.app.main import app
+    from oms.app.rabbitmq import message_sender, receive
+    from oms.app.service import oms_service
+
+    recorder = StageRecorder()
+    broker = InMemoryBroker()
+    broker.publish = recorder.wrap("broker.publish", broker.publish)
+    message_sender._PUBLISHER = broker
+    message_sender._WMS_PUBLISHER = broker
+    FakeWms(broker)
+    consumer = asyncio.create_task(receive._consume(FakeChannel(), FakeConsumerQueue(broker, "oms_event", "oms")))
+
+    for name in ("check_and_reserve", "check_and_reserve_batch", "confirm_reservations", "release_reservations",
+                 "restock_items"):
+        setattr(inventory_aio_client, name, recorder.wrap_async(f"inventory.{name}", getattr(inventory_aio_client, name)))
+    for name in ("authorize", "authorize_batch"):
+        setattr(payment_client, name, recorder.wrap_async(f"payment.{name}", getattr(payment_client, name)))
+    oms_service._save = recorder.wrap("store.save", oms_service._save)
+    oms_service.apply_status_updates = recorder.wrap("store.apply_status_updates", oms_service.apply_status_updates)
+    receive.apply_status_updates = oms_service.apply_status_updates
+
+    await payment_client.start_client()
+    transport = httpx.ASGITransport(app=app)
+    statuses: Counter = Counter()
+    semaphore = asyncio.Semaphore(args.concurrency)
+    declined_every = int(1 / args.decline_rate) if args.decline_rate > 0 else 0
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://oms") as client:
+        async def single(order: dict, stage: str):
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.post("/orders/orders/", json=order)
+                recorder.add(stage, time.perf_counter() - start)
+                statuses[response.status_code] += 1
+
+        async def batch(orders: list[dict], stage: str):
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.post("/orders/orders/batch", json={"orders": orders})
+                recorder.add(stage, time.perf_counter() - start)
+                for result in response.json().get("results", []):
+                    statuses[result["status"]] += 1
+
+        def orders(offset: int, count: int) -> list[dict]:
+            return [make_order(i, args.items_per_order, bool(declined_every) and i % declined_every == 0)
+                    for i in range(offset, offset + count)]
+
+        async def drive(payloads: list[dict], stage: str):
+            if args.batch_size > 0:
+                chunks = [payloads[i:i + args.batch_size] for i in range(0, len(payloads), args.batch_size)]
+                await asyncio.gather(*(batch(c, stage) for c in chunks))
+            else:
+                await asyncio.gather(*(single(o, stage) for o in payloads))
+
+        await drive(orders(10 ** 9, args.warmup), "warmup")
+        await asyncio.sleep(0.1)
+        recorder.samples.clear()
+        statuses.clear()
+        broker.counts.clear()
+
+        start = time.perf_counter()
+        await drive(orders(0, args.orders), "http.create_order_batch" if args.batch_size > 0 else "http.create_order")
+        elapsed = time.perf_counter() - start
+
+    await asyncio.sleep(0.2)  # letzte WMS-Events verarbeiten
+    consumer.cancel()
+    await payment_client.close_client()
+    await inventory_aio_client.close_channels()
+    oms_service.close_store()
+    payment_server.stop()
+    inventory_server.stop(0)
+
+    failed = sum(count for result, count in statuses.items() if result not in EXPECTED_RESULTS)
+    print(f"orders: {args.orders}  concurrency: {args.concurrency}  batch size: {args.batch_size or '-'}")
+    if failed:
+        # ein Durchsatz über fehlgeschlagene Orders wäre irreführend
+        print(f"elapsed: {elapsed:.2f}s  {failed} of {args.orders} orders failed, no throughput reported")
+    else:
+        print(f"elapsed: {elapsed:.2f}s  throughput: {args.orders / elapsed:.1f} orders/s")
+    print(f"results: {dict(statuses)}")
+    print(f"broker messages: {dict(broker.counts)}")
+    print()
+    print(recorder.report())
+    return 1 if failed else 0
+
+
+def main() -> None:
+    sys.exit(asyncio.run(run(parse_args())))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+import asyncio
+import itertools
+from typing import AsyncIterator, Iterable, Optional
+
+import grpc
+from oms.app.clients import inventory_pb2, inventory_pb2_grpc
+from oms.app.clients.inventory_client import CHANNEL_OPTIONS, chunk_items
+from oms.app.core.config import INVENTORY_ADDR, INVENTORY_CHANNEL_POOL_SIZE, INVENTORY_DEADLINE, \
+    INVENTORY_STREAM_CHUNK_SIZE
+
+
+class _AioChannelPool:
+    """
+    asyncio counterpart of the sync channel pool. grpc.aio channels are bound to the event loop
+    they were created on, so the pool is opened lazily from inside the running loop.
+    """
+
+    def __init__(self, target: str, size: int):
+        self._target = target
+        self._size = max(size, 1)
+        self._channels: list[grpc.aio.Channel] = []
+        self._stubs: list[inventory_pb2_grpc.InventoryServiceStub] = []
+        self._next = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def stub(self) -> inventory_pb2_grpc.InventoryServiceStub:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # neuer Loop (z.B. Reload/Tests) -> alte Channels sind unbrauchbar
+            self._channels.clear()
+            self._stubs.clear()
+            for _ in range(self._size):
+                channel = grpc.aio.insecure_channel(self._target, options=CHANNEL_OPTIONS)
+                self._channels.append(channel)
+                self._stubs.append(inventory_pb2_grpc.InventoryServiceStub(channel))
+            self._next = itertools.cycle(self._stubs)
+            self._loop = loop
+        return next(self._next)
+
+    async def close(self) -> None:
+        channels, self._channels = self._channels, []
+        self._stubs = []
+        self._next = None
+        self._loop = None
+        for channel in channels:
+            await channel.close()
+
+
+_POOL = _AioChannelPool(INVENTORY_ADDR, INVENTORY_CHANNEL_POOL_SIZE)
+
+
+async def close_channels() -> None:
+    """Closes all pooled asyncio channels. Called on application shutdown."""
+    await _POOL.close()
+
+
+async def check_availability(items: dict[str, int], timeout: float = INVENTORY_DEADLINE) -> dict[str, bool]:
+    """
+    Check the availability of items in the inventory without blocking the event loop.
+
+    Args:
+        items (dict[str, int]): A dictionary where keys are item IDs and values are the required quantities.
+        timeout (float): Deadline for the RPC in seconds.
+
+    Returns:
+        dict[str, bool]: A dictionary where keys are item IDs and values indicate availability (True if available, False otherwise).
+    """
+    request = inventory_pb2.InventoryRequest(items=items)
+    response = await _POOL.stub().CheckAvailability(request, timeout=timeout)
+    return dict(response.availability)
+
+
+async def stream_availability(
+    items: Iterable[tuple[str, int]], chunk_size: int = INVENTORY_STREAM_CHUNK_SIZE
+) -> AsyncIterator[dict[str, bool]]:
+    """
+    Check the availability of a very large number of items over the StreamAvailability RPC.
+    Request chunks are built lazily and results are yielded per chunk as they arrive. No deadline
+    is set, the stream runs as long as the input lasts.
+
+    Args:
+        items (Iterable[tuple[str, int]]): (productId, quantity) pairs.
+        chunk_size (int): Number of items per request chunk.
+
+    Returns:
+        AsyncIterator[dict[str, bool]]: One availability dict per chunk, in request order.
+    """
+    requests = (inventory_pb2.InventoryRequest(items=chunk) for chunk in chunk_items(items, chunk_size))
+    async for response in _POOL.stub().StreamAvailability(requests):
+        yield dict(response.availability)
+
+
+async def reserve_items(items: dict[str, int], timeout: float = INVENTORY_DEADLINE) -> tuple[bool, dict[str, dict]]:
+    """
+    Reserve items in the inventory without blocking the event loop.
+    Legacy call without a hold: the stock stays taken until release_items() gives it back, it
+    never expires. Orders use check_and_reserve() with confirm/release_reservations() instead.
+
+    Args:
+        items (dict[str, int]): A dictionary where keys are item IDs and values are the quantities to reserve.
+        timeout (float): Deadline for the RPC in seconds.
+
+    Returns:
+        tuple[bool, dict[str, dict]]: A tuple containing a boolean indicating overall success and a dictionary with reservation results for each item.
+    """
+    request = inventory_pb2.ReserveRequest(items=items)
+    response = await _POOL.stub().ReserveItems(request, timeout=timeout)
+    results = {key: {"success": value.success, "message": value.message}
+               for key, value in response.results.items()}
+    return response.overallSuccess, results
+
+async def check_and_reserve(
+    items: dict[str, int], timeout: float = INVENTORY_DEADLINE
+) -> tuple[bool, dict[str, bool], dict[str, dict], str]:
+    """
+    Check and reserve items in one round trip. The inventory reserves either all items or none.
+    A successful reservation is a hold that expires unless it is confirmed or released.
+
+    Returns:
+        tuple[bool, dict[str, bool], dict[str, dict], str]: Overall success, availability per item, reservation results per item and the reservation id ("" if nothing was reserved).
+    """
+    request = inventory_pb2.ReserveRequest(items=items)
+    response = await _POOL.stub().CheckAndReserve(request, timeout=timeout)
+    return _reservation_result(response)
+
+
+async def check_and_reserve_batch(
+    orders: list[dict[str, int]], timeout: float = INVENTORY_DEADLINE
+) -> list[tuple[bool, dict[str, bool], dict[str, dict], str]]:
+    """
+    Check and reserve the items of several orders in one round trip. Each order is reserved all-or-nothing.
+
+    Returns:
+        list[tuple[bool, dict[str, bool], dict[str, dict], str]]: One check_and_reserve result per order, in request order.
+    """
+    request = inventory_pb2.ReserveBatchRequest(
+        requests=[inventory_pb2.ReserveRequest(items=items) for items in orders]
+    )
+    response = await _POOL.stub().CheckAndReserveBatch(request, timeout=timeout)
+    return [_reservation_result(r) for r in response.responses]
+
+
+def _reservation_result(response) -> tuple[bool, dict[str, bool], dict[str, dict], str]:
+    results = {key: {"success": value.success, "message": value.message}
+               for key, value in response.results.items()}
+    return response.overallSuccess, dict(response.availability), results, response.reservationId
+
+
+async def confirm_reservations(
+    reservation_ids: list[str], timeout: float = INVENTORY_DEADLINE
+) -> tuple[bool, dict[str, str]]:
+    """
+    Confirm reservation holds after a successful payment, the held stock is then sold.
+    """
+    request = inventory_pb2.ReservationRequest(reservationIds=reservation_ids)
+    response = await _POOL.stub().ConfirmReservations(request, timeout=timeout)
+    return response.overallSuccess, dict(response.messages)
+
+
+async def release_reservations(
+    reservation_ids: list[str], timeout: float = INVENTORY_DEADLINE
+) -> tuple[bool, dict[str, str]]:
+    """
+    Release reservation holds and put the held stock back.
+    """
+    request = inventory_pb2.ReservationRequest(reservationIds=reservation_ids)
+    response = await _POOL.stub().ReleaseReservations(request, timeout=timeout)
+    return response.overallSuccess, dict(response.messages)
+
+
+async def release_items(items: dict[str, int], timeout: float = INVENTORY_DEADLINE) -> tuple[bool, dict[str, str]]:
+    """
+    Release (undo) items taken with reserve_items(). Not for holds, see release_reservations().
+    """
+    request = inventory_pb2.ReleaseRequest(items=items)
+    response = await _POOL.stub().ReleaseItems(request, timeout=timeout)
+    return response.overallSuccess, dict(response.messages)
+
+
+async def restock_items(items: dict[str, int], timeout: float = INVENTORY_DEADLINE) -> tuple[bool, dict[str, dict]]:
+    if not items:
+        return True, {}
+    resp = await _POOL.stub().RestockItems(inventory_pb2.RestockRequest(items=items), timeout=timeout)
+    results = {pid: {"success": st.success, "message": st.message, "added": st.added}
+               for pid, st in resp.results.items()}
+    return resp.overallSuccess, results
@@ -1,11 +1,79 @@
+import itertools
+import threading
+from typing import Iterable, Iterator
+
 import grpc
 from oms.app.clients import inventory_pb2, inventory_pb2_grpc
+from oms.app.core.config import (
+    INVENTORY_ADDR,
+    INVENTORY_CHANNEL_POOL_SIZE,
+    INVENTORY_KEEPALIVE_TIME_MS,
+    INVENTORY_KEEPALIVE_TIMEOUT_MS,
+    INVENTORY_STREAM_CHUNK_SIZE,
+)
 
-INVENTORY_ADDR = "inventory-service:50051"
 INFINITE_STOCK: bool = False
 STOCK: dict[str, int] = {"ORD-2025-11-4-1755": 0}
 ALLOW_RESTOCK: set[str] = {"ORD-2025-11-4-1755"}
 
+CHANNEL_OPTIONS = [
+    ("grpc.keepalive_time_ms", INVENTORY_KEEPALIVE_TIME_MS),
+    ("grpc.keepalive_timeout_ms", INVENTORY_KEEPALIVE_TIMEOUT_MS),
+    ("grpc.keepalive_permit_without_calls", 1),
+    ("grpc.http2.max_pings_without_data", 0),
+    # jeder Channel bekommt eine eigene TCP-Verbindung, sonst teilen sich alle Channels eine Subchannel
+    ("grpc.use_local_subchannel_pool", 1),
+]
+
+
+class _ChannelPool:
+    """
+    Holds a fixed number of long-lived gRPC channels to the inventory service and hands out
+    their stubs round-robin, so concurrent calls are spread over several HTTP/2 connections.
+    """
+
+    def __init__(self, target: str, size: int):
+        self._target = target
+        self._size = max(size, 1)
+        self._lock = threading.Lock()
+        self._channels: list[grpc.Channel] = []
+        self._stubs: list[inventory_pb2_grpc.InventoryServiceStub] = []
+        self._next = None
+
+    def _open(self) -> None:
+        for _ in range(self._size):
+            channel = grpc.insecure_channel(self._target, options=CHANNEL_OPTIONS)
+            self._channels.append(channel)
+            self._stubs.append(inventory_pb2_grpc.InventoryServiceStub(channel))
+        self._next = itertools.cycle(self._stubs)
+
+    def stub(self) -> inventory_pb2_grpc.InventoryServiceStub:
+        with self._lock:
+            if not self._stubs:
+                self._open()
+            return next(self._next)
+
+    def close(self) -> None:
+        with self._lock:
+            for channel in self._channels:
+                channel.close()
+            self._channels.clear()
+            self._stubs.clear()
+            self._next = None
+
+
+_POOL = _ChannelPool(INVENTORY_ADDR, INVENTORY_CHANNEL_POOL_SIZE)
+
+
+def get_stub() -> inventory_pb2_grpc.InventoryServiceStub:
+    """Returns a stub bound to one of the pooled channels (channels are opened lazily)."""
+    return _POOL.stub()
+
+
+def close_channels() -> None:
+    """Closes all pooled channels. Called on application shutdown."""
+    _POOL.close()
+
 
 def check_availability(items: dict[str, int]) -> dict[str, bool]:
     """
@@ -17,16 +85,73 @@ def check_availability(items: dict[str, int]) -> dict[str, bool]:
     Returns:
         dict[str, bool]: A dictionary where keys are item IDs and values indicate availability (True if available, False otherwise).
     """
-    with grpc.insecure_channel(INVENTORY_ADDR) as channel:
-        stub = inventory_pb2_grpc.InventoryServiceStub(channel)
-        request = inventory_pb2.InventoryRequest(items=items)
-        response = stub.CheckAvailability(request)
-        return dict(response.availability)
+    request = inventory_pb2.InventoryRequest(items=items)
+    response = get_stub().CheckAvailability(request)
+    return dict(response.availability)
+
+
+def chunk_items(items: Iterable[tuple[str, int]], chunk_size: int) -> Iterator[dict[str, int]]:
+    """Groups (productId, quantity) pairs into dicts of at most chunk_size entries, lazily."""
+    chunk: dict[str, int] = {}
+    for product_id, quantity in items:
+        chunk[product_id] = quantity
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = {}
+    if chunk:
+        yield chunk
+
+
+def stream_availability(
+    items: Iterable[tuple[str, int]], chunk_size: int = INVENTORY_STREAM_CHUNK_SIZE
+) -> Iterator[dict[str, bool]]:
+    """
+    Check the availability of a very large number of items over the StreamAvailability RPC.
+
+    Args:
+        items (Iterable[tuple[str, int]]): (productId, quantity) pairs, e.g. read lazily from a catalog feed.
+        chunk_size (int): Number of items per request chunk.
+
+    Returns:
+        Iterator[dict[str, bool]]: One availability dict per chunk, in request order, as soon as it arrives.
+    """
+    requests = (inventory_pb2.InventoryRequest(items=chunk) for chunk in chunk_items(items, chunk_size))
+    for response in get_stub().StreamAvailability(requests):
+        yield dict(response.availability)
+
+
+def import_stock(
+    items: Iterable[tuple[str, int]], absolute: bool = True, chunk_size: int = INVENTORY_STREAM_CHUNK_SIZE
+) -> dict[str, int]:
+    """
+    Send a stock feed to the inventory over the client-streaming ImportStock RPC.
+
+    Args:
+        items (Iterable[tuple[str, int]]): (productId, quantity) pairs, e.g. read lazily from the warehouse feed.
+        absolute (bool): True sets the available stock, False adds the quantities as deltas.
+        chunk_size (int): Number of items per request chunk.
+
+    Returns:
+        dict[str, int]: Summary counts (chunks, items, created, updated, unchanged, rejected).
+    """
+    mode = inventory_pb2.StockImportChunk.ABSOLUTE if absolute else inventory_pb2.StockImportChunk.DELTA
+    requests = (inventory_pb2.StockImportChunk(mode=mode, items=chunk) for chunk in chunk_items(items, chunk_size))
+    summary = get_stub().ImportStock(requests)
+    return {
+        "chunks": summary.chunks,
+        "items": summary.items,
+        "created": summary.created,
+        "updated": summary.updated,
+        "unchanged": summary.unchanged,
+        "rejected": summary.rejected,
+    }
 
 
 def reserve_items(items: dict[str, int]) -> tuple[bool, dict[str, dict]]:
     """
     Reserve items in the inventory.
+    Legacy call without a hold: the stock stays taken until release_items() gives it back, it
+    never expires. Orders use check_and_reserve() with confirm/release_reservations() instead.
 
     Args:
         items (dict[str, int]): A dictionary where keys are item IDs and values are the quantities to reserve.
@@ -34,31 +159,54 @@ def reserve_items(items: dict[str, int]) -> tuple[bool, dict[str, dict]]:
     Returns:
         tuple[bool, dict[str, dict]]: A tuple containing a boolean indicating overall success and a dictionary with reservation results for each item.
     """
-    with grpc.insecure_channel(INVENTORY_ADDR) as channel:
-        stub = inventory_pb2_grpc.InventoryServiceStub(channel)
-        request = inventory_pb2.ReserveRequest(items=items)
-        response = stub.ReserveItems(request)
-        results = {key: {"success": value.success, "message": value.message}
-                   for key, value in response.results.items()}
-        return response.overallSuccess, results
+    request = inventory_pb2.ReserveRequest(items=items)
+    response = get_stub().ReserveItems(request)
+    results = {key: {"success": value.success, "message": value.message}
+               for key, value in response.results.items()}
+    return response.overallSuccess, results
+
+def check_and_reserve(items: dict[str, int]) -> tuple[bool, dict[str, bool], dict[str, dict], str]:
+    """
+    Check and reserve items in one round trip. The inventory reserves either all items or none.
+    A successful reservation is a hold that expires unless it is confirmed or released.
+
+    Returns:
+        tuple[bool, dict[str, bool], dict[str, dict], str]: Overall success, availability per item, reservation results per item and the reservation id ("" if nothing was reserved).
+    """
+    response = get_stub().CheckAndReserve(inventory_pb2.ReserveRequest(items=items))
+    results = {key: {"success": value.success, "message": value.message}
+               for key, value in response.results.items()}
+    return response.overallSuccess, dict(response.availability), results, response.reservationId
+
+
+def confirm_reservations(reservation_ids: list[str]) -> tuple[bool, dict[str, str]]:
+    """
+    Confirm reservation holds after a successful payment, the held stock is then sold.
+    """
+    response = get_stub().ConfirmReservations(inventory_pb2.ReservationRequest(reservationIds=reservation_ids))
+    return response.overallSuccess, dict(response.messages)
+
+
+def release_reservations(reservation_ids: list[str]) -> tuple[bool, dict[str, str]]:
+    """
+    Release reservation holds and put the held stock back.
+    """
+    response = get_stub().ReleaseReservations(inventory_pb2.ReservationRequest(reservationIds=reservation_ids))
+    return response.overallSuccess, dict(response.messages)
 
 
 def release_items(items: dict[str, int]) -> tuple[bool, dict[str, dict]]:
     """
-    Release (undo) reserved items in the inventory.
+    Release (undo) items taken with reserve_items(). Not for holds, see release_reservations().
     """
-    with grpc.insecure_channel(INVENTORY_ADDR) as channel:
-        stub = inventory_pb2_grpc.InventoryServiceStub(channel)
-        request = inventory_pb2.ReleaseRequest(items=items)
-        response = stub.ReleaseItems(request)
-        return response.overallSuccess, response.messages
+    request = inventory_pb2.ReleaseRequest(items=items)
+    response = get_stub().ReleaseItems(request)
+    return response.overallSuccess, response.messages
     
 def restock_items(items: dict[str, int]) -> tuple[bool, dict[str, dict]]:
     if not items:
         return True, {}
-    with grpc.insecure_channel(INVENTORY_ADDR) as channel:
-        stub = inventory_pb2_grpc.InventoryServiceStub(channel)
-        resp = stub.RestockItems(inventory_pb2.RestockRequest(items=items))
-        results = {pid: {"success": st.success, "message": st.message, "added": st.added}
-                   for pid, st in resp.results.items()}
-        return resp.overallSuccess, results
\ No newline at end of file
+    resp = get_stub().RestockItems(inventory_pb2.RestockRequest(items=items))
+    results = {pid: {"success": st.success, "message": st.message, "added": st.added}
+               for pid, st in resp.results.items()}
+    return resp.overallSuccess, results
\ No newline at end of file
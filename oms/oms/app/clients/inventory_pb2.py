@@ -24,7 +24,7 @@ _sym_db = _symbol_database.Default()
 
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x0finventory.proto\"m\n\x10InventoryRequest\x12+\n\x05items\x18\x01 \x03(\x0b\x32\x1c.InventoryRequest.ItemsEntry\x1a,\n\nItemsEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\x05:\x02\x38\x01\"\x84\x01\n\x11InventoryResponse\x12:\n\x0c\x61vailability\x18\x01 \x03(\x0b\x32$.InventoryResponse.AvailabilityEntry\x1a\x33\n\x11\x41vailabilityEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\x08:\x02\x38\x01\"i\n\x0eReserveRequest\x12)\n\x05items\x18\x01 \x03(\x0b\x32\x1a.ReserveRequest.ItemsEntry\x1a,\n\nItemsEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\x05:\x02\x38\x01\"\x99\x01\n\x0fReserveResponse\x12\x16\n\x0eoverallSuccess\x18\x01 \x01(\x08\x12.\n\x07results\x18\x02 \x03(\x0b\x32\x1d.ReserveResponse.ResultsEntry\x1a>\n\x0cResultsEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\x1d\n\x05value\x18\x02 \x01(\x0b\x32\x0e.ReserveStatus:\x02\x38\x01\"1\n\rReserveStatus\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\"i\n\x0eReleaseRequest\x12)\n\x05items\x18\x01 \x03(\x0b\x32\x1a.ReleaseRequest.ItemsEntry\x1a,\n\nItemsEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\x05:\x02\x38\x01\"\x8c\x01\n\x0fReleaseResponse\x12\x16\n\x0eoverallSuccess\x18\x01 \x01(\x08\x12\x30\n\x08messages\x18\x02 \x03(\x0b\x32\x1e.ReleaseResponse.MessagesEntry\x1a/\n\rMessagesEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\t:\x02\x38\x01\"i\n\x0eRestockRequest\x12)\n\x05items\x18\x01 \x03(\x0b\x32\x1a.RestockRequest.ItemsEntry\x1a,\n\nItemsEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\x05:\x02\x38\x01\"\x99\x01\n\x0fRestockResponse\x12\x16\n\x0eoverallSuccess\x18\x01 \x01(\x08\x12.\n\x07results\x18\x02 \x03(\x0b\x32\x1d.RestockResponse.ResultsEntry\x1a>\n\x0cResultsEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\x1d\n\x05value\x18\x02 \x01(\x0b\x32\x0e.RestockStatus:\x02\x38\x01\"@\n\rRestockStatus\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\x12\r\n\x05\x61\x64\x64\x65\x64\x18\x03 \x01(\x05\x32\xe7\x01\n\x10InventoryService\x12:\n\x11\x43heckAvailability\x12\x11.InventoryRequest\x1a\x12.InventoryResponse\x12\x31\n\x0cReserveItems\x12\x0f.ReserveRequest\x1a\x10.ReserveResponse\x12\x31\n\x0cRestockItems\x12\x0f.RestockRequest\x1a\x10.RestockResponse\x12\x31\n\x0cReleaseItems\x12\x0f.ReleaseRequest\x1a\x10.ReleaseResponseb\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x0finventory.proto\"m\n\x10InventoryRequest\x12+\n\x05items\x18\x01 \x03(\x0b\x32\x1c.InventoryRequest.ItemsEntry\x1a,\n\nItemsEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\x05:\x02\x38\x01\"\x84\x01\n\x11InventoryResponse\x12:\n\x0c\x61vailability\x18\x01 \x03(\x0b\x32$.InventoryResponse.AvailabilityEntry\x1a\x33\n\x11\x41vailabilityEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\x08:\x02\x38\x01\"i\n\x0eReserveRequest\x12)\n\x05items\x18\x01 \x03(\x0b\x32\x1a.ReserveRequest.ItemsEntry\x1a,\n\nItemsEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\x05:\x02\x38\x01\"\x99\x01\n\x0fReserveResponse\x12\x16\n\x0eoverallSuccess\x18\x01 \x01(\x08\x12.\n\x07results\x18\x02 \x03(\x0b\x32\x1d.ReserveResponse.ResultsEntry\x1a>\n\x0cResultsEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\x1d\n\x05value\x18\x02 \x01(\x0b\x32\x0e.ReserveStatus:\x02\x38\x01\"1\n\rReserveStatus\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\"i\n\x0eReleaseRequest\x12)\n\x05items\x18\x01 \x03(\x0b\x32\x1a.ReleaseRequest.ItemsEntry\x1a,\n\nItemsEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\x05:\x02\x38\x01\"\x8c\x01\n\x0fReleaseResponse\x12\x16\n\x0eoverallSuccess\x18\x01 \x01(\x08\x12\x30\n\x08messages\x18\x02 \x03(\x0b\x32\x1e.ReleaseResponse.MessagesEntry\x1a/\n\rMessagesEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\t:\x02\x38\x01\"i\n\x0eRestockRequest\x12)\n\x05items\x18\x01 \x03(\x0b\x32\x1a.RestockRequest.ItemsEntry\x1a,\n\nItemsEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\x05:\x02\x38\x01\"\x99\x01\n\x0fRestockResponse\x12\x16\n\x0eoverallSuccess\x18\x01 \x01(\x08\x12.\n\x07results\x18\x02 \x03(\x0b\x32\x1d.RestockResponse.ResultsEntry\x1a>\n\x0cResultsEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\x1d\n\x05value\x18\x02 \x01(\x0b\x32\x0e.RestockStatus:\x02\x38\x01\"@\n\rRestockStatus\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\x12\r\n\x05\x61\x64\x64\x65\x64\x18\x03 \x01(\x05\"\xb4\x01\n\x10StockImportChunk\x12$\n\x04mode\x18\x01 \x01(\x0e\x32\x16.StockImportChunk.Mode\x12+\n\x05items\x18\x02 \x03(\x0b\x32\x1c.StockImportChunk.ItemsEntry\x1a,\n\nItemsEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\x03:\x02\x38\x01\"\x1f\n\x04Mode\x12\t\n\x05\x44\x45LTA\x10\x00\x12\x0c\n\x08\x41\x42SOLUTE\x10\x01\"\xda\x01\n\x12StockImportSummary\x12\x0e\n\x06\x63hunks\x18\x01 \x01(\x03\x12\r\n\x05items\x18\x02 \x01(\x03\x12\x0f\n\x07\x63reated\x18\x03 \x01(\x03\x12\x0f\n\x07updated\x18\x04 \x01(\x03\x12\x11\n\tunchanged\x18\x05 \x01(\x03\x12\x10\n\x08rejected\x18\x06 \x01(\x03\x12/\n\x06\x65rrors\x18\x07 \x03(\x0b\x32\x1f.StockImportSummary.ErrorsEntry\x1a-\n\x0b\x45rrorsEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\t:\x02\x38\x01\"\xca\x02\n\x17\x43heckAndReserveResponse\x12\x16\n\x0eoverallSuccess\x18\x01 \x01(\x08\x12@\n\x0c\x61vailability\x18\x02 \x03(\x0b\x32*.CheckAndReserveResponse.AvailabilityEntry\x12\x36\n\x07results\x18\x03 \x03(\x0b\x32%.CheckAndReserveResponse.ResultsEntry\x12\x15\n\rreservationId\x18\x04 \x01(\t\x12\x11\n\texpiresAt\x18\x05 \x01(\x03\x1a\x33\n\x11\x41vailabilityEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\x08:\x02\x38\x01\x1a>\n\x0cResultsEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\x1d\n\x05value\x18\x02 \x01(\x0b\x32\x0e.ReserveStatus:\x02\x38\x01\"8\n\x13ReserveBatchRequest\x12!\n\x08requests\x18\x01 \x03(\x0b\x32\x0f.ReserveRequest\"C\n\x14ReserveBatchResponse\x12+\n\tresponses\x18\x01 \x03(\x0b\x32\x18.CheckAndReserveResponse\",\n\x12ReservationRequest\x12\x16\n\x0ereservationIds\x18\x01 \x03(\t\"\x94\x01\n\x13ReservationResponse\x12\x16\n\x0eoverallSuccess\x18\x01 \x01(\x08\x12\x34\n\x08messages\x18\x02 \x03(\x0b\x32\".ReservationResponse.MessagesEntry\x1a/\n\rMessagesEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\t:\x02\x38\x01\x32\xe8\x04\n\x10InventoryService\x12:\n\x11\x43heckAvailability\x12\x11.InventoryRequest\x1a\x12.InventoryResponse\x12\x31\n\x0cReserveItems\x12\x0f.ReserveRequest\x1a\x10.ReserveResponse\x12\x31\n\x0cRestockItems\x12\x0f.RestockRequest\x1a\x10.RestockResponse\x12\x31\n\x0cReleaseItems\x12\x0f.ReleaseRequest\x1a\x10.ReleaseResponse\x12<\n\x0f\x43heckAndReserve\x12\x0f.ReserveRequest\x1a\x18.CheckAndReserveResponse\x12\x43\n\x14\x43heckAndReserveBatch\x12\x14.ReserveBatchRequest\x1a\x15.ReserveBatchResponse\x12@\n\x13\x43onfirmReservations\x12\x13.ReservationRequest\x1a\x14.ReservationResponse\x12@\n\x13ReleaseReservations\x12\x13.ReservationRequest\x1a\x14.ReservationResponse\x12?\n\x12StreamAvailability\x12\x11.InventoryRequest\x1a\x12.InventoryResponse(\x01\x30\x01\x12\x37\n\x0bImportStock\x12\x11.StockImportChunk\x1a\x13.StockImportSummary(\x01\x62\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
@@ -47,6 +47,16 @@ if not _descriptor._USE_C_DESCRIPTORS:
   _globals['_RESTOCKREQUEST_ITEMSENTRY']._serialized_options = b'8\001'
   _globals['_RESTOCKRESPONSE_RESULTSENTRY']._loaded_options = None
   _globals['_RESTOCKRESPONSE_RESULTSENTRY']._serialized_options = b'8\001'
+  _globals['_STOCKIMPORTCHUNK_ITEMSENTRY']._loaded_options = None
+  _globals['_STOCKIMPORTCHUNK_ITEMSENTRY']._serialized_options = b'8\001'
+  _globals['_STOCKIMPORTSUMMARY_ERRORSENTRY']._loaded_options = None
+  _globals['_STOCKIMPORTSUMMARY_ERRORSENTRY']._serialized_options = b'8\001'
+  _globals['_CHECKANDRESERVERESPONSE_AVAILABILITYENTRY']._loaded_options = None
+  _globals['_CHECKANDRESERVERESPONSE_AVAILABILITYENTRY']._serialized_options = b'8\001'
+  _globals['_CHECKANDRESERVERESPONSE_RESULTSENTRY']._loaded_options = None
+  _globals['_CHECKANDRESERVERESPONSE_RESULTSENTRY']._serialized_options = b'8\001'
+  _globals['_RESERVATIONRESPONSE_MESSAGESENTRY']._loaded_options = None
+  _globals['_RESERVATIONRESPONSE_MESSAGESENTRY']._serialized_options = b'8\001'
   _globals['_INVENTORYREQUEST']._serialized_start=19
   _globals['_INVENTORYREQUEST']._serialized_end=128
   _globals['_INVENTORYREQUEST_ITEMSENTRY']._serialized_start=84
@@ -83,6 +93,32 @@ if not _descriptor._USE_C_DESCRIPTORS:
   _globals['_RESTOCKRESPONSE_RESULTSENTRY']._serialized_end=1090
   _globals['_RESTOCKSTATUS']._serialized_start=1092
   _globals['_RESTOCKSTATUS']._serialized_end=1156
-  _globals['_INVENTORYSERVICE']._serialized_start=1159
-  _globals['_INVENTORYSERVICE']._serialized_end=1390
+  _globals['_STOCKIMPORTCHUNK']._serialized_start=1159
+  _globals['_STOCKIMPORTCHUNK']._serialized_end=1339
+  _globals['_STOCKIMPORTCHUNK_ITEMSENTRY']._serialized_start=1262
+  _globals['_STOCKIMPORTCHUNK_ITEMSENTRY']._serialized_end=1306
+  _globals['_STOCKIMPORTCHUNK_MODE']._serialized_start=1308
+  _globals['_STOCKIMPORTCHUNK_MODE']._serialized_end=1339
+  _globals['_STOCKIMPORTSUMMARY']._serialized_start=1342
+  _globals['_STOCKIMPORTSUMMARY']._serialized_end=1560
+  _globals['_STOCKIMPORTSUMMARY_ERRORSENTRY']._serialized_start=1515
+  _globals['_STOCKIMPORTSUMMARY_ERRORSENTRY']._serialized_end=1560
+  _globals['_CHECKANDRESERVERESPONSE']._serialized_start=1563
+  _globals['_CHECKANDRESERVERESPONSE']._serialized_end=1893
+  _globals['_CHECKANDRESERVERESPONSE_AVAILABILITYENTRY']._serialized_start=212
+  _globals['_CHECKANDRESERVERESPONSE_AVAILABILITYENTRY']._serialized_end=263
+  _globals['_CHECKANDRESERVERESPONSE_RESULTSENTRY']._serialized_start=464
+  _globals['_CHECKANDRESERVERESPONSE_RESULTSENTRY']._serialized_end=526
+  _globals['_RESERVEBATCHREQUEST']._serialized_start=1895
+  _globals['_RESERVEBATCHREQUEST']._serialized_end=1951
+  _globals['_RESERVEBATCHRESPONSE']._serialized_start=1953
+  _globals['_RESERVEBATCHRESPONSE']._serialized_end=2020
+  _globals['_RESERVATIONREQUEST']._serialized_start=2022
+  _globals['_RESERVATIONREQUEST']._serialized_end=2066
+  _globals['_RESERVATIONRESPONSE']._serialized_start=2069
+  _globals['_RESERVATIONRESPONSE']._serialized_end=2217
+  _globals['_RESERVATIONRESPONSE_MESSAGESENTRY']._serialized_start=780
+  _globals['_RESERVATIONRESPONSE_MESSAGESENTRY']._serialized_end=827
+  _globals['_INVENTORYSERVICE']._serialized_start=2220
+  _globals['_INVENTORYSERVICE']._serialized_end=2836
 # @@protoc_insertion_point(module_scope)
@@ -54,6 +54,36 @@ class InventoryServiceStub(object):
                 request_serializer=inventory__pb2.ReleaseRequest.SerializeToString,
                 response_deserializer=inventory__pb2.ReleaseResponse.FromString,
                 _registered_method=True)
+        self.CheckAndReserve = channel.unary_unary(
+                '/InventoryService/CheckAndReserve',
+                request_serializer=inventory__pb2.ReserveRequest.SerializeToString,
+                response_deserializer=inventory__pb2.CheckAndReserveResponse.FromString,
+                _registered_method=True)
+        self.CheckAndReserveBatch = channel.unary_unary(
+                '/InventoryService/CheckAndReserveBatch',
+                request_serializer=inventory__pb2.ReserveBatchRequest.SerializeToString,
+                response_deserializer=inventory__pb2.ReserveBatchResponse.FromString,
+                _registered_method=True)
+        self.ConfirmReservations = channel.unary_unary(
+                '/InventoryService/ConfirmReservations',
+                request_serializer=inventory__pb2.ReservationRequest.SerializeToString,
+                response_deserializer=inventory__pb2.ReservationResponse.FromString,
+                _registered_method=True)
+        self.ReleaseReservations = channel.unary_unary(
+                '/InventoryService/ReleaseReservations',
+                request_serializer=inventory__pb2.ReservationRequest.SerializeToString,
+                response_deserializer=inventory__pb2.ReservationResponse.FromString,
+                _registered_method=True)
+        self.StreamAvailability = channel.stream_stream(
+                '/InventoryService/StreamAvailability',
+                request_serializer=inventory__pb2.InventoryRequest.SerializeToString,
+                response_deserializer=inventory__pb2.InventoryResponse.FromString,
+                _registered_method=True)
+        self.ImportStock = channel.stream_unary(
+                '/InventoryService/ImportStock',
+                request_serializer=inventory__pb2.StockImportChunk.SerializeToString,
+                response_deserializer=inventory__pb2.StockImportSummary.FromString,
+                _registered_method=True)
 
 
 class InventoryServiceServicer(object):
@@ -66,7 +96,8 @@ class InventoryServiceServicer(object):
         raise NotImplementedError('Method not implemented!')
 
     def ReserveItems(self, request, context):
-        """Missing associated documentation comment in .proto file."""
+        """Altes Paar ohne Hold: ReserveItems nimmt den Bestand sofort, nur ReleaseItems gibt ihn zurück (läuft nie ab)
+        """
         context.set_code(grpc.StatusCode.UNIMPLEMENTED)
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
@@ -83,6 +114,47 @@ class InventoryServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def CheckAndReserve(self, request, context):
+        """Prüft und reserviert in einem Aufruf, alles-oder-nichts über alle Items
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def CheckAndReserveBatch(self, request, context):
+        """Mehrere Bestellungen in einem Aufruf, jede für sich alles-oder-nichts (in Reihenfolge)
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def ConfirmReservations(self, request, context):
+        """Reservierungen sind Holds mit Ablaufzeit: bestätigen (Bestand bleibt weg) oder freigeben
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def ReleaseReservations(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def StreamAvailability(self, request_iterator, context):
+        """Große Anfragen (z.B. Katalog-Sync) in Chunks: je Request-Chunk ein Response-Chunk, gleiche Reihenfolge
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def ImportStock(self, request_iterator, context):
+        """Bestandsimport (z.B. nächtlicher Lager-Feed) in Chunks, wird in kurzen Batches angewendet
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_InventoryServiceServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -106,6 +178,36 @@ def add_InventoryServiceServicer_to_server(servicer, server):
                     request_deserializer=inventory__pb2.ReleaseRequest.FromString,
                     response_serializer=inventory__pb2.ReleaseResponse.SerializeToString,
             ),
+            'CheckAndReserve': grpc.unary_unary_rpc_method_handler(
+                    servicer.CheckAndReserve,
+                    request_deserializer=inventory__pb2.ReserveRequest.FromString,
+                    response_serializer=inventory__pb2.CheckAndReserveResponse.SerializeToString,
+            ),
+            'CheckAndReserveBatch': grpc.unary_unary_rpc_method_handler(
+                    servicer.CheckAndReserveBatch,
+                    request_deserializer=inventory__pb2.ReserveBatchRequest.FromString,
+                    response_serializer=inventory__pb2.ReserveBatchResponse.SerializeToString,
+            ),
+            'ConfirmReservations': grpc.unary_unary_rpc_method_handler(
+                    servicer.ConfirmReservations,
+                    request_deserializer=inventory__pb2.ReservationRequest.FromString,
+                    response_serializer=inventory__pb2.ReservationResponse.SerializeToString,
+            ),
+            'ReleaseReservations': grpc.unary_unary_rpc_method_handler(
+                    servicer.ReleaseReservations,
+                    request_deserializer=inventory__pb2.ReservationRequest.FromString,
+                    response_serializer=inventory__pb2.ReservationResponse.SerializeToString,
+            ),
+            'StreamAvailability': grpc.stream_stream_rpc_method_handler(
+                    servicer.StreamAvailability,
+                    request_deserializer=inventory__pb2.InventoryRequest.FromString,
+                    response_serializer=inventory__pb2.InventoryResponse.SerializeToString,
+            ),
+            'ImportStock': grpc.stream_unary_rpc_method_handler(
+                    servicer.ImportStock,
+                    request_deserializer=inventory__pb2.StockImportChunk.FromString,
+                    response_serializer=inventory__pb2.StockImportSummary.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'InventoryService', rpc_method_handlers)
@@ -224,3 +326,165 @@ class InventoryService(object):
             timeout,
             metadata,
             _registered_method=True)
+
+    @staticmethod
+    def CheckAndReserve(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/InventoryService/CheckAndReserve',
+            inventory__pb2.ReserveRequest.SerializeToString,
+            inventory__pb2.CheckAndReserveResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def CheckAndReserveBatch(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/InventoryService/CheckAndReserveBatch',
+            inventory__pb2.ReserveBatchRequest.SerializeToString,
+            inventory__pb2.ReserveBatchResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def ConfirmReservations(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/InventoryService/ConfirmReservations',
+            inventory__pb2.ReservationRequest.SerializeToString,
+            inventory__pb2.ReservationResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def ReleaseReservations(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/InventoryService/ReleaseReservations',
+            inventory__pb2.ReservationRequest.SerializeToString,
+            inventory__pb2.ReservationResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def StreamAvailability(request_iterator,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.stream_stream(
+            request_iterator,
+            target,
+            '/InventoryService/StreamAvailability',
+            inventory__pb2.InventoryRequest.SerializeToString,
+            inventory__pb2.InventoryResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def ImportStock(request_iterator,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.stream_unary(
+            request_iterator,
+            target,
+            '/InventoryService/ImportStock',
+            inventory__pb2.StockImportChunk.SerializeToString,
+            inventory__pb2.StockImportSummary.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
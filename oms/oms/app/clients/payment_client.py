@@ -1,42 +1,123 @@
+import asyncio
+import random
+
 import httpx
+from decimal import Decimal
 from typing import Optional
-from oms.app.core.config import PAYMENT_URL, REQUEST_TIMEOUT
+from oms.app.core.config import (
+    PAYMENT_URL,
+    PAYMENT_CONNECT_TIMEOUT,
+    PAYMENT_READ_TIMEOUT,
+    PAYMENT_WRITE_TIMEOUT,
+    PAYMENT_POOL_TIMEOUT,
+    PAYMENT_MAX_CONNECTIONS,
+    PAYMENT_MAX_KEEPALIVE_CONNECTIONS,
+    PAYMENT_KEEPALIVE_EXPIRY,
+    PAYMENT_HTTP2,
+    PAYMENT_RETRIES,
+    PAYMENT_RETRY_BACKOFF,
+    PAYMENT_BATCH_SIZE,
+)
 
 
 class PaymentError(Exception):
     """Custom exception for payment errors."""
 
 
+_client: Optional[httpx.AsyncClient] = None
+
+
+def _build_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        base_url=PAYMENT_URL,
+        http2=PAYMENT_HTTP2,
+        timeout=httpx.Timeout(
+            connect=PAYMENT_CONNECT_TIMEOUT,
+            read=PAYMENT_READ_TIMEOUT,
+            write=PAYMENT_WRITE_TIMEOUT,
+            pool=PAYMENT_POOL_TIMEOUT,
+        ),
+        limits=httpx.Limits(
+            max_connections=PAYMENT_MAX_CONNECTIONS,
+            max_keepalive_connections=PAYMENT_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=PAYMENT_KEEPALIVE_EXPIRY,
+        ),
+    )
+
+
+async def start_client() -> None:
+    """Creates the application-scoped HTTP client. Called on application startup."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = _build_client()
+
+
+async def close_client() -> None:
+    """Closes the shared HTTP client and its connection pool. Called on application shutdown."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def get_client() -> httpx.AsyncClient:
+    """Returns the shared client, creating it on first use if startup did not run (e.g. scripts)."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = _build_client()
+    return _client
+
+
+async def _post_with_retries(path: str, json: dict, headers: dict) -> httpx.Response:
+    """
+    POSTs and retries transport errors (timeouts, resets) and 5xx answers with jittered
+    exponential backoff. Only safe for requests with an Idempotency-Key: the payment service
+    answers a retry with the outcome of the first attempt instead of charging again.
+    """
+    attempt = 0
+    while True:
+        try:
+            response = await get_client().post(path, json=json, headers=headers)
+            if response.status_code < 500 or attempt >= PAYMENT_RETRIES:
+                return response
+        except httpx.RequestError:
+            if attempt >= PAYMENT_RETRIES:
+                raise
+        await asyncio.sleep(random.uniform(0, PAYMENT_RETRY_BACKOFF * 2 ** attempt))
+        attempt += 1
+
+
 async def authorize(
     order_id: str,
     customer_id: str,
-    amount: float,
+    amount: Decimal,
     method: str = "CARD",
     correlation_id: Optional[str] = None
 ) -> dict:
-    headers = {}
+    # je Order genau eine Abbuchung, auch wenn der Request wiederholt wird
+    headers = {"Idempotency-Key": order_id}
     if correlation_id:
         headers["X-Correlation-ID"] = correlation_id
 
     try:
-        async with httpx.AsyncClient(timeout=REQUEST_TIMEOUT) as client:
-            response = await client.post(
-                f"{PAYMENT_URL}/payments",
-                json={
-                    "order_id": order_id,
-                    "customer_id": customer_id,
-                    "amount": amount,
-                    "method": method
-                },
-                headers=headers,
-            )
-            response.raise_for_status()
-            data = response.json()
+        response = await _post_with_retries(
+            "/payments",
+            json={
+                "order_id": order_id,
+                "customer_id": customer_id,
+                # als String, damit der Betrag exakt ankommt (kein Float)
+                "amount": str(amount),
+                "method": method
+            },
+            headers=headers,
+        )
+        response.raise_for_status()
+        data = response.json()
 
-            if not {"payment_id", "status"}.issubset(data):
-                raise PaymentError("Invalid response from payment service")
+        if not {"payment_id", "status"}.issubset(data):
+            raise PaymentError("Invalid response from payment service")
 
-            return data
+        return data
 
     except httpx.RequestError as e:
         raise PaymentError(f"Payment service request error: {e}") from e
@@ -45,5 +126,74 @@ async def authorize(
             return {"status": "DECLINED"}
         if e.response.status_code == 404:
             return {"status": "NOTFOUND"}
+        raise PaymentError(f"Payment service returned {e.response.status_code}") from e
     except httpx.HTTPError as e:
         raise PaymentError(f"Payment service HTTP error: {e}") from e
+
+
+
+async def refund(
+    order_id: str,
+    customer_id: str,
+    amount: Decimal,
+    correlation_id: Optional[str] = None
+) -> dict:
+    """
+    Gives a captured payment back (POST /payments/refunds). Idempotent per order_id, so it is
+    retried like authorize(). Raises PaymentError if the refund did not go through.
+    """
+    headers = {"X-Correlation-ID": correlation_id} if correlation_id else {}
+    try:
+        response = await _post_with_retries(
+            "/payments/refunds",
+            json={"order_id": order_id, "customer_id": customer_id, "amount": str(amount)},
+            headers=headers,
+        )
+        response.raise_for_status()
+        return response.json()
+    except httpx.HTTPStatusError as e:
+        raise PaymentError(f"Refund returned {e.response.status_code}") from e
+    except httpx.HTTPError as e:
+        raise PaymentError(f"Payment service request error: {e}") from e
+
+def _batch_result(result: dict):
+    status_code = result.get("status_code")
+    if status_code == 201 and result.get("payment"):
+        return result["payment"]
+    if status_code == 402:
+        return {"status": "DECLINED"}
+    if status_code == 404:
+        return {"status": "NOTFOUND"}
+    return PaymentError(f"Payment service returned {status_code}: {result.get('error')}")
+
+
+async def authorize_batch(
+    payments: list[dict],
+    correlation_id: Optional[str] = None
+) -> list:
+    """
+    Authorizes many payments ({order_id, customer_id, amount, method}) with POST /payments/batch,
+    one request per PAYMENT_BATCH_SIZE payments. Returns one entry per payment, in order: the
+    payment dict like authorize(), or a PaymentError for that payment.
+
+    Retries are safe because the payment service deduplicates every item by its order_id.
+    A failure of a whole request raises PaymentError.
+    """
+    headers = {"X-Correlation-ID": correlation_id} if correlation_id else {}
+    results: list = []
+    for start in range(0, len(payments), PAYMENT_BATCH_SIZE):
+        chunk = payments[start:start + PAYMENT_BATCH_SIZE]
+        try:
+            response = await _post_with_retries("/payments/batch", json={"payments": chunk}, headers=headers)
+            response.raise_for_status()
+            data = response.json()
+        except httpx.HTTPStatusError as e:
+            raise PaymentError(f"Payment service returned {e.response.status_code}") from e
+        except httpx.HTTPError as e:
+            raise PaymentError(f"Payment service request error: {e}") from e
+
+        answers = data.get("results") if isinstance(data, dict) else None
+        if not isinstance(answers, list) or len(answers) != len(chunk):
+            raise PaymentError("Invalid response from payment service")
+        results.extend(_batch_result(answer) for answer in answers)
+    return results
@@ -1,44 +1,42 @@
-import json
-import threading
-import time
+import asyncio
 
-import pika
 from fastapi import FastAPI
 from .rabbitmq.receive import start_wms_listener
+from .rabbitmq.stock_events import start_stock_listener
 from .routers.orders import router as orders
-from oms.app.service.oms_service import write_in_store
+from oms.app.clients import inventory_client, inventory_aio_client, payment_client
+from oms.app.core.config import AVAILABILITY_CACHE_ENABLED
+from oms.app.rabbitmq.message_sender import get_publisher, get_wms_publisher
+from oms.app.service.oms_service import close_store
 
 app = FastAPI(title="OMS API", version="1.0.0")
 app.include_router(orders, prefix="/orders", tags=["Orders"])
 
 
-def start_wms_listener_blocking():
-    print("[OMS] Listener-Thread gestartet!", flush=True)
-    while True:
-        print("[OMS] Thread lebt noch!", flush=True)
-        time.sleep(5)
-        try:
-            connection = pika.BlockingConnection(pika.ConnectionParameters("rabbitmq"))
-            channel = connection.channel()
-            channel.exchange_declare(exchange="oms_event", exchange_type="topic")
-            queue = channel.queue_declare(queue="oms_queue", durable=True)
-            channel.queue_bind(exchange="oms_event", queue="oms_queue", routing_key="oms")
-
-            def callback(ch, method, properties, body):
-                print("[OMS] Nachricht empfangen:", body.decode())
-                data = json.loads(body)
-                order_id = data.get("orderId")
-                event = data.get("event")
-                write_in_store(order_id, event)
+@app.on_event("startup")
+async def startup_event():
+    await payment_client.start_client()
+    print("[OMS] Starte WMS-Listener …")
+    app.state.wms_listener = asyncio.create_task(start_wms_listener())
+    app.state.stock_listener = None
+    if AVAILABILITY_CACHE_ENABLED:
+        app.state.stock_listener = asyncio.create_task(start_stock_listener())
 
-            channel.basic_consume(queue="oms_queue", on_message_callback=callback, auto_ack=True)
-            print("[OMS] Listener aktiv.")
-            channel.start_consuming()
-        except Exception as e:
-            print("[OMS] Fehler:", e)
-            time.sleep(5)
 
-@app.on_event("startup")
-def startup_event():
-    print("[OMS] Starte Listener-Thread …")
-    threading.Thread(target=start_wms_listener_blocking, daemon=True).start()
+@app.on_event("shutdown")
+async def shutdown_event():
+    for listener in (app.state.wms_listener, app.state.stock_listener):
+        if listener is None:
+            continue
+        listener.cancel()
+        try:
+            await listener
+        except asyncio.CancelledError:
+            pass
+    print("[OMS] Schließe Inventory-Channels …")
+    inventory_client.close_channels()
+    await inventory_aio_client.close_channels()
+    await payment_client.close_client()
+    close_store()
+    get_publisher().close()
+    get_wms_publisher().close()
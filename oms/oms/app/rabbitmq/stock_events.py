@@ -0,0 +1,50 @@
+import asyncio
+import json
+import random
+
+import aio_pika
+from oms.app.core.config import RABBIT_URL, WMS_RECONNECT_MIN_DELAY, WMS_RECONNECT_MAX_DELAY
+from oms.app.service.oms_service import apply_stock_levels, reset_availability_cache
+
+EXCHANGE_NAME = "inventory_event"
+ROUTING_KEY = "stock.changed"
+
+
+async def start_stock_listener():
+    """
+    Keeps the availability cache in sync with the stock-change events of the inventory.
+    Every OMS instance gets its own exclusive queue, events are not acked (a lost event only
+    costs freshness until the cache TTL). Reconnects with the same backoff as the WMS listener.
+    """
+    attempt = 0
+    while True:
+        try:
+            connection = await aio_pika.connect(RABBIT_URL)
+            async with connection:
+                channel = await connection.channel()
+                exchange = await channel.declare_exchange(EXCHANGE_NAME, aio_pika.ExchangeType.TOPIC)
+                queue = await channel.declare_queue(exclusive=True)
+                await queue.bind(exchange, routing_key=ROUTING_KEY)
+                # Während der Trennung verpasste Events -> alten Cache-Stand nicht weiterverwenden
+                reset_availability_cache()
+                print("[OMS] Stock-Listener aktiv.")
+                attempt = 0
+                async with queue.iterator(no_ack=True) as messages:
+                    async for message in messages:
+                        _apply(message.body)
+                raise ConnectionError("queue iterator closed")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            delay = random.uniform(0, min(WMS_RECONNECT_MAX_DELAY, WMS_RECONNECT_MIN_DELAY * 2 ** attempt))
+            attempt += 1
+            print(f"[OMS] Stock-Listener Fehler: {e!r}. Neuer Versuch in {delay:.1f} Sekunden...")
+            await asyncio.sleep(delay)
+
+
+def _apply(body: bytes) -> None:
+    try:
+        levels = json.loads(body)["levels"]
+        apply_stock_levels({str(sku): int(level) for sku, level in levels.items()})
+    except (ValueError, KeyError, TypeError, AttributeError):
+        print(f"[OMS] Ungültiges Stock-Event verworfen: {body!r}")
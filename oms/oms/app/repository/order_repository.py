@@ -0,0 +1,397 @@
+import queue
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left, bisect_right, insort
+from collections import OrderedDict
+from datetime import datetime
+from typing import Iterable, Optional
+
+from oms.app.core.config import ORDER_STORE, ORDER_DB_PATH, ORDER_DB_BATCH_SIZE, ORDER_DB_FLUSH_INTERVAL, \
+    ORDER_CACHE_SIZE, ORDER_CACHE_TTL
+from oms.app.schema.schema import Order
+
+# Sortierschlüssel für alle Listen: (createdAt, orderId)
+IndexKey = tuple[datetime, str]
+
+
+def index_key(order: Order) -> IndexKey:
+    return order.createdAt, order.orderId
+
+
+class OrderRepository(ABC):
+    """Storage backend for orders. Pages are always sorted by (createdAt, orderId)."""
+
+    @abstractmethod
+    def save(self, order: Order) -> None:
+        ...
+
+    @abstractmethod
+    def get(self, order_id: str) -> Optional[Order]:
+        ...
+
+    def exists(self, order_id: str) -> bool:
+        return self.get(order_id) is not None
+
+    def existing(self, order_ids: Iterable[str]) -> set[str]:
+        """Returns the subset of the given ids that already exist."""
+        return {order_id for order_id in order_ids if self.exists(order_id)}
+
+    @abstractmethod
+    def update_status(self, order_id: str, status: str) -> Optional[Order]:
+        ...
+
+    @abstractmethod
+    def list(
+        self,
+        status: Optional[str] = None,
+        customer_id: Optional[str] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+        after: Optional[IndexKey] = None,
+        limit: int = 50,
+    ) -> tuple[list[Order], bool]:
+        """Returns up to `limit` orders after the key `after` and whether more orders follow."""
+
+    def close(self) -> None:
+        pass
+
+
+class InMemoryOrderRepository(OrderRepository):
+    """
+    Process-local store. Secondary indexes (all, per status, per customer) are sorted lists,
+    so a page is found with bisect instead of a full scan.
+    """
+
+    def __init__(self):
+        self._orders: dict[str, Order] = {}
+        self._index: list[IndexKey] = []
+        self._by_status: dict[str, list[IndexKey]] = {}
+        self._by_customer: dict[str, list[IndexKey]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _remove_key(index: list[IndexKey], key: IndexKey) -> None:
+        pos = bisect_left(index, key)
+        if pos < len(index) and index[pos] == key:
+            del index[pos]
+
+    def save(self, order: Order) -> None:
+        key = index_key(order)
+        with self._lock:
+            previous = self._orders.get(order.orderId)
+            if previous is not None:
+                old_key = index_key(previous)
+                self._remove_key(self._index, old_key)
+                self._remove_key(self._by_status.get(previous.status, []), old_key)
+                self._remove_key(self._by_customer.get(previous.customer.customerId, []), old_key)
+            self._orders[order.orderId] = order
+            insort(self._index, key)
+            insort(self._by_status.setdefault(order.status, []), key)
+            insort(self._by_customer.setdefault(order.customer.customerId, []), key)
+
+    def get(self, order_id: str) -> Optional[Order]:
+        return self._orders.get(order_id)
+
+    def update_status(self, order_id: str, status: str) -> Optional[Order]:
+        with self._lock:
+            order = self._orders.get(order_id)
+            if order is None:
+                return None
+            key = index_key(order)
+            self._remove_key(self._by_status.get(order.status, []), key)
+            order.status = status
+            order.updatedAt = datetime.utcnow()
+            insort(self._by_status.setdefault(status, []), key)
+            return order
+
+    def list(self, status=None, customer_id=None, created_from=None, created_to=None, after=None, limit=50):
+        with self._lock:
+            candidates = [self._index]
+            if status is not None:
+                candidates.append(self._by_status.get(status, []))
+            if customer_id is not None:
+                candidates.append(self._by_customer.get(customer_id, []))
+            index = min(candidates, key=len)
+
+            start = 0
+            if after is not None:
+                start = bisect_right(index, after)
+            if created_from is not None:
+                start = max(start, bisect_left(index, (created_from, "")))
+
+            page: list[Order] = []
+            for pos in range(start, len(index)):
+                key = index[pos]
+                if created_to is not None and key[0] >= created_to:
+                    break
+                order = self._orders[key[1]]
+                if status is not None and order.status != status:
+                    continue
+                if customer_id is not None and order.customer.customerId != customer_id:
+                    continue
+                if len(page) == limit:
+                    return page, True
+                page.append(order)
+            return page, False
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS orders (
+    order_id    TEXT PRIMARY KEY,
+    created_at  TEXT NOT NULL,
+    status      TEXT NOT NULL,
+    customer_id TEXT NOT NULL,
+    data        TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_orders_created ON orders (created_at, order_id);
+CREATE INDEX IF NOT EXISTS idx_orders_status ON orders (status, created_at, order_id);
+CREATE INDEX IF NOT EXISTS idx_orders_customer ON orders (customer_id, created_at, order_id);
+"""
+
+_UPSERT = "INSERT OR REPLACE INTO orders (order_id, created_at, status, customer_id, data) VALUES (?, ?, ?, ?, ?)"
+_SELECT_ONE = "SELECT data FROM orders WHERE order_id = ?"
+# SQLite erlaubt standardmäßig höchstens 999 Parameter pro Statement
+_MAX_PARAMS = 500
+# Wartezeit zwischen Commit-Versuchen, wenn die Datenbank gesperrt oder die Platte voll ist
+_RETRY_DELAY = 0.1
+_MAX_RETRY_DELAY = 5.0
+
+_TS_FORMAT = "%Y-%m-%dT%H:%M:%S.%f"  # feste Breite -> lexikografisch sortierbar
+
+_STOP = object()
+
+
+def _ts(value: datetime) -> str:
+    return value.strftime(_TS_FORMAT)
+
+
+class SqliteOrderRepository(OrderRepository):
+    """
+    SQLite store in WAL mode. Writes are queued and committed in batches by a background
+    thread (write-behind), so requests never wait for a commit. Recently written and read
+    orders are kept in an in-process LRU cache; orders that are not committed yet are always
+    served from memory, and list() merges them into the committed rows instead of waiting for
+    the writer. A failed commit is retried, the orders stay pending until it succeeds.
+    """
+
+    def __init__(self, path: str, batch_size: int = 200, flush_interval: float = 0.05,
+                 cache_size: int = 10000, cache_ttl: float = 2.0):
+        self._path = path
+        self._batch_size = max(batch_size, 1)
+        self._flush_interval = flush_interval
+        self._cache_size = cache_size
+        self._cache_ttl = cache_ttl
+        self._cache: OrderedDict[str, tuple[Order, float]] = OrderedDict()
+        self._pending: dict[str, Order] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._queue: queue.Queue = queue.Queue()
+
+        conn = self._connect()
+        conn.executescript(_SCHEMA)
+        conn.commit()
+
+        self._writer = threading.Thread(target=self._run_writer, name="order-writer", daemon=True)
+        self._writer.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # sqlite3 cached die kompilierten Statements je Verbindung (prepared statements)
+            conn = sqlite3.connect(self._path, check_same_thread=False, cached_statements=64)
+            conn.execute("PRAGMA journal_mode=WAL")
+            # NORMAL: kein fsync pro Commit, WAL wird beim Checkpoint gesynct
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    # --- Cache ---
+
+    def _cache_put(self, order: Order) -> None:
+        self._cache[order.orderId] = (order, time.monotonic() + self._cache_ttl)
+        self._cache.move_to_end(order.orderId)
+        while len(self._cache) > self._cache_size:
+            self._cache.popitem(last=False)
+
+    def _cache_get(self, order_id: str) -> Optional[Order]:
+        entry = self._cache.get(order_id)
+        if entry is None:
+            return None
+        order, expires_at = entry
+        if expires_at < time.monotonic():
+            # andere Worker können den Status geändert haben
+            del self._cache[order_id]
+            return None
+        self._cache.move_to_end(order_id)
+        return order
+
+    # --- Schreiben (write-behind) ---
+
+    def save(self, order: Order) -> None:
+        with self._lock:
+            self._pending[order.orderId] = order
+            self._cache_put(order)
+        self._queue.put(order)
+
+    def update_status(self, order_id: str, status: str) -> Optional[Order]:
+        order = self.get(order_id)
+        if order is None:
+            return None
+        updated = order.model_copy(update={"status": status, "updatedAt": datetime.utcnow()})
+        self.save(updated)
+        return updated
+
+    def _run_writer(self) -> None:
+        conn = self._connect()
+        while True:
+            try:
+                item = self._queue.get(timeout=self._flush_interval)
+            except queue.Empty:
+                continue
+            batch = [item]
+            while len(batch) < self._batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            orders = [o for o in batch if o is not _STOP]
+            if orders:
+                self._commit(conn, orders)
+            for _ in batch:
+                self._queue.task_done()
+            if _STOP in batch:
+                return
+
+    def _commit(self, conn: sqlite3.Connection, orders: list[Order]) -> None:
+        # letzte Version je Order gewinnt
+        latest = {o.orderId: o for o in orders}
+        rows = [(o.orderId, _ts(o.createdAt), o.status, o.customer.customerId, o.model_dump_json())
+                for o in latest.values()]
+        delay = _RETRY_DELAY
+        while True:
+            try:
+                with conn:
+                    conn.executemany(_UPSERT, rows)
+                break
+            except sqlite3.OperationalError as e:
+                # gesperrt, Platte voll, I/O-Fehler: vorübergehend -> erneut versuchen, Orders bleiben pending
+                print(f"[OMS] Fehler beim Schreiben von {len(rows)} Orders, neuer Versuch in {delay:.1f}s: {e}")
+                time.sleep(delay)
+                delay = min(delay * 2, _MAX_RETRY_DELAY)
+            except sqlite3.Error as e:
+                # dauerhafter Fehler: einzeln schreiben, damit nur die betroffenen Orders fehlen
+                print(f"[OMS] Fehler beim Schreiben von {len(rows)} Orders: {e}")
+                self._commit_each(conn, rows)
+                break
+        with self._lock:
+            for order in latest.values():
+                if self._pending.get(order.orderId) is order:
+                    del self._pending[order.orderId]
+
+    @staticmethod
+    def _commit_each(conn: sqlite3.Connection, rows: list[tuple]) -> None:
+        for row in rows:
+            try:
+                with conn:
+                    conn.execute(_UPSERT, row)
+            except sqlite3.Error as e:
+                print(f"[OMS] Order {row[0]} konnte nicht gespeichert werden und wird verworfen: {e}")
+
+    def flush(self) -> None:
+        """Blocks until every queued write is committed."""
+        self._queue.join()
+
+    # --- Lesen ---
+
+    def get(self, order_id: str) -> Optional[Order]:
+        with self._lock:
+            order = self._pending.get(order_id)
+            if order is None:
+                order = self._cache_get(order_id)
+        if order is not None:
+            return order
+        row = self._connect().execute(_SELECT_ONE, (order_id,)).fetchone()
+        if row is None:
+            return None
+        order = Order.model_validate_json(row[0])
+        with self._lock:
+            if order_id not in self._pending:
+                self._cache_put(order)
+        return order
+
+    def existing(self, order_ids: Iterable[str]) -> set[str]:
+        """Like exists() for many ids, with one SELECT per _MAX_PARAMS ids that are not in memory."""
+        found, unknown = set(), []
+        with self._lock:
+            for order_id in order_ids:
+                if order_id in self._pending or self._cache_get(order_id) is not None:
+                    found.add(order_id)
+                else:
+                    unknown.append(order_id)
+        conn = self._connect()
+        for start in range(0, len(unknown), _MAX_PARAMS):
+            chunk = unknown[start:start + _MAX_PARAMS]
+            sql = f"SELECT order_id FROM orders WHERE order_id IN ({','.join('?' * len(chunk))})"
+            found.update(row[0] for row in conn.execute(sql, chunk))
+        return found
+
+    @staticmethod
+    def _matches(order: Order, status, customer_id, created_from, created_to, after) -> bool:
+        key = index_key(order)
+        return ((status is None or order.status == status)
+                and (customer_id is None or order.customer.customerId == customer_id)
+                and (created_from is None or key[0] >= created_from)
+                and (created_to is None or key[0] < created_to)
+                and (after is None or key > after))
+
+    def list(self, status=None, customer_id=None, created_from=None, created_to=None, after=None, limit=50):
+        # noch nicht geschriebene Orders vor der Abfrage festhalten: was danach committed wird, ist hier noch enthalten
+        with self._lock:
+            pending = dict(self._pending)
+        clauses, params = [], []
+        if status is not None:
+            clauses.append("status = ?")
+            params.append(status)
+        if customer_id is not None:
+            clauses.append("customer_id = ?")
+            params.append(customer_id)
+        if created_from is not None:
+            clauses.append("created_at >= ?")
+            params.append(_ts(created_from))
+        if created_to is not None:
+            clauses.append("created_at < ?")
+            params.append(_ts(created_to))
+        if after is not None:
+            clauses.append("(created_at, order_id) > (?, ?)")
+            params.extend([_ts(after[0]), after[1]])
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        sql = f"SELECT order_id, data FROM orders {where} ORDER BY created_at, order_id LIMIT ?"
+        # jede Pending-Order kann höchstens eine veraltete Zeile verdrängen
+        rows = self._connect().execute(sql, (*params, limit + 1 + len(pending))).fetchall()
+        orders = [Order.model_validate_json(data) for order_id, data in rows if order_id not in pending]
+        orders.extend(o for o in pending.values()
+                      if self._matches(o, status, customer_id, created_from, created_to, after))
+        orders.sort(key=index_key)
+        return orders[:limit], len(orders) > limit
+
+    def close(self) -> None:
+        self._queue.put(_STOP)
+        self._writer.join(timeout=5)
+
+
+def create_repository() -> OrderRepository:
+    """Builds the order store selected with ORDER_STORE."""
+    if ORDER_STORE == "sqlite":
+        return SqliteOrderRepository(
+            ORDER_DB_PATH,
+            batch_size=ORDER_DB_BATCH_SIZE,
+            flush_interval=ORDER_DB_FLUSH_INTERVAL,
+            cache_size=ORDER_CACHE_SIZE,
+            cache_ttl=ORDER_CACHE_TTL,
+        )
+    if ORDER_STORE == "memory":
+        return InMemoryOrderRepository()
+    raise ValueError(f"Unknown order store backend: {ORDER_STORE}")
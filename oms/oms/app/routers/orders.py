@@ -1,7 +1,12 @@
-from fastapi import APIRouter, HTTPException, status, Request
+from datetime import datetime
+from typing import Optional
+
+import grpc
+from fastapi import APIRouter, HTTPException, status, Request, Query
 
 from ..exceptions.exceptions import PaymentDeclinedError, ReserveError, CustomerNotFoundError, InventoryUnavailableError
-from ..schema.schema import createOrder, Order
+from ..schema.schema import createOrder, Order, OrderPage, createOrderBatch, BatchOrderResponse
+from ..clients.payment_client import PaymentError
 from ..service import oms_service
 
 router = APIRouter(prefix="/orders", tags=["Orders"])
@@ -23,6 +28,21 @@ async def create_order(payload: createOrder, request: Request):
         raise HTTPException(status_code=400, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    except grpc.RpcError as e:
+        raise HTTPException(status_code=503, detail=f"Inventory service unavailable: {e.code()}")
+    except PaymentError as e:
+        raise HTTPException(status_code=502, detail=str(e))
+
+
+@router.post("/batch", response_model=BatchOrderResponse)
+async def create_orders_batch(payload: createOrderBatch, request: Request):
+    try:
+        results = await oms_service.create_orders_batch(
+            payload.orders, correlation_id=getattr(request.state, "correlation_id", None)
+        )
+    except grpc.RpcError as e:
+        raise HTTPException(status_code=503, detail=f"Inventory service unavailable: {e.code()}")
+    return BatchOrderResponse(results=results)
 
 
 @router.get("/{orderId}", response_model=Order)
@@ -33,6 +53,24 @@ def get_order(orderId: str):
     return order
 
 
-@router.get("/", response_model=list[Order])
-def list_orders():
-    return oms_service.list_orders()
+@router.get("/", response_model=OrderPage)
+def list_orders(
+    status: Optional[str] = None,
+    customerId: Optional[str] = None,
+    createdFrom: Optional[datetime] = None,
+    createdTo: Optional[datetime] = None,
+    limit: int = Query(default=50, ge=1, le=500),
+    cursor: Optional[str] = None,
+):
+    try:
+        items, next_cursor = oms_service.list_orders(
+            status=status,
+            customer_id=customerId,
+            created_from=createdFrom,
+            created_to=createdTo,
+            limit=limit,
+            cursor=cursor,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return OrderPage(items=items, nextCursor=next_cursor)
@@ -4,6 +4,8 @@ from typing import List, Optional
 
 from pydantic import BaseModel, Field
 
+from oms.app.core.config import BATCH_MAX_ORDERS
+
 
 class Customer(BaseModel):
     customerId: str
@@ -36,3 +38,23 @@ class Order(createOrder):
     status: str = Field(default="Pending")
     createdAt: datetime = Field(default_factory=datetime.utcnow)
     updatedAt: Optional[datetime] = None
+
+
+class OrderPage(BaseModel):
+    items: List[Order]
+    nextCursor: Optional[str] = None
+
+
+class createOrderBatch(BaseModel):
+    orders: List[createOrder] = Field(min_length=1, max_length=BATCH_MAX_ORDERS)
+
+
+class BatchOrderResult(BaseModel):
+    orderId: str
+    status: str
+    order: Optional[Order] = None
+    error: Optional[str] = None
+
+
+class BatchOrderResponse(BaseModel):
+    results: List[BatchOrderResult]
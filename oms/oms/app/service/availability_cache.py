@@ -0,0 +1,60 @@
+import time
+from collections import OrderedDict
+from typing import Mapping
+
+
+class AvailabilityCache:
+    """
+    Upper bound of the stock per SKU, used to skip inventory calls for carts that cannot be served.
+
+    Entries come from the stock-change events of the inventory (the exact level at that time) and
+    from failed reservations (qty was not available -> at most qty - 1). Stock only grows through
+    releases and restocks, which the inventory reports as events as well; the TTL limits how long
+    a lost event can keep a SKU wrongly marked as short. The cache never decides that an order can
+    be served, the reservation in the inventory stays authoritative.
+
+    Only used from the event loop, so no locking.
+    """
+
+    def __init__(self, ttl: float, max_size: int):
+        self._ttl = ttl
+        self._max_size = max_size
+        self._entries: OrderedDict[str, tuple[int, float]] = OrderedDict()
+
+    def _set(self, sku: str, level: int, now: float) -> None:
+        self._entries[sku] = (level, now + self._ttl)
+        self._entries.move_to_end(sku)
+        if len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+
+    def update(self, levels: Mapping[str, int]) -> None:
+        """Stores the levels reported by the inventory."""
+        now = time.monotonic()
+        for sku, level in levels.items():
+            self._set(sku, level, now)
+
+    def record_unavailable(self, sku: str, quantity: int) -> None:
+        """The inventory could not serve `quantity` units, so at most quantity - 1 are left."""
+        now = time.monotonic()
+        entry = self._entries.get(sku)
+        if entry is not None and entry[1] > now and entry[0] < quantity:
+            return
+        self._set(sku, quantity - 1, now)
+
+    def shortages(self, items: Mapping[str, int]) -> dict[str, int]:
+        """Returns the SKUs of the cart whose cached upper bound is below the requested quantity."""
+        now = time.monotonic()
+        short: dict[str, int] = {}
+        for sku, quantity in items.items():
+            entry = self._entries.get(sku)
+            if entry is None:
+                continue
+            level, expires_at = entry
+            if expires_at <= now:
+                del self._entries[sku]
+            elif level < quantity:
+                short[sku] = level
+        return short
+
+    def clear(self) -> None:
+        self._entries.clear()
@@ -1,25 +1,124 @@
+import asyncio
+import base64
+from collections import Counter
+from datetime import datetime, timezone
 from decimal import Decimal
 from typing import Optional
 
-from oms.app.clients import inventory_client as inventory
+from oms.app.clients import inventory_aio_client as inventory
 from oms.app.clients import payment_client as payment
-from oms.app.schema.schema import createOrder, Order
+from oms.app.core.config import AVAILABILITY_CACHE_ENABLED, AVAILABILITY_CACHE_TTL, AVAILABILITY_CACHE_SIZE
+from oms.app.repository.order_repository import OrderRepository, IndexKey, index_key, create_repository
+from oms.app.schema.schema import createOrder, Order, BatchOrderResult
+from oms.app.service.availability_cache import AvailabilityCache
 from oms.app.rabbitmq.message_sender import send_log_message, send_wms_message
-from oms.app.exceptions.exceptions import PaymentDeclinedError, ReserveError, InventoryUnavailableError, \
-    CustomerNotFoundError
+from oms.app.exceptions.exceptions import PaymentDeclinedError, CustomerNotFoundError
 
-_STORE: dict[str, Order] = {}
 ALLOWED_RESTOCK_PID = "ORD-2025-11-4-1755"
 
+_REPO: OrderRepository = create_repository()
+_AVAILABILITY = AvailabilityCache(AVAILABILITY_CACHE_TTL, AVAILABILITY_CACHE_SIZE)
+
+
+def _save(order: Order) -> None:
+    _REPO.save(order)
+
+
+def close_store() -> None:
+    """Flushes pending writes of the order store. Called on application shutdown."""
+    _REPO.close()
+
+
 def write_in_store(order_id, status):
-    _STORE[order_id].status = status
+    _REPO.update_status(order_id, status)
+
+
+def apply_status_updates(updates: list[tuple[str, str]]) -> list[str]:
+    """Applies (orderId, status) updates in order and returns the ids of unknown orders."""
+    unknown = []
+    for order_id, status in updates:
+        if _REPO.update_status(order_id, status) is None:
+            unknown.append(order_id)
+    return unknown
+
+
+def apply_stock_levels(levels: dict[str, int]) -> None:
+    """Stores stock levels from inventory stock-change events in the availability cache."""
+    _AVAILABILITY.update(levels)
+
+
+def reset_availability_cache() -> None:
+    """Drops all cached levels, e.g. after events may have been missed."""
+    _AVAILABILITY.clear()
+
+
+def _cached_shortages(items_map: dict[str, int]) -> dict[str, int]:
+    return _AVAILABILITY.shortages(items_map) if AVAILABILITY_CACHE_ENABLED else {}
+
+
+def _unavailable_from_cache(items_map: dict[str, int], short: dict[str, int]) -> tuple:
+    """Result in the shape of inventory.check_and_reserve for a cart the cache already knows is short."""
+    return False, {pid: pid not in short for pid in items_map}, {}, ""
+
+
+def _remember_unavailable(items_map: dict[str, int], availability: dict[str, bool]) -> None:
+    if not AVAILABILITY_CACHE_ENABLED:
+        return
+    for pid, ok in availability.items():
+        if not ok and pid in items_map:
+            _AVAILABILITY.record_unavailable(pid, items_map[pid])
+
+
+def encode_cursor(key: IndexKey) -> str:
+    created_at, order_id = key
+    return base64.urlsafe_b64encode(f"{created_at.isoformat()}|{order_id}".encode()).decode()
+
+
+def decode_cursor(cursor: str) -> IndexKey:
+    try:
+        created_at, order_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|", 1)
+        return datetime.fromisoformat(created_at), order_id
+    except Exception as e:
+        raise ValueError("Invalid cursor") from e
 
-def list_orders() -> list[Order]:
-    return list(_STORE.values())
+
+def _naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    # createdAt wird als naive UTC-Zeit gespeichert
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def list_orders(
+    status: Optional[str] = None,
+    customer_id: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    limit: int = 50,
+    cursor: Optional[str] = None,
+) -> tuple[list[Order], Optional[str]]:
+    """
+    Returns one page of orders sorted by createdAt (oldest first) and the cursor for the next page.
+    The page is read from the most selective index, so the cost depends on the page size and not
+    on the total number of orders. created_from is inclusive, created_to exclusive.
+    """
+    created_from, created_to = _naive_utc(created_from), _naive_utc(created_to)
+    after = decode_cursor(cursor) if cursor else None
+
+    page, has_more = _REPO.list(
+        status=status,
+        customer_id=customer_id,
+        created_from=created_from,
+        created_to=created_to,
+        after=after,
+        limit=limit,
+    )
+    next_cursor = encode_cursor(index_key(page[-1])) if has_more and page else None
+    return page, next_cursor
 
 
 def get_order(orderId: str) -> Order | None:
-    return _STORE.get(orderId)
+    return _REPO.get(orderId)
 
 
 class DuplicateOrderError(Exception):
@@ -32,7 +131,8 @@ async def create_order(payload: createOrder, correlation_id: Optional[str] = Non
                      f"{order_id}: Creating order")
 
     # 1) Idempotenz: gleiche OrderId -> vorhandene Order zurückgeben
-    if order_id in _STORE:
+    #    Repository kann blockieren (SQLite-Lesezugriff) -> nicht im Event-Loop ausführen
+    if await asyncio.to_thread(_REPO.exists, order_id):
         send_log_message("oms", f"CreateOrder",
                          f"{order_id}: Order already exists. Exiting...")
         raise DuplicateOrderError("Order with this ID already exists")
@@ -44,12 +144,18 @@ async def create_order(payload: createOrder, correlation_id: Optional[str] = Non
                          f"{order_id}: Total amount does not match the sum of item prices")
         raise ValueError("Total amount does not match sum of item prices")
 
-    # 3) INVENTORY: Verfügbarkeit prüfen
+    # 3) INVENTORY: Verfügbarkeit prüfen und reservieren in einem Aufruf (alles oder nichts)
+    #    Artikel, die laut Availability-Cache sicher nicht reichen, sparen den Inventory-Aufruf
     items_map = {i.productId: i.quantity for i in payload.items}
-    availability = inventory.check_availability(items_map)
+    short = _cached_shortages(items_map)
+    if short:
+        send_log_message("oms", "CreateOrder", f"{order_id}: unavailable according to cache {short}")
+        reserved_ok, availability, _results, reservation_id = _unavailable_from_cache(items_map, short)
+    else:
+        reserved_ok, availability, _results, reservation_id = await inventory.check_and_reserve(items_map)
+        _remember_unavailable(items_map, availability)
     missing = {pid: qty for pid, qty in items_map.items() if not availability.get(pid, False)}
 
-    print("Checking availability du bastat")
     if missing:
         send_log_message("oms", "CreateOrder", f"{order_id}: missing -> {list(missing.keys())}, restocking…")
 
@@ -61,20 +167,20 @@ async def create_order(payload: createOrder, correlation_id: Optional[str] = Non
 
         if do_restock:
             try:
-                overall, restock_results = inventory.restock_items({ALLOWED_RESTOCK_PID: missing[ALLOWED_RESTOCK_PID]})
+                overall, restock_results = await inventory.restock_items({ALLOWED_RESTOCK_PID: missing[ALLOWED_RESTOCK_PID]})
                 send_log_message("oms", "CreateOrder", f"{order_id}: restock_results={restock_results}")
             except Exception as e:
                 send_log_message("oms", "CreateOrder", f"{order_id}: restock RPC failed: {e}")
                 order = Order(**payload.model_dump(), status="BACKORDERED")
-                _STORE[order_id] = order
+                _save(order)
                 return order
 
-            # Re-Check nach Restock
-            availability = inventory.check_availability(items_map)
+            # Re-Check (inkl. Reservierung) nach Restock
+            reserved_ok, availability, _results, reservation_id = await inventory.check_and_reserve(items_map)
             still_missing = [pid for pid, ok in availability.items() if not ok]
             if still_missing:
                 order = Order(**payload.model_dump(), status="BACKORDERED")
-                _STORE[order_id] = order
+                _save(order)
                 send_log_message("oms", "CreateOrder",
                                 f"{order_id}: still missing after restock -> BACKORDERED {still_missing}")
                 return order
@@ -83,7 +189,7 @@ async def create_order(payload: createOrder, correlation_id: Optional[str] = Non
         else:
             # Nicht unser Sonderfall -> wie gehabt BACKORDERED
             order = Order(**payload.model_dump(), status="BACKORDERED")
-            _STORE[order_id] = order
+            _save(order)
             send_log_message("oms", "CreateOrder",
                             f"{order_id}: restock not allowed (needs {ALLOWED_RESTOCK_PID} with qty 0) -> BACKORDERED")
             return order
@@ -92,45 +198,171 @@ async def create_order(payload: createOrder, correlation_id: Optional[str] = Non
     #     send_log_message("oms", f"CreateOrder", f"{order_id}: Not every item available")
     #     raise InventoryUnavailableError(f"Availability check for order {payload.orderId} failed.")
 
-    print("Items available. Starting reservation...")
-    # 4) INVENTORY: reservieren
-    reserved_ok, _results = inventory.reserve_items(items_map)
+    # 4) INVENTORY: Reservierung auswerten
     if not reserved_ok:
         send_log_message("oms", f"CreateOrder", f"{order_id}: Couldn't reserve items")
         order = Order(**payload.model_dump(), status="CANCELLED")
-        _STORE[order_id] = order
+        _save(order)
         send_log_message("oms", "CreateOrder", f"{order_id}: reserve failed -> CANCELLED {_results}")
         return order
 
     send_log_message("oms", f"CreateOrder", f"{order_id}: Starting payment")
 
     # 5) PAYMENT: Zahlung autorisieren (REST)
-    pay = await payment.authorize(
-        order_id=order_id,
-        customer_id=payload.customer.customerId,
-        amount=float(payload.totalAmount),
-        method="CARD",
-        correlation_id=correlation_id,
-    )
+    try:
+        pay = await payment.authorize(
+            order_id=order_id,
+            customer_id=payload.customer.customerId,
+            amount=payload.totalAmount,
+            method="CARD",
+            correlation_id=correlation_id,
+        )
+    except payment.PaymentError as e:
+        send_log_message("oms", "CreateOrder", f"{order_id}: payment error {e}, releasing reservation")
+        await inventory.release_reservations([reservation_id])
+        raise
 
-    print(f"Created payment: {pay}")
-    print(f"Status of pay: {pay.get('status')} ")
     send_log_message("oms", "CreateOrder", f"{order_id}: Created payment {pay}")
 
     if pay.get("status") == "DECLINED":
         send_log_message("oms", "CreateOrder", f"{order_id}: payment declined")
-        inventory.release_items(items_map)
+        await inventory.release_reservations([reservation_id])
         raise PaymentDeclinedError(f"Payment for customer with id {payload.customer.customerId} was declined.")
 
     if pay.get("status") == "NOTFOUND":
         send_log_message("oms", "CreateOrder", f"{order_id}: payment not found")
-        inventory.release_items(items_map)
+        await inventory.release_reservations([reservation_id])
         raise CustomerNotFoundError(f"Customer with id {payload.customer.customerId} was not found.")
 
     # 6) Erfolg: Order abschließen
     send_log_message("oms", "CreateOrder", f"{order_id}: payment successfully")
+    confirmed, messages = await inventory.confirm_reservations([reservation_id])
+    if not confirmed:
+        return await _cancel_unconfirmed(payload, messages.get(reservation_id), correlation_id, "CreateOrder")
 
     order = Order(**payload.model_dump(), status="PROCESSED")
-    _STORE[order_id] = order
+    _save(order)
     send_wms_message(payload.json())
     return order
+
+
+
+async def _cancel_unconfirmed(payload: createOrder, reason: Optional[str], correlation_id: Optional[str],
+                              event: str) -> Order:
+    """
+    The hold expired before it was confirmed: its stock is already back (and may be sold again),
+    so the order must not be processed. Refunds the payment and cancels the order.
+    """
+    order_id = payload.orderId
+    send_log_message("oms", event, f"{order_id}: confirm reservation failed ({reason}), refunding payment")
+    try:
+        await payment.refund(order_id, payload.customer.customerId, payload.totalAmount, correlation_id=correlation_id)
+    except payment.PaymentError as e:
+        send_log_message("oms", event, f"{order_id}: refund failed ({e}), payment must be refunded manually")
+    order = Order(**payload.model_dump(), status="CANCELLED")
+    _save(order)
+    return order
+
+
+async def create_orders_batch(payloads: list[createOrder], correlation_id: Optional[str] = None) -> list[BatchOrderResult]:
+    """
+    Creates many orders at once. Reservations for all valid orders go to the inventory in a single
+    CheckAndReserveBatch RPC, the payments are authorized with one POST /payments/batch and
+    the reservations are confirmed and released with one RPC each. Returns one result per payload, in order.
+    """
+    results: dict[int, BatchOrderResult] = {}
+    seen: set[str] = set()
+    valid: list[tuple[int, createOrder, dict[str, int]]] = []
+
+    # 1) Validierung wie bei create_order, zusätzlich Duplikate innerhalb des Batches
+    #    vorhandene Orders mit einer Abfrage für den ganzen Batch, außerhalb des Event-Loops
+    existing = await asyncio.to_thread(_REPO.existing, [payload.orderId for payload in payloads])
+    for idx, payload in enumerate(payloads):
+        order_id = payload.orderId
+        if order_id in seen or order_id in existing:
+            results[idx] = BatchOrderResult(orderId=order_id, status="DUPLICATE",
+                                            error="Order with this ID already exists")
+            continue
+        seen.add(order_id)
+        calc_total = sum(Decimal(i.price) * i.quantity for i in payload.items)
+        if calc_total != Decimal(payload.totalAmount):
+            results[idx] = BatchOrderResult(orderId=order_id, status="INVALID",
+                                            error="Total amount does not match sum of item prices")
+            continue
+        valid.append((idx, payload, {i.productId: i.quantity for i in payload.items}))
+
+    # 2) INVENTORY: alle Reservierungen in einem RPC, ohne die Orders, die laut Cache nicht lieferbar sind
+    shortages = [_cached_shortages(items) for _, _, items in valid]
+    to_reserve = [items for (_, _, items), short in zip(valid, shortages) if not short]
+    answers = iter(await inventory.check_and_reserve_batch(to_reserve) if to_reserve else [])
+    reservations = []
+    for (_, _, items), short in zip(valid, shortages):
+        if short:
+            reservations.append(_unavailable_from_cache(items, short))
+            continue
+        answer = next(answers)
+        _remember_unavailable(items, answer[1])
+        reservations.append(answer)
+
+    reserved: list[tuple[int, createOrder, str]] = []
+    for (idx, payload, items_map), (reserved_ok, availability, _results, reservation_id) in zip(valid, reservations):
+        if reserved_ok:
+            reserved.append((idx, payload, reservation_id))
+            continue
+        status = "BACKORDERED" if not all(availability.get(pid, False) for pid in items_map) else "CANCELLED"
+        order = Order(**payload.model_dump(), status=status)
+        _save(order)
+        results[idx] = BatchOrderResult(orderId=payload.orderId, status=status, order=order)
+
+    # 3) PAYMENT: alle Zahlungen in einem Request
+    payments: list = []
+    if reserved:
+        try:
+            payments = await payment.authorize_batch(
+                [{
+                    "order_id": p.orderId,
+                    "customer_id": p.customer.customerId,
+                    "amount": str(p.totalAmount),
+                    "method": "CARD",
+                } for _, p, _ in reserved],
+                correlation_id=correlation_id,
+            )
+        except Exception as e:
+            payments = [e] * len(reserved)
+
+    paid: list[tuple[int, createOrder, str]] = []
+    to_release: list[str] = []
+    for (idx, payload, reservation_id), pay in zip(reserved, payments):
+        order_id = payload.orderId
+        if isinstance(pay, Exception) or pay is None:
+            status, error = "FAILED", f"Payment failed: {pay}"
+        elif pay.get("status") == "DECLINED":
+            status, error = "DECLINED", f"Payment for customer with id {payload.customer.customerId} was declined."
+        elif pay.get("status") == "NOTFOUND":
+            status, error = "NOTFOUND", f"Customer with id {payload.customer.customerId} was not found."
+        else:
+            paid.append((idx, payload, reservation_id))
+            continue
+        to_release.append(reservation_id)
+        results[idx] = BatchOrderResult(orderId=order_id, status=status, error=error)
+
+    # 4) INVENTORY: Bestätigungen und Freigaben je in einem RPC
+    if paid:
+        _, messages = await inventory.confirm_reservations([reservation_id for _, _, reservation_id in paid])
+        for idx, payload, reservation_id in paid:
+            if messages.get(reservation_id) == "Confirmed":
+                order = Order(**payload.model_dump(), status="PROCESSED")
+                _save(order)
+                send_wms_message(payload.json())
+                results[idx] = BatchOrderResult(orderId=payload.orderId, status="PROCESSED", order=order)
+                continue
+            order = await _cancel_unconfirmed(payload, messages.get(reservation_id), correlation_id, "CreateOrderBatch")
+            results[idx] = BatchOrderResult(orderId=payload.orderId, status=order.status, order=order,
+                                            error="Reservation expired before confirmation, payment refunded")
+    if to_release:
+        await inventory.release_reservations(to_release)
+
+    ordered = [results[idx] for idx in range(len(payloads))]
+    summary = Counter(r.status for r in ordered)
+    send_log_message("oms", "CreateOrderBatch", f"Processed batch of {len(payloads)} orders: {dict(summary)}")
+    return ordered
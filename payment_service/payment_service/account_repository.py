@@ -0,0 +1,208 @@
+import threading
+from abc import ABC, abstractmethod
+from array import array
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Iterable, Iterator, Mapping, Optional
+
+from payment_service.ledger import MAX_MINOR, AccountLedger, JournalError, LedgerStore, from_minor, to_minor
+
+
+class AccountNotFoundError(Exception):
+    pass
+
+
+class InsufficientFundsError(Exception):
+    pass
+
+
+class PaymentNotFoundError(Exception):
+    """No payment of this customer was captured for the order."""
+
+
+class RefundExceededError(Exception):
+    """The refund would give back more than the payment captured."""
+
+
+@dataclass
+class Account:
+    customer_id: str
+    name: str
+    balance: Decimal
+
+
+class AccountRepository(ABC):
+    """Storage backend for customer accounts. debit() and credit() are atomic per account."""
+
+    @abstractmethod
+    def get(self, customer_id: str) -> Optional[Account]:
+        """Returns a copy of the account, or None if the customer is unknown."""
+
+    @abstractmethod
+    def debit(self, customer_id: str, amount: Decimal, order_id: Optional[str] = None) -> Decimal:
+        """
+        Takes `amount` from the account if the balance covers it and returns the new balance.
+        With an order_id the amount is booked as captured for that order (see refund()).
+
+        Raises:
+            AccountNotFoundError: the customer has no account.
+            InsufficientFundsError: the balance is lower than the amount (nothing is taken).
+            ValueError: the amount has more decimal places than the currency or is out of range.
+        """
+
+    @abstractmethod
+    def credit(self, customer_id: str, amount: Decimal) -> Decimal:
+        """Adds `amount` to the account and returns the new balance. ValueError if it would leave the int64 range."""
+
+    @abstractmethod
+    def refund(self, order_id: str, customer_id: str, amount: Decimal) -> Decimal:
+        """
+        Gives back (part of) the payment captured for order_id and returns the new balance.
+
+        Raises:
+            AccountNotFoundError: the customer has no account.
+            PaymentNotFoundError: nothing was captured from this customer for the order.
+            RefundExceededError: all refunds of the order together would exceed the captured amount.
+        """
+
+    async def committed(self) -> None:
+        """Waits until every change made so far is durable. No-op for volatile stores."""
+
+    def close(self) -> None:
+        pass
+
+
+class InMemoryAccountRepository(AccountRepository):
+    """
+    Process-local store. Balances are exact integer minor units in an AccountLedger (one int64
+    array, O(1) index per customer_id) and guarded by lock striping: every account maps to one
+    of `shards` locks, so the check and the debit of one account are atomic while payments of
+    other customers run in parallel.
+    """
+
+    def __init__(self, accounts: Iterable[Mapping] = (), shards: int = 64, ledger: Optional[AccountLedger] = None):
+        self._ledger = ledger if ledger is not None else AccountLedger.from_accounts(accounts)
+        self._locks = [threading.Lock() for _ in range(max(shards, 1))]
+
+    @staticmethod
+    def _check_range(balance: int, minor: int, customer_id: str) -> None:
+        # vor dem Journal prüfen: ein Record, der beim Anwenden überläuft, würde auch jeden Replay abbrechen
+        if balance + minor > MAX_MINOR:
+            raise ValueError(f"Balance of {customer_id} would exceed the ledger range")
+
+    def _index(self, customer_id: str) -> int:
+        i = self._ledger.index.get(customer_id)
+        if i is None:
+            raise AccountNotFoundError(customer_id)
+        return i
+
+    def _record(self, index: int, delta: int, order_id: str = "") -> None:
+        """Hook for durable stores, called while the account lock is held and before the change is applied."""
+
+    def get(self, customer_id: str) -> Optional[Account]:
+        i = self._ledger.index.get(customer_id)
+        if i is None:
+            return None
+        with self._locks[i % len(self._locks)]:
+            balance = self._ledger.balances[i]
+        return Account(customer_id, self._ledger.names[i], from_minor(balance))
+
+    def debit(self, customer_id: str, amount: Decimal, order_id: Optional[str] = None) -> Decimal:
+        minor = to_minor(amount)
+        i = self._index(customer_id)
+        balances = self._ledger.balances
+        with self._locks[i % len(self._locks)]:
+            if minor > balances[i]:
+                raise InsufficientFundsError(customer_id)
+            self._record(i, -minor, order_id or "")
+            balances[i] -= minor
+            if order_id:
+                self._ledger.book(order_id, i, -minor)
+            balance = balances[i]
+        return from_minor(balance)
+
+    def credit(self, customer_id: str, amount: Decimal) -> Decimal:
+        minor = to_minor(amount)
+        i = self._index(customer_id)
+        balances = self._ledger.balances
+        with self._locks[i % len(self._locks)]:
+            self._check_range(balances[i], minor, customer_id)
+            self._record(i, minor)
+            balances[i] += minor
+            balance = balances[i]
+        return from_minor(balance)
+
+    def refund(self, order_id: str, customer_id: str, amount: Decimal) -> Decimal:
+        minor = to_minor(amount)
+        i = self._index(customer_id)
+        balances = self._ledger.balances
+        with self._locks[i % len(self._locks)]:
+            # Zahlungen eines Kontos ändern sich nur unter seinem Lock
+            payment = self._ledger.payments.get(order_id)
+            if payment is None or payment[0] != i:
+                raise PaymentNotFoundError(order_id)
+            _, captured, refunded = payment
+            if refunded + minor > captured:
+                raise RefundExceededError(order_id)
+            self._check_range(balances[i], minor, customer_id)
+            self._record(i, minor, order_id)
+            balances[i] += minor
+            self._ledger.book(order_id, i, minor)
+            balance = balances[i]
+        return from_minor(balance)
+
+    @contextmanager
+    def frozen(self) -> Iterator[tuple[array, dict]]:
+        """Holds all account locks and yields copies of balances and payments (consistent cut for snapshots)."""
+        with ExitStack() as stack:
+            for lock in self._locks:
+                stack.enter_context(lock)
+            yield array("q", self._ledger.balances), dict(self._ledger.payments)
+
+
+class LedgerAccountRepository(InMemoryAccountRepository):
+    """
+    InMemoryAccountRepository made durable by a LedgerStore: every debit and credit is journaled
+    while its account lock is held (journal order per account = memory order), the journal writer
+    commits them in groups, and committed() lets the handler await the commit without blocking
+    the event loop. On start the balances are restored from the snapshot plus the journal tail.
+    After a journal write error debit(), credit() and committed() raise JournalError.
+
+    Only one process may open a state directory (run uvicorn with a single worker).
+    """
+
+    def __init__(self, accounts: Iterable[Mapping], directory: str, shards: int = 64, durability: str = "fsync",
+                 checkpoint_interval: float = 60, checkpoint_bytes: int = 64 * 1024 * 1024):
+        self._store = LedgerStore(directory, durability=durability)
+        super().__init__(shards=shards, ledger=self._store.load(accounts))
+        self._journal = self._store.journal
+        if self._store.needs_checkpoint:
+            self._store.checkpoint(self._ledger, self.frozen)
+        self._store.start_checkpointer(self._ledger, self.frozen, checkpoint_interval, checkpoint_bytes)
+
+    def _record(self, index: int, delta: int, order_id: str = "") -> None:
+        self._journal.append(index, delta, order_id)
+
+    async def committed(self) -> None:
+        await self._journal.wait_async(self._journal.last_seq)
+
+    def close(self) -> None:
+        try:
+            self._store.checkpoint(self._ledger, self.frozen)
+        except JournalError:
+            # Salden im Speicher sind nicht mehr verlässlich -> beim Start gilt der letzte Stand auf Platte
+            pass
+        self._store.close()
+
+
+def create_repository(backend: str, accounts: Iterable[Mapping], shards: int = 64, directory: str = "data/state",
+                      durability: str = "fsync", checkpoint_interval: float = 60,
+                      checkpoint_bytes: int = 64 * 1024 * 1024) -> AccountRepository:
+    """Builds the account store selected with PAYMENT_ACCOUNT_STORE; the state options only apply to "ledger"."""
+    if backend == "memory":
+        return InMemoryAccountRepository(accounts, shards=shards)
+    if backend == "ledger":
+        return LedgerAccountRepository(accounts, directory, shards=shards, durability=durability,
+                                       checkpoint_interval=checkpoint_interval, checkpoint_bytes=checkpoint_bytes)
+    raise ValueError(f"Unknown account store backend: {backend}")
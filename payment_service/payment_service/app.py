@@ -1,18 +1,60 @@
+import os
 from datetime import datetime, timezone
+from decimal import Decimal
 from uuid import uuid4
 
-from fastapi import FastAPI, HTTPException
+from typing import Annotated, List, Optional
+
+from fastapi import FastAPI, Header, HTTPException, Response
+from payment_service.account_repository import AccountNotFoundError, InsufficientFundsError, PaymentNotFoundError, \
+    RefundExceededError, create_repository
+from payment_service.idempotency import IdempotencyCache, IdempotencyConflictError
+from payment_service.ledger import MAX_AMOUNT
 from payment_service.mock_data import mock_accounts
-from pydantic import BaseModel
-from payment_service.rabbitmq.message_sender import send_log_message
+from pydantic import BaseModel, Field, PlainSerializer
+from payment_service.rabbitmq.message_sender import send_log_message, get_publisher
+
+# ledger: Salden in Cent mit Journal + Snapshot im State-Verzeichnis, memory: nur Prozess
+ACCOUNT_STORE = os.getenv("PAYMENT_ACCOUNT_STORE", "ledger")
+# Lock-Striping: Zahlungen verschiedener Kunden blockieren sich nicht gegenseitig
+ACCOUNT_SHARDS = int(os.getenv("PAYMENT_ACCOUNT_SHARDS", "64"))
+STATE_DIR = os.getenv("PAYMENT_STATE_DIR", "data/state")
+JOURNAL_DURABILITY = os.getenv("PAYMENT_JOURNAL_DURABILITY", "fsync")  # fsync | write | async
+CHECKPOINT_INTERVAL = float(os.getenv("PAYMENT_CHECKPOINT_INTERVAL", "60"))
+CHECKPOINT_BYTES = int(os.getenv("PAYMENT_CHECKPOINT_BYTES", str(64 * 1024 * 1024)))
+# Abgeschlossene Zahlungen je Idempotency-Key (oder order_id) für Retries der OMS
+IDEMPOTENCY_TTL = float(os.getenv("PAYMENT_IDEMPOTENCY_TTL", "3600"))
+IDEMPOTENCY_CACHE_SIZE = int(os.getenv("PAYMENT_IDEMPOTENCY_CACHE_SIZE", "100000"))
+BATCH_MAX_PAYMENTS = int(os.getenv("PAYMENT_BATCH_MAX_PAYMENTS", "500"))
 
 app = FastAPI(title="Payment Service", version="1.0")
+ACCOUNTS = create_repository(ACCOUNT_STORE, mock_accounts, shards=ACCOUNT_SHARDS, directory=STATE_DIR,
+                             durability=JOURNAL_DURABILITY, checkpoint_interval=CHECKPOINT_INTERVAL,
+                             checkpoint_bytes=CHECKPOINT_BYTES)
+# Ablehnungen (402/404) werden ebenfalls wiederholt, ein Retry bucht nie ein zweites Mal ab.
+# Die Handler laufen im Event-Loop und _charge() awaitet nicht, daher sieht ein Duplikat nie einen
+# laufenden Request und muss nicht warten (das Warten wäre nur bei Thread-Handlern nötig).
+PAYMENTS = IdempotencyCache(IDEMPOTENCY_TTL, IDEMPOTENCY_CACHE_SIZE, cacheable=(HTTPException,))
+
+
+@app.on_event("shutdown")
+def shutdown_event():
+    ACCOUNTS.close()
+    get_publisher().close()
+
+
+# Beträge gehen als JSON-Zahl raus (wie vor der Umstellung auf Decimal), nicht als String
+JsonAmount = Annotated[Decimal, PlainSerializer(float, return_type=float, when_used="json")]
+CENT = Decimal("0.01")
+# order_id landet im Journal-Record des Ledgers (Länge als uint16)
+ORDER_ID_MAX_LENGTH = 255
 
 
 class PaymentRequest(BaseModel):
-    order_id: str
+    order_id: str = Field(min_length=1, max_length=ORDER_ID_MAX_LENGTH)
     customer_id: str
-    amount: float
+    # exakt, höchstens Cent-genau; Floats werden weiterhin angenommen
+    amount: Decimal = Field(gt=0, le=MAX_AMOUNT, decimal_places=2)
     method: str
 
 
@@ -20,41 +62,164 @@ class PaymentResponse(BaseModel):
     payment_id: str
     order_id: str
     status: str
-    amount: float
+    amount: JsonAmount
     created_at: str
 
 
+class RefundRequest(BaseModel):
+    order_id: str = Field(min_length=1, max_length=ORDER_ID_MAX_LENGTH)
+    customer_id: str
+    amount: Decimal = Field(gt=0, le=MAX_AMOUNT, decimal_places=2)
+
+
+class BatchPaymentRequest(BaseModel):
+    payments: List[PaymentRequest] = Field(min_length=1, max_length=BATCH_MAX_PAYMENTS)
+
+
+class BatchPaymentResult(BaseModel):
+    order_id: str
+    status_code: int  # wie bei POST /payments: 201, 402, 404 oder 409
+    payment: Optional[PaymentResponse] = None
+    error: Optional[str] = None
+
+
+class BatchPaymentResponse(BaseModel):
+    results: List[BatchPaymentResult]
+
+
 @app.post("/payments", response_model=PaymentResponse, status_code=201)
-def create_payment(request: PaymentRequest):
-    print("Starting payment")
-    send_log_message("payment", f"CreatePayment",
-                     f"Starting payment for customer with id {request.customer_id}")
-
-    account = next((a for a in mock_accounts if a["customer_id"] == request.customer_id), None)
-    if not account:
-        send_log_message("payment", f"CreatePayment",
-                         f"No customer with id {request.customer_id} found. Returning with status code 404.")
-        raise HTTPException(status_code=404, detail="Customer account not found.")
+async def create_payment(request: PaymentRequest, response: Response,
+                         idempotency_key: Optional[str] = Header(default=None)):
+    """
+    Charges the customer once per Idempotency-Key header (default: the order_id). Retries and
+    concurrent duplicates get the outcome of the first request; the replay is marked with the
+    Idempotent-Replayed header.
+
+    Runs on the event loop, not in the thread pool: inline there is only the idempotency check
+    and the debit, which never await. The response is sent once the journal record of the debit
+    is committed (group commit, the loop keeps serving other payments meanwhile). The log event
+    is only queued for the background publisher.
+    """
+    key = idempotency_key or request.order_id
+    try:
+        ok, payment, replayed = PAYMENTS.outcome(key, _fingerprint(request), lambda: _charge(request))
+    except IdempotencyConflictError:
+        raise HTTPException(status_code=409, detail="Idempotency key was already used for a different payment.")
+    if not ok:
+        # Ablehnung nur beim ersten Mal loggen, Replays nicht
+        if not replayed:
+            _log_payment(request, payment.status_code, _decline_message(request, payment))
+        raise payment
+    # auch ein Replay erst bestätigen, wenn die ursprüngliche Abbuchung dauerhaft ist
+    await ACCOUNTS.committed()
+    if replayed:
+        response.headers["Idempotent-Replayed"] = "true"
+    else:
+        _log_payment(request, 201, f"Created payment {payment.payment_id} for customer {request.customer_id}")
+    return payment
 
-    # Guthaben prüfen
-    if request.amount > account["balance"]:
-        send_log_message("payment", f"CreatePayment",
-                         f"Payment declined for customer {request.customer_id}. Account not covered.")
-        raise HTTPException(status_code=402, detail="Payment declined: account not covered.")
 
-    account["balance"] -= request.amount
-    payment_id = str(uuid4())
-    created_at = datetime.now(timezone.utc).isoformat()
+@app.post("/payments/batch", response_model=BatchPaymentResponse)
+async def create_payments_batch(batch: BatchPaymentRequest):
+    """
+    Authorizes many payments in one call, in request order. Every payment is atomic on its own
+    account and idempotent by its order_id like POST /payments, so a retried batch never charges
+    twice. Returns one result per payment and sends a single aggregated log event.
+    """
+    results: list[BatchPaymentResult] = []
+    for request in batch.payments:
+        try:
+            payment, _ = PAYMENTS.execute(request.order_id, _fingerprint(request), lambda: _charge(request))
+            results.append(BatchPaymentResult(order_id=request.order_id, status_code=201, payment=payment))
+        except IdempotencyConflictError:
+            results.append(BatchPaymentResult(order_id=request.order_id, status_code=409,
+                                              error="Idempotency key was already used for a different payment."))
+        except HTTPException as e:
+            results.append(BatchPaymentResult(order_id=request.order_id, status_code=e.status_code, error=e.detail))
 
-    payment = PaymentResponse(
-        payment_id=payment_id,
+    captured = sum(1 for r in results if r.status_code == 201)
+    if captured:
+        await ACCOUNTS.committed()
+    send_log_message("payment", "CreatePaymentBatch", f"Captured {captured} of {len(results)} payments",
+                     details={"results": {r.order_id: r.status_code for r in results}}, block=False)
+    return BatchPaymentResponse(results=results)
+
+
+@app.post("/payments/refunds", response_model=PaymentResponse, status_code=201)
+async def refund_payment(request: RefundRequest, response: Response):
+    """
+    Credits a captured payment back to the customer who paid it (e.g. when the OMS cannot
+    confirm the stock reservation after the payment). The ledger keeps captured and refunded
+    amounts per order durably: refunds for an order that was never charged to this customer get
+    404, refunds beyond the captured amount 409. Retries replay the first refund like POST /payments.
+    """
+    try:
+        refund, replayed = PAYMENTS.execute(f"refund:{request.order_id}", _fingerprint(request),
+                                            lambda: _refund(request))
+    except IdempotencyConflictError:
+        raise HTTPException(status_code=409, detail="A different refund for this order already exists.")
+    await ACCOUNTS.committed()
+    if replayed:
+        response.headers["Idempotent-Replayed"] = "true"
+    else:
+        send_log_message("payment", "RefundPayment", f"Refunded {request.amount} to customer {request.customer_id}",
+                         details={"order_id": request.order_id, "refund_id": refund.payment_id}, block=False)
+    return refund
+
+
+def _fingerprint(request: BaseModel) -> str:
+    """Request body for the idempotency check, with the amount in canonical form (29.9 == 29.90)."""
+    return request.model_copy(update={"amount": request.amount.quantize(CENT)}).model_dump_json()
+
+
+def _log_payment(request: PaymentRequest, status_code: int, message: str) -> None:
+    # genau ein Event pro Zahlung; landet nur in der Queue des Publishers, blockiert nie
+    send_log_message("payment", "CreatePayment", message, details={
+        "order_id": request.order_id,
+        "customer_id": request.customer_id,
+        "amount": str(request.amount),
+        "status_code": status_code,
+    }, block=False)
+
+
+def _decline_message(request: PaymentRequest, error: HTTPException) -> str:
+    if error.status_code == 404:
+        return f"No customer with id {request.customer_id} found. Returning with status code 404."
+    return f"Payment declined for customer {request.customer_id}. Account not covered."
+
+
+def _charge(request: PaymentRequest) -> PaymentResponse:
+    """Checks and debits the account in one atomic step and builds the payment."""
+    try:
+        ACCOUNTS.debit(request.customer_id, request.amount, order_id=request.order_id)
+    except AccountNotFoundError:
+        raise HTTPException(status_code=404, detail="Customer account not found.")
+    except InsufficientFundsError:
+        raise HTTPException(status_code=402, detail="Payment declined: account not covered.")
+
+    return PaymentResponse(
+        payment_id=str(uuid4()),
         order_id=request.order_id,
         status="CAPTURED",
         amount=request.amount,
-        created_at=created_at
+        created_at=datetime.now(timezone.utc).isoformat()
     )
-    send_log_message("payment", f"CreatePayment",
-                     f"Created payment: {payment}")
 
-    print(f"Payment created for {request.customer_id}: {payment}")
-    return payment
+
+def _refund(request: RefundRequest) -> PaymentResponse:
+    try:
+        ACCOUNTS.refund(request.order_id, request.customer_id, request.amount)
+    except AccountNotFoundError:
+        raise HTTPException(status_code=404, detail="Customer account not found.")
+    except PaymentNotFoundError:
+        raise HTTPException(status_code=404, detail="No payment of this customer was captured for the order.")
+    except RefundExceededError:
+        raise HTTPException(status_code=409, detail="Refund exceeds the captured amount of the order.")
+
+    return PaymentResponse(
+        payment_id=str(uuid4()),
+        order_id=request.order_id,
+        status="REFUNDED",
+        amount=request.amount,
+        created_at=datetime.now(timezone.utc).isoformat()
+    )
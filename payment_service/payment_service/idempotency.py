@@ -0,0 +1,116 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Hashable, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class IdempotencyConflictError(Exception):
+    """The idempotency key was already used for a different request."""
+
+
+class _InFlight:
+    __slots__ = ("fingerprint", "done", "outcome")
+
+    def __init__(self, fingerprint: Hashable):
+        self.fingerprint = fingerprint
+        self.done = threading.Event()
+        self.outcome: Optional[tuple[bool, object]] = None
+
+
+class IdempotencyCache:
+    """
+    Runs an operation at most once per idempotency key and replays its outcome for retries.
+
+    Completed outcomes (the result, or one of the `cacheable` exceptions such as a decline) are
+    kept in an LRU with TTL. A duplicate that arrives while the first request is still running
+    waits for it instead of running the operation a second time (in-flight coalescing). Other
+    exceptions are not cached, so a retry after a crash or bug runs the operation again.
+
+    Every key remembers a fingerprint of its request; reusing the key for a different request
+    raises IdempotencyConflictError.
+    """
+
+    def __init__(self, ttl: float, max_size: int, cacheable: tuple[type[BaseException], ...] = ()):
+        self._ttl = ttl
+        self._max_size = max_size
+        self._cacheable = cacheable
+        self._entries: OrderedDict[str, tuple[Hashable, tuple[bool, object], float]] = OrderedDict()
+        self._in_flight: dict[str, _InFlight] = {}
+        self._lock = threading.Lock()
+
+    def _cached(self, key: str, now: float):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[2] <= now:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _store(self, key: str, fingerprint: Hashable, outcome: tuple[bool, object]) -> None:
+        self._entries[key] = (fingerprint, outcome, time.monotonic() + self._ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+
+    def execute(self, key: str, fingerprint: Hashable, operation: Callable[[], T]) -> tuple[T, bool]:
+        """
+        Returns (result, replayed). `replayed` is True when the outcome comes from an earlier or
+        concurrent request with the same key; cached exceptions are raised again.
+        """
+        ok, value, replayed = self.outcome(key, fingerprint, operation)
+        if not ok:
+            raise value
+        return value, replayed
+
+    def outcome(self, key: str, fingerprint: Hashable, operation: Callable[[], T]) -> tuple[bool, object, bool]:
+        """
+        Like execute(), but returns a `cacheable` exception instead of raising it:
+        (True, result, replayed) or (False, exception, replayed). Lets the caller tell a replayed
+        decline from a new one.
+        """
+        with self._lock:
+            entry = self._cached(key, time.monotonic())
+            if entry is None:
+                pending = self._in_flight.get(key)
+                owner = pending is None
+                if owner:
+                    pending = self._in_flight[key] = _InFlight(fingerprint)
+            else:
+                pending, owner = None, False
+
+        if entry is not None:
+            if entry[0] != fingerprint:
+                raise IdempotencyConflictError(key)
+            return (*entry[1], True)
+
+        if not owner:
+            if pending.fingerprint != fingerprint:
+                raise IdempotencyConflictError(key)
+            pending.done.wait()
+            ok, value = pending.outcome
+            if not ok and not isinstance(value, self._cacheable):
+                raise value
+            return ok, value, True
+
+        try:
+            outcome = (True, operation())
+        except self._cacheable as e:
+            outcome = (False, e)
+        except BaseException as e:
+            # nicht cachen, wartende Duplikate bekommen denselben Fehler
+            pending.outcome = (False, e)
+            with self._lock:
+                del self._in_flight[key]
+            pending.done.set()
+            raise
+
+        pending.outcome = outcome
+        with self._lock:
+            self._store(key, fingerprint, outcome)
+            del self._in_flight[key]
+        pending.done.set()
+        return (*outcome, False)
@@ -0,0 +1,486 @@
+import asyncio
+import logging
+import os
+import struct
+import threading
+import time
+import zlib
+from array import array
+from decimal import Decimal
+from typing import Iterable, Iterator, Mapping, Optional
+
+logger = logging.getLogger()
+
+SNAPSHOT_FILE = "ledger.snapshot"
+JOURNAL_FILE = "ledger.journal"
+SNAPSHOT_MAGIC = b"PAYSNAP2"
+# Beträge in Cent (Minor Units)
+MINOR_UNITS = 2
+
+# Snapshot: Header | int64-Salden | Kunden-IDs (NUL-getrennt) | Namen (NUL-getrennt) | Zahlungen
+# Header: Magic, letzte enthaltene Journal-Seq, Anzahl Konten, Länge IDs, Länge Namen, Länge Zahlungen, CRC32 des Bodys
+_SNAPSHOT_HEADER = struct.Struct("<8sQQQQQI")
+# Zahlung im Snapshot: Länge order_id, Konto-Index, abgebucht, erstattet (Cent) | order_id
+_PAYMENT = struct.Struct("<HIqq")
+# Journal-Record: CRC32 (über den Rest), Seq, Konto-Index, Änderung in Cent (Abbuchung negativ),
+# Länge order_id (0 = ohne Order) | order_id
+# Der Index ist stabil: Konten werden nie entfernt und der Snapshot speichert sie in Index-Reihenfolge.
+_CRC = struct.Struct("<I")
+_RECORD_BODY = struct.Struct("<QIqH")
+_RECORD_SIZE = _CRC.size + _RECORD_BODY.size
+
+_SCALE = Decimal(10) ** MINOR_UNITS
+_QUANTUM = Decimal(1).scaleb(-MINOR_UNITS)
+# Salden und Beträge sind int64 (array('q') und Journal-Record)
+MAX_MINOR = 2 ** 63 - 1
+
+
+class JournalError(RuntimeError):
+    """The ledger journal could not be written; balance changes are refused until restart."""
+
+
+def to_minor(amount) -> int:
+    """
+    Exact amount in minor units. Raises ValueError for amounts with more than MINOR_UNITS
+    decimals or outside the int64 range of the ledger.
+    """
+    value = Decimal(str(amount)) if isinstance(amount, float) else Decimal(amount)
+    minor = value * _SCALE
+    if minor != minor.to_integral_value():
+        raise ValueError(f"Amount {amount} has more than {MINOR_UNITS} decimal places")
+    if abs(minor) > MAX_MINOR:
+        raise ValueError(f"Amount {amount} is out of range")
+    return int(minor)
+
+
+def from_minor(minor: int) -> Decimal:
+    return (Decimal(minor) / _SCALE).quantize(_QUANTUM)
+
+
+MAX_AMOUNT = from_minor(MAX_MINOR)
+
+
+class AccountLedger:
+    """
+    Balances of all accounts as int64 minor units in one contiguous array('q'), addressed by a
+    dense index per customer_id. Names are kept in a list parallel to it.
+
+    `payments` maps every order_id that was charged to (account index, captured, refunded) in
+    minor units, so refunds can be checked against what was actually captured. Entries are
+    replaced, never mutated, so a shallow copy of the dict is a consistent cut.
+
+    Not thread-safe on its own: the repository serializes changes per account with its locks and
+    holds all of them for a consistent snapshot.
+    """
+
+    def __init__(self, customer_ids: list[str], names: list[str], balances: array,
+                 payments: Optional[dict[str, tuple[int, int, int]]] = None):
+        self.customer_ids = customer_ids
+        self.names = names
+        self.balances = balances
+        self.index = {customer_id: i for i, customer_id in enumerate(customer_ids)}
+        self.payments: dict[str, tuple[int, int, int]] = payments if payments is not None else {}
+
+    @classmethod
+    def from_accounts(cls, accounts: Iterable[Mapping]) -> "AccountLedger":
+        accounts = list(accounts)
+        return cls([a["customer_id"] for a in accounts], [a["name"] for a in accounts],
+                   array("q", (to_minor(a["balance"]) for a in accounts)))
+
+    def __len__(self) -> int:
+        return len(self.balances)
+
+    def book(self, order_id: str, index: int, delta: int) -> None:
+        """Adds a charge (negative delta) or refund (positive delta) to the payment of order_id."""
+        _, captured, refunded = self.payments.get(order_id, (index, 0, 0))
+        if delta < 0:
+            captured -= delta
+        else:
+            refunded += delta
+        self.payments[order_id] = (index, captured, refunded)
+
+    def apply(self, index: int, delta: int, order_id: str = "") -> None:
+        """Replays one journal record (single-threaded, on load)."""
+        if not 0 <= index < len(self.balances):
+            logger.warning(f"Journal record for unknown account index {index} skipped")
+            return
+        self.balances[index] += delta
+        if order_id:
+            self.book(order_id, index, delta)
+
+
+def _fsync_dir(directory: str) -> None:
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _encode_payments(payments: Mapping[str, tuple[int, int, int]]) -> bytes:
+    parts = []
+    for order_id, (index, captured, refunded) in payments.items():
+        raw = order_id.encode()
+        parts.append(_PAYMENT.pack(len(raw), index, captured, refunded))
+        parts.append(raw)
+    return b"".join(parts)
+
+
+def _decode_payments(blob: bytes) -> dict[str, tuple[int, int, int]]:
+    payments = {}
+    offset = 0
+    while offset < len(blob):
+        length, index, captured, refunded = _PAYMENT.unpack_from(blob, offset)
+        offset += _PAYMENT.size
+        payments[blob[offset:offset + length].decode()] = (index, captured, refunded)
+        offset += length
+    return payments
+
+
+def write_snapshot(path: str, ledger: AccountLedger, balances: array,
+                   payments: Mapping[str, tuple[int, int, int]], seq: int) -> None:
+    """
+    Stores the balances and payments as of journal record `seq`. The file is written next to
+    the old one, fsynced and renamed over it; until the rename the previous snapshot stays valid.
+    """
+    balance_bytes = balances.tobytes()
+    id_blob = "\0".join(ledger.customer_ids).encode()
+    name_blob = "\0".join(ledger.names).encode()
+    payment_blob = _encode_payments(payments)
+
+    crc = zlib.crc32(payment_blob, zlib.crc32(name_blob, zlib.crc32(id_blob, zlib.crc32(balance_bytes))))
+    header = _SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, seq, len(balances), len(id_blob), len(name_blob),
+                                   len(payment_blob), crc)
+
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(header)
+        f.write(balance_bytes)
+        f.write(id_blob)
+        f.write(name_blob)
+        f.write(payment_blob)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    _fsync_dir(os.path.dirname(path) or ".")
+
+
+def load_snapshot(path: str) -> tuple[AccountLedger, int]:
+    """Returns the ledger and the seq of the last journal record contained in the snapshot."""
+    with open(path, "rb") as f:
+        data = f.read()
+    magic, seq, count, id_len, name_len, payment_len, crc = _SNAPSHOT_HEADER.unpack_from(data, 0)
+    if magic != SNAPSHOT_MAGIC:
+        raise ValueError(f"{path} is not a payment ledger snapshot")
+    body = memoryview(data)[_SNAPSHOT_HEADER.size:]
+    balance_end = count * 8
+    names_end = balance_end + id_len + name_len
+    if len(body) != names_end + payment_len or zlib.crc32(body) != crc:
+        raise ValueError(f"Snapshot {path} is corrupt")
+
+    balances = array("q")
+    balances.frombytes(body[:balance_end])
+    customer_ids = bytes(body[balance_end:balance_end + id_len]).decode().split("\0") if count else []
+    names = bytes(body[balance_end + id_len:names_end]).decode().split("\0") if count else []
+    payments = _decode_payments(bytes(body[names_end:]))
+    return AccountLedger(customer_ids, names, balances, payments), seq
+
+
+def read_journal(path: str) -> Iterator[tuple[int, int, int, str]]:
+    """
+    Yields (seq, account index, delta, order_id) per record ("" for changes without an order).
+    The first short or corrupt record (torn write on crash) and everything after it is cut off.
+    """
+    if not os.path.exists(path):
+        return
+    with open(path, "rb") as f:
+        data = f.read()
+    offset = 0
+    while offset + _RECORD_SIZE <= len(data):
+        (crc,) = _CRC.unpack_from(data, offset)
+        seq, index, delta, length = _RECORD_BODY.unpack_from(data, offset + _CRC.size)
+        end = offset + _RECORD_SIZE + length
+        if end > len(data) or zlib.crc32(data[offset + _CRC.size:end]) != crc:
+            break
+        yield seq, index, delta, data[offset + _RECORD_SIZE:end].decode()
+        offset = end
+    if offset < len(data):
+        logger.warning(f"Truncating torn journal tail in {path} at byte {offset}")
+        with open(path, "r+b") as f:
+            f.truncate(offset)
+
+
+class _Cut:
+    """Checkpoint marker in the writer queue: every record up to `seq` is covered by the new snapshot."""
+
+    def __init__(self, seq: int):
+        self.seq = seq
+        self.saved = False
+        self.done = threading.Event()  # Snapshot geschrieben (saved) oder fehlgeschlagen
+
+
+class Journal:
+    """
+    One append-only file of balance changes. Every record is (seq, account index, delta in cents,
+    order_id), so a charge or refund and its payment bookkeeping are one record.
+
+    append() is called under the account lock and only queues the record. The writer thread
+    takes whatever queued up since its last round, writes it with one write() + fsync() and
+    resolves the waiting threads and coroutines (durability "fsync"; "write" skips the fsync,
+    "async" does not wait at all). A checkpoint queues a cut: once its snapshot is on disk the
+    writer empties the file, so the journal only ever holds the changes since the last checkpoint
+    and no segment files are needed.
+
+    A failed write is not retried: the balances in memory may no longer match the disk, so the
+    journal refuses all further records and waiters get a JournalError.
+    """
+
+    def __init__(self, path: str, next_seq: int, durability: str = "fsync"):
+        self._durability = durability
+        self._lock = threading.Lock()
+        self._work = threading.Condition(self._lock)
+        self._committed = threading.Condition()
+        self._queue: list = []
+        self._seq = next_seq - 1
+        self._durable_seq = next_seq - 1
+        self._waiters: list[tuple[int, asyncio.AbstractEventLoop, asyncio.Future]] = []
+        self._closed = False
+        self._error: Optional[OSError] = None
+        self._file = open(path, "ab")
+        self._bytes = self._file.tell()
+        self._writer = threading.Thread(target=self._run, name="payment-journal", daemon=True)
+        self._writer.start()
+
+    @property
+    def healthy(self) -> bool:
+        return self._error is None
+
+    def _check(self) -> None:
+        if self._error is not None:
+            raise JournalError("Payment journal is not writable") from self._error
+
+    def append(self, index: int, delta: int, order_id: str = "") -> int:
+        """Queues a balance change of the account at `index`, optionally booked on order_id. Returns its seq."""
+        raw = order_id.encode()
+        with self._lock:
+            self._check()
+            seq = self._seq + 1
+            # erst packen, dann die Seq vergeben: ein ungültiger Record hinterlässt keine Lücke
+            body = _RECORD_BODY.pack(seq, index, delta, len(raw)) + raw
+            self._seq = seq
+            self._queue.append((seq, _CRC.pack(zlib.crc32(body)) + body))
+            self._work.notify()
+        return seq
+
+    def cut(self) -> _Cut:
+        """
+        Marks the current end of the journal for a checkpoint. Must be called while no balance can
+        change; set saved and done on the returned cut once the snapshot is written (or failed).
+        Until then the writer holds back newer records.
+        """
+        with self._lock:
+            self._check()
+            cut = _Cut(self._seq)
+            self._queue.append(cut)
+            self._work.notify()
+            return cut
+
+    @property
+    def last_seq(self) -> int:
+        return self._seq
+
+    def size(self) -> int:
+        """Bytes in the journal file, i.e. written since the last checkpoint."""
+        return self._bytes
+
+    def wait(self, seq: Optional[int]) -> None:
+        """Blocks until the record with the given seq is committed. Raises JournalError if it never will be."""
+        if seq is None or self._durability == "async":
+            return
+        with self._committed:
+            while self._durable_seq < seq and not self._closed and self._error is None:
+                self._committed.wait()
+            if self._durable_seq < seq:
+                self._check()
+
+    async def wait_async(self, seq: Optional[int]) -> None:
+        """Like wait(), but suspends only the calling coroutine; the event loop keeps running."""
+        if seq is None or self._durability == "async":
+            return
+        loop = asyncio.get_running_loop()
+        with self._committed:
+            if self._durable_seq >= seq or self._closed:
+                return
+            self._check()
+            future = loop.create_future()
+            self._waiters.append((seq, loop, future))
+        await future
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+            self._work.notify()
+        self._writer.join()
+        self._file.close()
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                while not self._queue and not self._closed:
+                    self._work.wait()
+                if not self._queue:
+                    break
+                batch, self._queue = self._queue, []
+            try:
+                self._write(batch)
+            except OSError as e:
+                logger.exception("Writing the payment journal failed, refusing further payments")
+                with self._lock:
+                    self._error = e
+                    self._queue = []
+                break
+        self._wake(final=True)
+
+    def _write(self, batch: list) -> None:
+        records: list[bytes] = []
+        last_seq = None
+        for entry in batch:
+            if isinstance(entry, _Cut):
+                self._commit(records, last_seq)
+                records, last_seq = [], None
+                entry.done.wait()
+                if entry.saved:
+                    # alles bis entry.seq steckt im Snapshot -> Datei leeren
+                    self._file.truncate(0)
+                    os.fsync(self._file.fileno())
+                    self._bytes = 0
+                continue
+            last_seq, record = entry
+            records.append(record)
+        self._commit(records, last_seq)
+
+    def _commit(self, records: list[bytes], last_seq: Optional[int]) -> None:
+        if not records:
+            return
+        data = b"".join(records)
+        self._file.write(data)
+        self._file.flush()
+        if self._durability == "fsync":
+            os.fsync(self._file.fileno())
+        self._bytes += len(data)
+        with self._committed:
+            self._durable_seq = last_seq
+        self._wake()
+
+    def _wake(self, final: bool = False) -> None:
+        ready, waiting = [], []
+        with self._committed:
+            self._committed.notify_all()
+            for waiter in self._waiters:
+                (ready if final or waiter[0] <= self._durable_seq else waiting).append(waiter)
+            self._waiters = waiting
+        error = None
+        if self._error is not None:
+            error = JournalError("Payment journal is not writable")
+        for seq, loop, future in ready:
+            loop.call_soon_threadsafe(_resolve, future, error if seq > self._durable_seq else None)
+
+
+def _resolve(future: asyncio.Future, error: Optional[Exception]) -> None:
+    if future.done():
+        return
+    if error is None:
+        future.set_result(None)
+    else:
+        future.set_exception(error)
+
+
+class LedgerStore:
+    """
+    Durable ledger state: a binary snapshot of all balances plus the journal of the changes
+    since that snapshot.
+
+    load() reads the snapshot (or seeds from the mock accounts on first start) and replays the
+    journal records newer than it. checkpoint() writes a new snapshot and lets the journal writer
+    empty the file afterwards.
+    """
+
+    def __init__(self, directory: str, durability: str = "fsync"):
+        self.directory = directory
+        self.snapshot_path = os.path.join(directory, SNAPSHOT_FILE)
+        self.journal_path = os.path.join(directory, JOURNAL_FILE)
+        self.durability = durability
+        self.journal: Optional[Journal] = None
+        self.needs_checkpoint = False
+        self._checkpoint_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._checkpointer: Optional[threading.Thread] = None
+
+    def load(self, seed_accounts: Iterable[Mapping]) -> AccountLedger:
+        """Restores all balances and opens the journal for new records."""
+        os.makedirs(self.directory, exist_ok=True)
+        started = time.perf_counter()
+
+        if os.path.exists(self.snapshot_path):
+            ledger, seq = load_snapshot(self.snapshot_path)
+        else:
+            ledger, seq = AccountLedger.from_accounts(seed_accounts), 0
+            self.needs_checkpoint = True
+
+        replayed = 0
+        last_seq = seq
+        # Records bis seq stecken schon im Snapshot (Absturz zwischen Snapshot und Leeren der Datei)
+        for record_seq, index, delta, order_id in read_journal(self.journal_path):
+            last_seq = max(last_seq, record_seq)
+            if record_seq > seq:
+                ledger.apply(index, delta, order_id)
+                replayed += 1
+
+        self.needs_checkpoint = self.needs_checkpoint or replayed > 0
+        self.journal = Journal(self.journal_path, next_seq=last_seq + 1, durability=self.durability)
+        logger.info(f"Loaded {len(ledger)} accounts, replayed {replayed} journal records "
+                    f"in {time.perf_counter() - started:.2f}s")
+        return ledger
+
+    def checkpoint(self, ledger: AccountLedger, frozen) -> None:
+        """
+        Snapshots the ledger and truncates the journal. `frozen` is a context manager that blocks
+        all debits and credits and yields copies of balances and payments; only the cut is taken
+        under it, the snapshot is written after payments have resumed.
+        """
+        with self._checkpoint_lock:
+            with frozen() as (balances, payments):
+                cut = self.journal.cut()
+            try:
+                write_snapshot(self.snapshot_path, ledger, balances, payments, cut.seq)
+                cut.saved = True
+            finally:
+                cut.done.set()
+            self.needs_checkpoint = False
+
+    def start_checkpointer(self, ledger: AccountLedger, frozen, interval: float, max_bytes: int) -> None:
+        """Checkpoints once the journal holds max_bytes or its oldest change is `interval` seconds old."""
+
+        def run():
+            last = time.monotonic()
+            while not self._stop.wait(1.0):
+                size = self.journal.size()
+                if size >= max_bytes or (size and time.monotonic() - last >= interval):
+                    try:
+                        self.checkpoint(ledger, frozen)
+                    except JournalError:
+                        logger.error("Payment journal failed, stopping checkpoints")
+                        return
+                    except OSError:
+                        logger.exception("Payment ledger checkpoint failed")
+                    last = time.monotonic()
+
+        self._checkpointer = threading.Thread(target=run, name="payment-checkpoint", daemon=True)
+        self._checkpointer.start()
+
+    def close(self) -> None:
+        self._stop.set()
+        if self._checkpointer is not None:
+            self._checkpointer.join()
+        if self.journal is not None:
+            self.journal.close()